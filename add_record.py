@@ -0,0 +1,169 @@
+from kivymd.uix.screen import MDScreen
+from kivymd.uix.button import MDRaisedButton, MDFlatButton
+from kivymd.uix.textfield import MDTextField
+from kivymd.uix.label import MDLabel
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.dialog import MDDialog
+from datetime import datetime
+from functools import partial
+import calendar
+from ingest import validate_entry, ingest_records, task_name_for
+
+class AddRecordScreen(MDScreen):
+    def __init__(self, db_worker, **kwargs):
+        super().__init__(**kwargs)
+        self.db_worker = db_worker
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=20)
+        
+        # Back button
+        back_btn = MDFlatButton(
+            text="← Back to Home",
+            on_release=self.go_back
+        )
+        layout.add_widget(back_btn)
+        
+        # Title
+        title = MDLabel(
+            text="Add Today's Record",
+            halign="center",
+            font_style="H4",
+            size_hint_y=None,
+            height=60
+        )
+        layout.add_widget(title)
+        
+        # Auto-generated task name (read-only)
+        self.task_name_label = MDLabel(
+            text="",
+            halign="center",
+            font_style="H6",
+            size_hint_y=None,
+            height=40
+        )
+        layout.add_widget(self.task_name_label)
+        
+        # Input fields
+        input_layout = MDBoxLayout(orientation='vertical', spacing=15, size_hint_y=None, height=250)
+        
+        self.target_time = MDTextField(
+            hint_text="Target Duration (minutes)",
+            helper_text="Enter target duration (decimals allowed: 11.5)",
+            helper_text_mode="on_error",
+            input_filter="float",
+            size_hint_y=None,
+            height=60
+        )
+        
+        self.start_time = MDTextField(
+            hint_text="Start Time (HH:MM)",
+            helper_text="e.g. 08:00",
+            helper_text_mode="on_error",
+            size_hint_y=None,
+            height=60
+        )
+        
+        self.finish_time = MDTextField(
+            hint_text="Finish Time (HH:MM)",
+            helper_text="e.g. 09:15",
+            helper_text_mode="on_error",
+            size_hint_y=None,
+            height=60
+        )
+        
+        input_layout.add_widget(self.target_time)
+        input_layout.add_widget(self.start_time)
+        input_layout.add_widget(self.finish_time)
+        
+        layout.add_widget(input_layout)
+        
+        # Add Record button
+        add_btn = MDRaisedButton(
+            text="Add Record",
+            size_hint_y=None,
+            height=60,
+            on_release=self.add_record
+        )
+        layout.add_widget(add_btn)
+        
+        self.add_widget(layout)
+        
+    def on_enter(self):
+        # Generate task name when screen is entered
+        now = datetime.now()
+        weekday = calendar.day_abbr[now.weekday()]
+        date_str = now.strftime("%d.%m")
+        task_name = f"{weekday}{date_str}"
+        self.task_name_label.text = f"Task: {task_name}"
+        
+    def add_record(self, *args):
+        # Prevent double-clicking by disabling button temporarily
+        add_btn = None
+        for child in self.children[0].children:
+            if hasattr(child, 'text') and child.text == "Add Record":
+                add_btn = child
+                break
+        
+        if add_btn:
+            add_btn.disabled = True
+        
+        target_time = self.target_time.text.strip()
+        start_time = self.start_time.text.strip()
+        finish_time = self.finish_time.text.strip()
+        
+        if not target_time or not start_time or not finish_time:
+            if add_btn:
+                add_btn.disabled = False
+            self.show_dialog("Error", "Please fill in all fields")
+            return
+            
+        try:
+            entry = validate_entry(task_name_for(datetime.now()), target_time, start_time, finish_time)
+        except Exception as e:
+            if add_btn:
+                add_btn.disabled = False
+            self.show_dialog("Error", f"Invalid input: {e}")
+            return
+        
+        # The task upsert and the record insert run as one job on the worker;
+        # the button stays disabled until it has committed
+        self.db_worker.submit(
+            partial(ingest_records, entries=[entry]),
+            partial(self.record_saved, add_btn, entry['actual_time'], entry['performance_percentage']),
+            commit=True,
+            on_error=partial(self.record_failed, add_btn)
+        )
+    
+    def record_saved(self, add_btn, actual_duration, performance_percentage, added):
+        if not added:
+            if add_btn:
+                add_btn.disabled = False
+            self.show_dialog("Duplicate Record", "A record with the same task name and times already exists for today!")
+            return
+        
+        self.target_time.text = ""
+        self.start_time.text = ""
+        self.finish_time.text = ""
+        
+        if add_btn:
+            add_btn.disabled = False
+        
+        self.show_dialog("Success", f"Record added!\nActual: {actual_duration:.2f} min\nPerformance: {performance_percentage:.1f}%")
+        
+    def record_failed(self, add_btn, error):
+        if add_btn:
+            add_btn.disabled = False
+        self.show_dialog("Error", f"Could not save record: {error}")
+    
+    def go_back(self, *args):
+        self.manager.current = "home"
+        
+    def show_dialog(self, title, text):
+        dialog = MDDialog(
+            title=title,
+            text=text,
+            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
+        )
+        dialog.open()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Columnar performance analytics on NumPy arrays.
+
+PerformanceSeries loads each record's id, epoch timestamp, actual time,
+performance percentage and task target into contiguous arrays once, then
+answers trend questions (rolling averages, percentiles, weekday and hour
+distributions, streaks) with vectorized operations. refresh() appends only
+the records added since the last load, so a new record never forces a
+full reload. Deleted records are not noticed until the next load().
+Nothing refreshes a series by itself: whoever keeps one calls refresh()
+after saving records. The app's screens don't keep one; the report below
+loads its own.
+
+Like the queries module, load() and refresh() take a cursor, so they can
+run as DatabaseWorker jobs.
+"""
+
+import os
+import time
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday; Monday is weekday 0 as in datetime
+EPOCH_WEEKDAY = 3
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+SERIES_QUERY = '''
+    SELECT p.id, p.created_epoch, p.actual_time, p.performance_percentage, t.target_time
+    FROM performance_records p LEFT JOIN tasks t ON p.task_id = t.id
+    WHERE p.id > ? AND p.created_epoch IS NOT NULL
+    ORDER BY p.created_epoch, p.id
+'''
+
+class PerformanceSeries:
+    """All performance records as parallel NumPy columns, oldest first.
+    
+    Epochs are UTC like created_epoch; utc_offset (seconds, local time by
+    default) shifts them when grouping by day, weekday and hour.
+    """
+    
+    COLUMNS = (('ids', np.int64), ('epochs', np.int64), ('actual', np.float64),
+               ('performance', np.float64), ('target', np.float64))
+    
+    def __init__(self, utc_offset=None):
+        self.utc_offset = time.localtime().tm_gmtoff if utc_offset is None else utc_offset
+        self._size = 0
+        self._buffers = {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS}
+        
+    def __len__(self):
+        return self._size
+        
+    def __getattr__(self, name):
+        # ids, epochs, actual, performance and target are views of the filled part
+        buffers = self.__dict__.get('_buffers')
+        if buffers is None or name not in buffers:
+            raise AttributeError(name)
+        return buffers[name][:self._size]
+        
+    @property
+    def last_id(self):
+        """Highest record id loaded so far, 0 when empty."""
+        return int(self.ids.max()) if self._size else 0
+        
+    def load(self, cursor):
+        """Replace the series with every record in the database."""
+        self._size = 0
+        return self.refresh(cursor)
+        
+    def refresh(self, cursor):
+        """Append records added since the last load or refresh; returns how many."""
+        cursor.execute(SERIES_QUERY, (self.last_id,))
+        rows = cursor.fetchall()
+        if rows:
+            # None (a record without a task) becomes NaN in the float columns
+            columns = zip(*rows)
+            self.append(*(np.array(column, dtype=dtype) for column, (_, dtype) in zip(columns, self.COLUMNS)))
+        return len(rows)
+        
+    def append(self, ids, epochs, actual, performance, target):
+        """Append records given as equally long sequences, one per column."""
+        new = dict(zip((name for name, _ in self.COLUMNS), (ids, epochs, actual, performance, target)))
+        count = len(ids)
+        needed = self._size + count
+        if needed > len(self._buffers['ids']):
+            # Grow geometrically so appends stay amortized O(1)
+            capacity = max(needed, 2 * len(self._buffers['ids']), 64)
+            for name, dtype in self.COLUMNS:
+                grown = np.empty(capacity, dtype=dtype)
+                grown[:self._size] = self._buffers[name][:self._size]
+                self._buffers[name] = grown
+                
+        # Imported and backfilled records can have ids out of time order
+        epochs = np.asarray(epochs)
+        out_of_order = count > 1 and bool(np.any(epochs[1:] < epochs[:-1]))
+        if self._size and count:
+            out_of_order = out_of_order or epochs[0] < self._buffers['epochs'][self._size - 1]
+        for name, _ in self.COLUMNS:
+            self._buffers[name][self._size:needed] = new[name]
+        self._size = needed
+        
+        # Keep time order, which every window and rolling computation relies on
+        if out_of_order:
+            order = np.argsort(self.epochs, kind='stable')
+            for name, _ in self.COLUMNS:
+                self._buffers[name][:needed] = self._buffers[name][:needed][order]
+                
+    def local_seconds(self):
+        """Epochs shifted into local time."""
+        return self.epochs + self.utc_offset
+        
+    def day_numbers(self):
+        """Local day of each record as days since 1970-01-01."""
+        return self.local_seconds() // SECONDS_PER_DAY
+        
+    def rolling_average(self, window):
+        """Mean performance of each run of window consecutive records."""
+        if self._size < window:
+            return np.empty(0)
+        sums = np.cumsum(np.concatenate(([0.0], self.performance)))
+        return (sums[window:] - sums[:-window]) / window
+        
+    def daily_averages(self):
+        """Return (day numbers, average performance) for every day with records."""
+        days, index = np.unique(self.day_numbers(), return_inverse=True)
+        totals = np.bincount(index, weights=self.performance)
+        counts = np.bincount(index)
+        return days, totals / np.maximum(counts, 1)
+        
+    def percentiles(self, q=(25, 50, 75, 90)):
+        """Performance percentiles; NaN when there are no records."""
+        if not self._size:
+            return np.full(len(q), np.nan)
+        return np.percentile(self.performance, q)
+        
+    def by_weekday(self):
+        """Return (record counts, average performance) for Monday..Sunday."""
+        weekdays = (self.day_numbers() + EPOCH_WEEKDAY) % 7
+        return self._distribution(weekdays, 7)
+        
+    def by_hour(self):
+        """Return (record counts, average performance) for hours 0..23."""
+        hours = self.local_seconds() % SECONDS_PER_DAY // 3600
+        return self._distribution(hours, 24)
+        
+    def _distribution(self, buckets, size):
+        counts = np.bincount(buckets, minlength=size)
+        totals = np.bincount(buckets, weights=self.performance, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = np.where(counts > 0, totals / counts, np.nan)
+        return counts, averages
+        
+    def streaks(self, threshold=100.0, today=None):
+        """Return (current, longest) runs of consecutive days averaging at least threshold.
+        
+        A day without records ends a run. The current run still counts if
+        it ended yesterday, since today may not have records yet.
+        """
+        days, averages = self.daily_averages()
+        good_days = days[averages >= threshold]
+        if not len(good_days):
+            return 0, 0
+            
+        breaks = np.flatnonzero(np.diff(good_days) != 1)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(good_days) - 1]))
+        lengths = ends - starts + 1
+        
+        if today is None:
+            today = (int(time.time()) + self.utc_offset) // SECONDS_PER_DAY
+        current = int(lengths[-1]) if good_days[-1] >= today - 1 else 0
+        return current, int(lengths.max())
+
+if __name__ == '__main__':
+    from db_connection import DB_PATH, close_database
+    from init_db import open_database
+    
+    if not os.path.exists(DB_PATH):
+        print("Database not found. Please run the app first to create the database.")
+    else:
+        conn = open_database(DB_PATH)
+        series = PerformanceSeries()
+        series.load(conn.cursor())
+        close_database(conn)
+        
+        if not len(series):
+            print("No records found in database.")
+        else:
+            p25, p50, p75, p90 = series.percentiles()
+            current, longest = series.streaks()
+            print(f"Records: {len(series)}")
+            print(f"Performance percentiles: 25th {p25:.1f}%, median {p50:.1f}%, 75th {p75:.1f}%, 90th {p90:.1f}%")
+            print(f"Days at or above target: current streak {current}, longest {longest}")
+            counts, averages = series.by_weekday()
+            for weekday, count, average in zip(WEEKDAYS, counts, averages):
+                if count:
+                    print(f"  {weekday}: {count} records, {average:.1f}% avg")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Online database backups and backup retention.
+
+Backups are copied through SQLite's backup API a few pages per step with a
+short sleep between steps, so the database is never read into memory in
+one piece and the app can keep reading and writing while the copy runs.
+Every copy passes PRAGMA integrity_check before it is kept.
+
+Daily backups are snapshots in a content-addressed store: the copy is cut
+into fixed-size chunks named by their SHA-256, only chunks the store
+doesn't have yet are written, and a small JSON manifest lists the chunks
+of each snapshot. SQLite updates pages in place, so a day's snapshot costs
+roughly the pages that changed that day.
+
+    backups/snapshots/performance_<timestamp>.json
+    backups/chunks/<first two hex digits>/<sha256>
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from db_connection import DB_PATH, connect_database, close_database
+
+BACKUP_DIR = 'backups'
+SNAPSHOT_DIR = 'snapshots'
+CHUNK_DIR = 'chunks'
+BACKUP_NAME = re.compile(r'^performance_(\d{8}_\d{6})\.db$')
+SNAPSHOT_NAME = re.compile(r'^performance_(\d{8}_\d{6})\.json$')
+
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.005
+# A multiple of SQLite's page size, so a changed page dirties one chunk
+CHUNK_SIZE = 64 * 1024
+KEEP_DAILY = 7
+KEEP_WEEKLY = 4
+
+def copy_database(db_path, target_path, pages=PAGES_PER_STEP, pause=STEP_PAUSE, progress=None):
+    """Copy the live database at db_path to target_path; returns True if it checks out.
+    
+    pages are copied per step and the copying thread sleeps for pause
+    seconds between steps. progress(status, remaining, total) is called
+    after every step. A copy that fails its integrity check is deleted.
+    """
+    source = connect_database(db_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages, progress=progress, sleep=pause)
+        result = target.execute("PRAGMA integrity_check").fetchone()[0]
+        # The copy inherits WAL mode; switch it back so a backup is one file
+        target.execute("PRAGMA journal_mode=DELETE")
+    except sqlite3.Error as e:
+        result = str(e)
+    finally:
+        target.close()
+        close_database(source)
+    
+    if result != 'ok':
+        os.remove(target_path)
+        print(f"Backup failed: {result}")
+        return False
+    return True
+
+def backup_database(db_path=DB_PATH, backup_dir=BACKUP_DIR, pages=PAGES_PER_STEP, pause=STEP_PAUSE, progress=None):
+    """Copy db_path into backup_dir as a full file and return its path, or None."""
+    if not os.path.exists(db_path):
+        print("No database to backup.")
+        return None
+    
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_path = os.path.join(backup_dir, f'performance_{timestamp}.db')
+    partial_path = backup_path + '.partial'
+    
+    if not copy_database(db_path, partial_path, pages, pause, progress):
+        return None
+    os.replace(partial_path, backup_path)
+    return backup_path
+
+def chunk_path(backup_dir, digest):
+    """Where the chunk with this SHA-256 lives in the store."""
+    return os.path.join(backup_dir, CHUNK_DIR, digest[:2], digest)
+
+def write_file(path, data):
+    """Write path through a temporary name, so a crash never leaves half a file."""
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as target:
+        target.write(data)
+    os.replace(partial_path, path)
+
+def snapshot_database(db_path=DB_PATH, backup_dir=BACKUP_DIR, chunk_size=CHUNK_SIZE,
+                      pages=PAGES_PER_STEP, pause=STEP_PAUSE, progress=None):
+    """Snapshot db_path into the chunk store and return the manifest path, or None."""
+    if not os.path.exists(db_path):
+        print("No database to backup.")
+        return None
+    
+    os.makedirs(os.path.join(backup_dir, SNAPSHOT_DIR), exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    copy_path = os.path.join(backup_dir, f'performance_{timestamp}.db.partial')
+    
+    # Chunk a consistent copy rather than the live file, which may be mid-write
+    if not copy_database(db_path, copy_path, pages, pause, progress):
+        return None
+    
+    chunks = []
+    new_chunks = 0
+    file_hash = hashlib.sha256()
+    try:
+        with open(copy_path, 'rb') as source:
+            while True:
+                data = source.read(chunk_size)
+                if not data:
+                    break
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                path = chunk_path(backup_dir, digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    write_file(path, data)
+                    new_chunks += 1
+                chunks.append(digest)
+            size = source.tell()
+    finally:
+        os.remove(copy_path)
+    
+    manifest = {
+        'created': timestamp,
+        'size': size,
+        'sha256': file_hash.hexdigest(),
+        'chunk_size': chunk_size,
+        'new_chunks': new_chunks,
+        'chunks': chunks,
+    }
+    manifest_path = os.path.join(backup_dir, SNAPSHOT_DIR, f'performance_{timestamp}.json')
+    write_file(manifest_path, json.dumps(manifest).encode())
+    return manifest_path
+
+def restore_snapshot(manifest_path, target_path):
+    """Rebuild the database file of a snapshot at target_path; returns True on success.
+    
+    Every chunk and the whole file are checked against their hashes before
+    target_path is replaced. Leftover -wal and -shm files of the old
+    database are removed, since SQLite would replay them onto the restored
+    file. Close the app before restoring over its live database.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    backup_dir = os.path.dirname(os.path.dirname(os.path.abspath(manifest_path)))
+    partial_path = target_path + '.partial'
+    
+    file_hash = hashlib.sha256()
+    try:
+        with open(partial_path, 'wb') as target:
+            for digest in manifest['chunks']:
+                with open(chunk_path(backup_dir, digest), 'rb') as chunk:
+                    data = chunk.read()
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"chunk {digest} is corrupt")
+                file_hash.update(data)
+                target.write(data)
+        if file_hash.hexdigest() != manifest['sha256']:
+            raise ValueError("restored file does not match the snapshot")
+    except (OSError, ValueError) as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        print(f"Restore failed: {e}")
+        return False
+    
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(target_path + suffix):
+            os.remove(target_path + suffix)
+    os.replace(partial_path, target_path)
+    return True
+
+def list_matching(directory, pattern):
+    """Return (taken_at, file name) of the files in directory matching pattern, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    
+    found = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            found.append((datetime.strptime(match.group(1), '%Y%m%d_%H%M%S'), name))
+    found.sort(reverse=True)
+    return found
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """Return (taken_at, file name) of every full backup file, newest first."""
+    return list_matching(backup_dir, BACKUP_NAME)
+
+def list_snapshots(backup_dir=BACKUP_DIR):
+    """Return (taken_at, manifest name) of every snapshot, newest first."""
+    return list_matching(os.path.join(backup_dir, SNAPSHOT_DIR), SNAPSHOT_NAME)
+
+def retained(backups, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY):
+    """Pick the names to keep: the newest of each of the last keep_daily days and keep_weekly ISO weeks."""
+    keep = set()
+    days = set()
+    weeks = set()
+    for taken_at, name in backups:
+        day = taken_at.date()
+        week = day.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep.add(name)
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            keep.add(name)
+    return keep
+
+def prune_backups(backup_dir=BACKUP_DIR, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY):
+    """Delete backups and snapshots beyond the retention policy and return their names.
+    
+    Full backup files and snapshots are thinned out separately. Chunks no
+    remaining snapshot refers to and unfinished copies left behind by an
+    interrupted backup are removed as well.
+    """
+    removed = []
+    snapshot_dir = os.path.join(backup_dir, SNAPSHOT_DIR)
+    for directory, backups in ((backup_dir, list_backups(backup_dir)), (snapshot_dir, list_snapshots(backup_dir))):
+        keep = retained(backups, keep_daily, keep_weekly)
+        for _, name in backups:
+            if name not in keep:
+                os.remove(os.path.join(directory, name))
+                removed.append(name)
+    
+    if os.path.isdir(backup_dir):
+        for name in os.listdir(backup_dir):
+            if name.endswith('.db.partial'):
+                os.remove(os.path.join(backup_dir, name))
+                removed.append(name)
+    
+    collect_chunks(backup_dir)
+    return removed
+
+def collect_chunks(backup_dir=BACKUP_DIR):
+    """Delete chunks that no snapshot manifest refers to; returns how many went."""
+    referenced = set()
+    for _, name in list_snapshots(backup_dir):
+        with open(os.path.join(backup_dir, SNAPSHOT_DIR, name)) as f:
+            referenced.update(json.load(f)['chunks'])
+    
+    removed = 0
+    for root, _, names in os.walk(os.path.join(backup_dir, CHUNK_DIR)):
+        for name in names:
+            if name not in referenced:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return removed
+
+def daily_backup(db_path=DB_PATH, backup_dir=BACKUP_DIR):
+    """Snapshot once per day and apply retention; meant for a background thread."""
+    snapshots = list_snapshots(backup_dir)
+    if snapshots and snapshots[0][0].date() == datetime.now().date():
+        return None
+    
+    manifest_path = snapshot_database(db_path, backup_dir)
+    if manifest_path:
+        prune_backups(backup_dir)
+    return manifest_path
+
+if __name__ == '__main__':
+    # python backups.py                            take a snapshot
+    # python backups.py restore <manifest> [path]  rebuild a snapshot's database file
+    if len(sys.argv) > 2 and sys.argv[1] == 'restore':
+        target_path = sys.argv[3] if len(sys.argv) > 3 else DB_PATH
+        if restore_snapshot(sys.argv[2], target_path):
+            print(f"Snapshot restored to: {target_path}")
+    else:
+        manifest_path = snapshot_database()
+        if manifest_path:
+            print(f"Database snapshot saved to: {manifest_path}")
+            for name in prune_backups():
+                print(f"Removed old backup: {name}")
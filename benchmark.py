@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the app's query paths against generated shift histories.
+
+generate_history fills a database created with the app's own schema
+(init_db.create_schema) with years of daily tasks: records with start and
+end times, some running past midnight, delays whose reasons vary in case
+and spacing, and a share of double-saved records, as an older database
+holds them before the unique index is built. run_benchmark builds one
+such database per size and times every path the app and its scripts
+take: the home summaries, day, week and month loads, the records list,
+a task's timeline, delay causes, the duplicate check and cleanup, backup
+and export.
+
+Results are written as JSON, labelled with the git commit, so runs from
+two versions can be compared and slowdowns reported:
+
+    python benchmark.py [--sizes 1000,10000,100000] [--out FILE] [--compare OLD.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+from db_connection import connect_database, close_database
+from init_db import create_schema, DUPLICATE_RECORDS, migrate_unique_records
+from ingest import task_name_for, UPSERT_TASK, MINUTES_PER_DAY
+from queries import (
+    fetch_summaries, fetch_day_records, fetch_week_groups, fetch_month_groups,
+    fetch_records_page, fetch_task_timeline
+)
+from delay_stats import top_delay_causes
+from backups import backup_database
+from export import export_data
+
+BENCHMARK_SIZES = (1000, 10000, 100000)
+BENCHMARK_YEARS = 3
+BENCHMARK_REPEATS = 3
+BENCHMARK_DIR = 'benchmarks'
+# A path has regressed when it got this much slower, and by more than the noise floor
+REGRESSION_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.5
+
+TARGET_TIMES = (30.0, 45.0, 60.0, 90.0)
+DELAY_REASONS = (
+    "Machine breakdown", "machine breakdown", " Machine Breakdown ", "Waiting for parts",
+    "Material shortage", "material shortage ", "Team meeting", "Quality check", None,
+)
+DUPLICATE_RATE = 0.01
+DELAYS_PER_RECORD = 0.2
+# Share of shifts that start late in the evening and finish after midnight
+OVERNIGHT_RATE = 0.05
+
+INSERT_RECORD = '''
+    INSERT INTO performance_records
+        (task_id, start_time, end_time, actual_time, performance_percentage, notes,
+         created_at, record_day, created_epoch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_DELAY = '''
+    INSERT INTO delays (task_id, delay_time, reason, created_at, created_epoch)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+def clock(minutes):
+    """HH:MM of a number of minutes since midnight, wrapping past midnight."""
+    minutes %= MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def day_records(rng, count):
+    """(start minute, actual minutes) of count shifts on one day, no two alike."""
+    shifts = set()
+    start = 6 * 60
+    while len(shifts) < count:
+        if rng.random() < OVERNIGHT_RATE:
+            shift = (rng.randrange(22 * 60, MINUTES_PER_DAY), rng.randrange(60, 240))
+        else:
+            start = (start + rng.randrange(5, 40)) % (22 * 60)
+            shift = (start, rng.randrange(10, 120))
+        # With thousands of records a day, start and duration eventually repeat
+        while shift in shifts:
+            shift = (shift[0], shift[1] + 1)
+        shifts.add(shift)
+    return sorted(shifts)
+
+def generate_history(cursor, records, years=BENCHMARK_YEARS, seed=0, today=None):
+    """Fill an empty database with records spread over the years up to today.
+    
+    About DUPLICATE_RATE of the records are saved twice, so the unique
+    record index is dropped first; migrate_unique_records restores it.
+    Returns the number of (records, delays, duplicates) inserted, where
+    the duplicates come on top of the records.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    days = max(1, 365 * years)
+    first_day = today - timedelta(days=days - 1)
+    cursor.execute("DROP INDEX IF EXISTS idx_performance_records_unique")
+    
+    per_day, extra = divmod(records, days)
+    delay_count = duplicates = 0
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        count = per_day + (1 if offset < extra else 0)
+        if not count:
+            continue
+            
+        target_time = rng.choice(TARGET_TIMES)
+        # Names repeat every few years, so an existing task is reused
+        cursor.execute(UPSERT_TASK, (task_name_for(day), target_time))
+        task_id = cursor.fetchone()[0]
+        midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        
+        rows = []
+        for start, actual in day_records(rng, count):
+            # Saved when the shift ended; overnight ones land on the next day
+            saved = midnight + timedelta(minutes=start + actual, seconds=rng.randrange(60))
+            created_at = saved.strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((task_id, clock(start), clock(start + actual), float(actual),
+                         target_time / actual * 100, "Manual entry", created_at, created_at[:10],
+                         int(saved.timestamp())))
+            if rng.random() < DUPLICATE_RATE:
+                rows.append(rows[-1])
+                duplicates += 1
+        rows.sort(key=lambda row: row[6])
+        cursor.executemany(INSERT_RECORD, rows)
+        
+        delays = []
+        for _ in range(int(count * DELAYS_PER_RECORD + rng.random())):
+            saved = midnight + timedelta(minutes=rng.randrange(6 * 60, 22 * 60), seconds=rng.randrange(60))
+            delays.append((task_id, float(rng.randrange(1, 60)), rng.choice(DELAY_REASONS),
+                           saved.strftime('%Y-%m-%d %H:%M:%S'), int(saved.timestamp())))
+        delays.sort(key=lambda row: row[3])
+        cursor.executemany(INSERT_DELAY, delays)
+        delay_count += len(delays)
+        
+    return records, delay_count, duplicates
+
+def create_history_database(db_path, records, years=BENCHMARK_YEARS, seed=0, today=None):
+    """Create a database at db_path with the app's schema and a generated history.
+    
+    Returns what generate_history does.
+    """
+    conn = connect_database(db_path)
+    try:
+        cursor = conn.cursor()
+        create_schema(cursor)
+        counts = generate_history(cursor, records, years, seed, today)
+        conn.commit()
+    finally:
+        close_database(conn)
+    return counts
+
+def measure(job, repeats):
+    """Run job repeats times; returns its median and fastest run in milliseconds."""
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        job()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': round(statistics.median(runs), 3), 'min_ms': round(min(runs), 3)}
+
+def benchmark_paths(db_path, work_dir, today):
+    """The timed paths as (name, job, repeatable) for a generated database.
+    
+    The jobs share one connection, as the screens share the app's worker.
+    The duplicate cleanup changes the database, so it only runs once.
+    """
+    conn = connect_database(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT MAX(record_day) FROM performance_records")
+    last_day = date.fromisoformat(cursor.fetchone()[0])
+    week_start = last_day - timedelta(days=last_day.weekday())
+    month_start = last_day.replace(day=1)
+    next_month = (month_start + timedelta(days=31)).replace(day=1)
+    cursor.execute("SELECT task_id FROM performance_records ORDER BY created_at DESC LIMIT 1")
+    task_id = cursor.fetchone()[0]
+    
+    # Where the records list is after scrolling halfway through the history
+    cursor.execute("SELECT COUNT(*) FROM performance_records")
+    cursor.execute('''
+        SELECT created_at, id FROM performance_records
+        ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?
+    ''', (cursor.fetchone()[0] // 2,))
+    deep_key = cursor.fetchone()
+    
+    def dedupe():
+        migrate_unique_records(cursor)
+        conn.commit()
+        
+    def duplicate_check():
+        cursor.execute(f"SELECT COUNT(*) FROM performance_records WHERE {DUPLICATE_RECORDS}")
+        return cursor.fetchone()
+        
+    paths = [
+        ('duplicate_check', duplicate_check, True),
+        ('duplicate_cleanup', dedupe, False),
+        ('home_summaries', lambda: fetch_summaries(cursor, today), True),
+        ('day_load', lambda: fetch_day_records(cursor, last_day), True),
+        ('week_load', lambda: fetch_week_groups(cursor, week_start, week_start + timedelta(days=6)), True),
+        ('month_load', lambda: fetch_month_groups(cursor, month_start, next_month - timedelta(days=1)), True),
+        ('records_first_page', lambda: fetch_records_page(cursor), True),
+        ('records_deep_page', lambda: fetch_records_page(cursor, after=deep_key), True),
+        ('task_timeline', lambda: fetch_task_timeline(cursor, task_id), True),
+        ('delay_causes', lambda: top_delay_causes(cursor), True),
+        ('backup', lambda: backup_database(db_path, os.path.join(work_dir, 'backups'), pause=0), True),
+        ('export_csv', lambda: export_data(os.path.join(work_dir, 'export.csv'), db_path), True),
+    ]
+    return conn, paths
+
+def benchmark_size(records, years=BENCHMARK_YEARS, repeats=BENCHMARK_REPEATS, seed=0):
+    """Generate a history of this many records and time every path against it."""
+    work_dir = tempfile.mkdtemp(prefix='benchmark_')
+    db_path = os.path.join(work_dir, 'performance.db')
+    today = date.today()
+    try:
+        start = time.perf_counter()
+        records, delays, duplicates = create_history_database(db_path, records, years, seed, today)
+        generate_seconds = time.perf_counter() - start
+        
+        conn, paths = benchmark_paths(db_path, work_dir, today)
+        try:
+            timings = {name: measure(job, repeats if repeatable else 1) for name, job, repeatable in paths}
+        finally:
+            close_database(conn)
+        return {
+            'records': records,
+            'delays': delays,
+            'duplicates': duplicates,
+            'db_bytes': os.path.getsize(db_path),
+            'generate_seconds': round(generate_seconds, 3),
+            'timings': timings,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def git_label():
+    """Short hash of the checked-out commit, or 'unknown' outside a git checkout."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return 'unknown'
+    return result.stdout.strip() or 'unknown'
+
+def run_benchmark(sizes=BENCHMARK_SIZES, years=BENCHMARK_YEARS, repeats=BENCHMARK_REPEATS, seed=0, label=None):
+    """Benchmark every size; returns the results as a JSON-ready dict."""
+    results = {
+        'label': label or git_label(),
+        'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'years': years,
+        'repeats': repeats,
+        'seed': seed,
+        'sizes': {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} records...")
+        results['sizes'][str(size)] = benchmark_size(size, years, repeats, seed)
+    return results
+
+def compare_results(old, new, threshold=REGRESSION_THRESHOLD, noise_floor=NOISE_FLOOR_MS):
+    """Paths that got slower from old to new results.
+    
+    Returns (size, path, old ms, new ms) for every path measured in both
+    whose median grew by more than threshold and by more than noise_floor
+    milliseconds.
+    """
+    regressions = []
+    for size, result in new['sizes'].items():
+        old_timings = old['sizes'].get(size, {}).get('timings', {})
+        for path, timing in result['timings'].items():
+            if path not in old_timings:
+                continue
+            before = old_timings[path]['median_ms']
+            after = timing['median_ms']
+            if after > before * (1 + threshold) and after - before > noise_floor:
+                regressions.append((size, path, before, after))
+    return regressions
+
+def save_results(results, path):
+    """Write results to path as JSON."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to: {path}")
+
+def load_results(path):
+    """Read results written by save_results."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def report_regressions(old, regressions):
+    """Print what compare_results found against the old results."""
+    if not regressions:
+        print(f"No slowdowns against {old['label']}.")
+        return
+    print(f"Slower than {old['label']}:")
+    for size, path, before, after in regressions:
+        print(f"  {size} records, {path}: {before:.2f} ms -> {after:.2f} ms")
+
+def print_results(results):
+    """Print each size's median timings as a table."""
+    for size, result in results['sizes'].items():
+        print(f"\n{size} records, {result['delays']} delays, {result['duplicates']} duplicates "
+              f"({result['db_bytes'] / 1024 / 1024:.1f} MB, generated in {result['generate_seconds']:.1f} s)")
+        for path, timing in result['timings'].items():
+            print(f"  {path:<20} {timing['median_ms']:10.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the app's queries on generated histories.")
+    parser.add_argument('--sizes', default=','.join(map(str, BENCHMARK_SIZES)),
+                        help="comma-separated record counts, up to millions")
+    parser.add_argument('--years', type=int, default=BENCHMARK_YEARS, help="years of history to spread them over")
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS, help="runs per path; the median is kept")
+    parser.add_argument('--label', help="name of this run (defaults to the git commit)")
+    parser.add_argument('--out', help=f"results file (defaults to {BENCHMARK_DIR}/<label>.json)")
+    parser.add_argument('--compare', help="earlier results file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown that counts as a regression, as a fraction")
+    args = parser.parse_args()
+    
+    results = run_benchmark([int(size) for size in args.sizes.split(',')], args.years, args.repeats,
+                            label=args.label)
+    print_results(results)
+    
+    save_results(results, args.out or os.path.join(BENCHMARK_DIR, f"{results['label']}.json"))
+    
+    if args.compare:
+        old = load_results(args.compare)
+        regressions = compare_results(old, results, args.threshold)
+        report_regressions(old, regressions)
+        if regressions:
+            sys.exit(1)
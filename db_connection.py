@@ -0,0 +1,108 @@
+"""
+Shared SQLite connection factory.
+
+Every entry point opens the database through connect_database(), so they
+all get WAL journaling and the same per-device tuning; the command-line
+tools go through init_db.open_database(), which migrates the file too.
+In WAL mode readers (dashboards, exports) don't block the writer and a
+commit only appends to the log instead of rewriting pages in place.
+"""
+
+import sqlite3
+import os
+
+DB_PATH = os.path.join('data', 'performance.db')
+
+# cache_size is in KiB when negative, mmap_size in bytes
+PROFILES = {
+    'desktop': {
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'mobile': {
+        'synchronous': 'NORMAL',
+        'cache_size': -4000,
+        'mmap_size': 32 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'low_memory': {
+        'synchronous': 'NORMAL',
+        'cache_size': -1000,
+        'mmap_size': 0,
+        'temp_store': 'FILE',
+    },
+}
+
+def default_profile():
+    """Pick the profile for this device; PERFORMANCE_DB_PROFILE overrides it."""
+    profile = os.environ.get('PERFORMANCE_DB_PROFILE')
+    if profile in PROFILES:
+        return profile
+    # Android sets ANDROID_ROOT for every process, Kivy and BeeWare alike
+    if 'ANDROID_ROOT' in os.environ:
+        return 'mobile'
+    return 'desktop'
+
+def connect_database(db_path=DB_PATH, profile=None, **kwargs):
+    """Open db_path in WAL mode with the pragmas of the given profile."""
+    settings = PROFILES[profile or default_profile()]
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size={settings['cache_size']}")
+    conn.execute(f"PRAGMA mmap_size={settings['mmap_size']}")
+    conn.execute(f"PRAGMA temp_store={settings['temp_store']}")
+    return conn
+
+def close_database(conn):
+    """Let SQLite refresh its planner statistics, then close the connection."""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        print(f"PRAGMA optimize failed: {e}")
+    conn.close()
+
+def run_in_batches(cursor, table, statement, batch_size=None):
+    """Run statement over table id range by id range; returns the rows it changed.
+    
+    statement limits itself to :start <= id < :stop. With batch_size each
+    range of that many ids is its own statement, committed straight away,
+    so a backfill over millions of rows keeps memory bounded and gives the
+    write lock back between batches. Without it one statement covers the
+    whole table inside the caller's transaction.
+    """
+    cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+    first, last = cursor.fetchone()
+    if first is None:
+        return 0
+        
+    step = batch_size or last - first + 1
+    changed = 0
+    for start in range(first, last + 1, step):
+        cursor.execute(statement, {'start': start, 'stop': start + step})
+        changed += max(cursor.rowcount, 0)
+        if batch_size:
+            cursor.connection.commit()
+    return changed
+
+def begin_rebuild(cursor, table):
+    """Whether table has to be built from its source rows: it is missing, or its last build never finished.
+    
+    A missing table is marked pending in the transaction that goes on to
+    create it, and finish_rebuild clears the mark once every batch is in,
+    so a build interrupted between committed batches is started over on
+    the next run instead of being left partial.
+    """
+    cursor.execute("CREATE TABLE IF NOT EXISTS pending_rebuilds (table_name TEXT PRIMARY KEY)")
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    if cursor.fetchone() is None:
+        cursor.execute("INSERT OR IGNORE INTO pending_rebuilds (table_name) VALUES (?)", (table,))
+        return True
+    cursor.execute("SELECT 1 FROM pending_rebuilds WHERE table_name = ?", (table,))
+    return cursor.fetchone() is not None
+
+def finish_rebuild(cursor, table):
+    """Clear the pending mark begin_rebuild left on table."""
+    cursor.execute("DELETE FROM pending_rebuilds WHERE table_name = ?", (table,))
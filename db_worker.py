@@ -0,0 +1,252 @@
+"""
+Background database worker so the Kivy UI thread never waits on SQLite.
+
+The worker also tracks a data version, so screens can tell whether what
+they showed last is still current without asking the database: it changes
+as soon as a write is queued on the worker, so nothing read before the
+write is reused once the user has moved on, and when another connection
+or process commits one, which SQLite reports through PRAGMA data_version.
+"""
+
+from kivy.clock import Clock
+from functools import partial
+from collections import OrderedDict
+from db_connection import connect_database, close_database
+from tracing import span, job_name
+import threading
+import queue
+
+# How often an idle worker looks for writes made by other connections
+VERSION_POLL_INTERVAL = 2.0
+
+class DatabaseWorker:
+    """Run database jobs in order on one thread with its own connection.
+    
+    A job is a function taking a cursor. Its return value is handed to the
+    callback on the Kivy main thread through Clock.schedule_once.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._latest = {}
+        self._writes = 0
+        self._data_version = None
+        self._thread = threading.Thread(target=self._run, name="DatabaseWorker", daemon=True)
+        self._thread.start()
+    
+    @property
+    def version(self):
+        """(PRAGMA data_version, writes queued here); None until the connection opens."""
+        data_version = self._data_version
+        if data_version is None:
+            return None
+        return (data_version, self._writes)
+        
+    def submit(self, job, callback=None, key=None, commit=False, on_error=None):
+        """Queue job(cursor) and return its request id.
+        
+        Submitting with a key cancels any earlier request with the same key:
+        it is skipped if it hasn't started yet, and its result is dropped if
+        it has. Writes should pass commit=True and no key, so they always run.
+        """
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            if key is not None:
+                self._latest[key] = request_id
+            # Counted when queued, not when committed: a read submitted after this
+            # runs after the write, so only results from before it go stale
+            if commit:
+                self._writes += 1
+        
+        self._jobs.put((request_id, key, job, callback, commit, on_error))
+        return request_id
+    
+    def cancel(self, key):
+        """Drop whatever request is pending for key."""
+        with self._lock:
+            self._latest[key] = None
+    
+    def close(self):
+        """Finish the queued jobs, then close the worker's connection."""
+        self._jobs.put(None)
+        self._thread.join()
+    
+    def _is_current(self, request_id, key):
+        with self._lock:
+            return key is None or self._latest.get(key) == request_id
+    
+    def _update_version(self, connection):
+        self._data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _run(self):
+        connection = connect_database(self.db_path)
+        self._update_version(connection)
+        
+        while True:
+            try:
+                item = self._jobs.get(timeout=VERSION_POLL_INTERVAL)
+            except queue.Empty:
+                self._update_version(connection)
+                continue
+            if item is None:
+                break
+            
+            request_id, key, job, callback, commit, on_error = item
+            if not self._is_current(request_id, key):
+                continue
+            
+            try:
+                with span(job_name(job), 'db'):
+                    result = job(connection.cursor())
+                    if commit:
+                        connection.commit()
+            except Exception as e:
+                connection.rollback()
+                self._update_version(connection)
+                if on_error:
+                    Clock.schedule_once(partial(self._deliver, request_id, key, on_error, e))
+                else:
+                    print(f"Database error: {e}")
+                continue
+            
+            # Before the callback, so it already sees other connections' writes
+            self._update_version(connection)
+            if callback:
+                Clock.schedule_once(partial(self._deliver, request_id, key, callback, result))
+        
+        close_database(connection)
+    
+    def _deliver(self, request_id, key, callback, result, *args):
+        # Re-check on the main thread: a newer request may have arrived meanwhile
+        if self._is_current(request_id, key):
+            callback(result)
+
+class CachedQuery:
+    """A screen's recent query results, reused while their parameters and the data version hold.
+    
+    Up to size results are kept; the least recently used one goes first.
+    At most prefetches prefetches are in the worker at once; a new one
+    replaces the oldest, so paging quickly never piles them up.
+    """
+    
+    def __init__(self, db_worker, size=1, prefetches=2):
+        self.db_worker = db_worker
+        self.size = size
+        self.prefetches = prefetches
+        # params -> (version, result), least recently used first
+        self._entries = OrderedDict()
+        # params -> (version, slot) of prefetches still in the worker, oldest first
+        self._prefetching = OrderedDict()
+        # load key -> (params, job, callback) of loads answered by a prefetch in flight
+        self._waiting = {}
+        self.hits = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def load(self, params, job, callback, key=None):
+        """Hand callback the result of job for params, querying only if the data may have changed.
+        
+        params must describe everything the job's result depends on, such as
+        the day shown. key works as in DatabaseWorker.submit; a load waiting
+        on a prefetch is replaced by the next load with the same key.
+        """
+        version = self.db_worker.version
+        self._waiting.pop(key, None)
+        entry = self._current(params, version)
+        pending = self._prefetching.get(params)
+        if entry is not None or (pending is not None and pending[0] == version):
+            # Drop any older request for key, so it can't overwrite this result
+            if key is not None:
+                self.db_worker.cancel(key)
+            if entry is None:
+                # Already being queried; answer from the prefetch when it lands
+                self._waiting[key] = (params, job, callback)
+                return
+            self.hits += 1
+            self._entries.move_to_end(params)
+            callback(entry[1])
+            return
+        
+        self.db_worker.submit(job, partial(self._store, params, version, callback), key=key)
+    
+    def prefetch(self, params, job):
+        """Run job for params in the background, so a later load finds its result cached."""
+        version = self.db_worker.version
+        pending = self._prefetching.get(params)
+        if version is None or self._current(params, version) is not None or (pending and pending[0] == version):
+            return
+        
+        if pending is not None:
+            # Replaces the prefetch of an older version in its slot
+            slot = pending[1]
+            del self._prefetching[params]
+        else:
+            slot = self._free_slot()
+            if slot is None:
+                return
+        # Submitting under the slot's key cancels whatever prefetch had it
+        self._prefetching[params] = (version, slot)
+        self.db_worker.submit(job, partial(self._prefetched, params, version), key=(self, slot),
+                              on_error=partial(self._prefetch_failed, params, version))
+                              
+    def _free_slot(self):
+        used = [slot for _, slot in self._prefetching.values()]
+        if len(used) < self.prefetches:
+            return min(set(range(self.prefetches)) - set(used))
+        # Take over the oldest prefetch no load is waiting on
+        waited = {params for params, _, _ in self._waiting.values()}
+        for params, (_, slot) in self._prefetching.items():
+            if params not in waited:
+                del self._prefetching[params]
+                return slot
+        return None
+    
+    def _current(self, params, version):
+        entry = self._entries.get(params)
+        if entry is None or version is None or entry[0] != version:
+            return None
+        return entry
+    
+    def _remember(self, params, version, result):
+        # Tagged with the version read at submit time, so a write that raced the
+        # query makes the next load ask again rather than trust a stale result
+        self._entries[params] = (version, result)
+        self._entries.move_to_end(params)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            
+    def _store(self, params, version, callback, result):
+        self._remember(params, version, result)
+        callback(result)
+        
+    def _waiters(self, params):
+        """Remove and return (key, job, callback) of the loads waiting on params."""
+        waiters = [(key, job, callback) for key, (waited, job, callback) in self._waiting.items() if waited == params]
+        for key, _, _ in waiters:
+            del self._waiting[key]
+        return waiters
+        
+    def _prefetched(self, params, version, result):
+        pending = self._prefetching.get(params)
+        if pending is not None and pending[0] == version:
+            del self._prefetching[params]
+        # Never let a late prefetch replace a result loaded since
+        if self._current(params, self.db_worker.version) is None:
+            self._remember(params, version, result)
+        for _, _, callback in self._waiters(params):
+            callback(result)
+            
+    def _prefetch_failed(self, params, version, error):
+        pending = self._prefetching.get(params)
+        if pending is None or pending[0] != version:
+            return
+        del self._prefetching[params]
+        print(f"Prefetch failed: {error}")
+        # Loads that were waiting on it ask for themselves
+        for key, job, callback in self._waiters(params):
+            self.db_worker.submit(job, partial(self._store, params, version, callback), key=key)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Delay analytics: normalized reasons and per-week totals.
+
+Every delay points at a row of delay_reasons, where reasons that differ
+only in case or surrounding spaces share one entry. delay_weekly_totals
+keeps the count and total delay time per Monday-based week and reason.
+Triggers on delays keep both current inside the same transaction as every
+insert, update and delete, so the top causes come from a few small
+aggregate rows no matter how many years of delays are stored.
+"""
+
+import os
+from db_connection import run_in_batches, begin_rebuild, finish_rebuild
+
+REASON_KEY = "LOWER(TRIM(COALESCE({row}.reason, '')))"
+WEEK_START = "DATE({row}.created_at, 'weekday 0', '-6 days')"
+
+# Register NEW's reason, link the delay to it and add it to its week
+ADD_DELAY = f'''
+    INSERT INTO delay_reasons (reason_key, label)
+    SELECT {REASON_KEY.format(row='NEW')}, TRIM(COALESCE(NEW.reason, ''))
+    WHERE true
+    ON CONFLICT(reason_key) DO NOTHING;
+    UPDATE delays SET reason_id = (
+        SELECT id FROM delay_reasons WHERE reason_key = {REASON_KEY.format(row='NEW')}
+    )
+    WHERE id = NEW.id;
+    INSERT INTO delay_weekly_totals (week_start, reason_id, delay_count, delay_time_sum)
+    SELECT {WEEK_START.format(row='NEW')},
+           (SELECT id FROM delay_reasons WHERE reason_key = {REASON_KEY.format(row='NEW')}),
+           1, NEW.delay_time
+    WHERE NEW.created_at IS NOT NULL
+    ON CONFLICT(week_start, reason_id) DO UPDATE SET
+        delay_count = delay_count + 1,
+        delay_time_sum = delay_time_sum + excluded.delay_time_sum;
+'''
+
+# Take OLD back out of its week
+REMOVE_DELAY = f'''
+    UPDATE delay_weekly_totals SET
+        delay_count = delay_count - 1,
+        delay_time_sum = delay_time_sum - OLD.delay_time
+    WHERE week_start = {WEEK_START.format(row='OLD')} AND reason_id = OLD.reason_id;
+    DELETE FROM delay_weekly_totals
+    WHERE week_start = {WEEK_START.format(row='OLD')} AND reason_id = OLD.reason_id AND delay_count <= 0;
+'''
+
+def init_delay_stats(cursor, batch_size=None):
+    """Create the reason dictionary, weekly totals, triggers and indexes, building them on first use.
+    
+    batch_size is passed on to rebuild_delay_stats. A build that was
+    interrupted is run again from the start.
+    """
+    is_new = begin_rebuild(cursor, 'delay_weekly_totals')
+    
+    cursor.execute("PRAGMA table_info(delays)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'reason_id' not in columns:
+        cursor.execute("ALTER TABLE delays ADD COLUMN reason_id INTEGER REFERENCES delay_reasons (id)")
+        
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS delay_reasons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reason_key TEXT NOT NULL UNIQUE,
+            label TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS delay_weekly_totals (
+            week_start TEXT NOT NULL,
+            reason_id INTEGER NOT NULL,
+            delay_count INTEGER NOT NULL,
+            delay_time_sum REAL NOT NULL,
+            PRIMARY KEY (week_start, reason_id)
+        )
+    ''')
+    
+    # A task's history reads its delays newest first
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_delays_task_created
+        ON delays (task_id, created_at)
+    ''')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS delay_stats_insert
+        AFTER INSERT ON delays
+        BEGIN {ADD_DELAY} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS delay_stats_delete
+        AFTER DELETE ON delays
+        BEGIN {REMOVE_DELAY} END
+    ''')
+    # reason_id itself is left out, since the insert trigger sets it
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS delay_stats_update
+        AFTER UPDATE OF delay_time, reason, created_at ON delays
+        BEGIN {REMOVE_DELAY} {ADD_DELAY} END
+    ''')
+    
+    if is_new:
+        rebuild_delay_stats(cursor, batch_size)
+        finish_rebuild(cursor, 'delay_weekly_totals')
+
+def rebuild_delay_stats(cursor, batch_size=None):
+    """Regenerate reasons, reason links and weekly totals from delays.
+    
+    With batch_size the links and totals are written a committed batch of
+    delays at a time, as in run_in_batches.
+    """
+    cursor.execute(f'''
+        INSERT INTO delay_reasons (reason_key, label)
+        SELECT {REASON_KEY.format(row='delays')}, MIN(TRIM(COALESCE(reason, '')))
+        FROM delays
+        WHERE true
+        GROUP BY 1
+        ON CONFLICT(reason_key) DO NOTHING
+    ''')
+    run_in_batches(cursor, 'delays', f'''
+        UPDATE delays SET reason_id = (
+            SELECT id FROM delay_reasons WHERE reason_key = {REASON_KEY.format(row='delays')}
+        )
+        WHERE id >= :start AND id < :stop
+    ''', batch_size)
+    cursor.execute("DELETE FROM delay_weekly_totals")
+    run_in_batches(cursor, 'delays', f'''
+        INSERT INTO delay_weekly_totals (week_start, reason_id, delay_count, delay_time_sum)
+        SELECT {WEEK_START.format(row='delays')}, reason_id, COUNT(*), SUM(delay_time)
+        FROM delays
+        WHERE id >= :start AND id < :stop AND created_at IS NOT NULL
+        GROUP BY 1, reason_id
+        ON CONFLICT(week_start, reason_id) DO UPDATE SET
+            delay_count = delay_count + excluded.delay_count,
+            delay_time_sum = delay_time_sum + excluded.delay_time_sum
+    ''', batch_size)
+
+def top_delay_causes(cursor, start_day=None, end_day=None, limit=5):
+    """Return (reason, delay count, total delay time) for the costliest reasons.
+    
+    start_day and end_day (inclusive) select the weeks that start between
+    them; without them every week counts.
+    """
+    cursor.execute('''
+        SELECT r.label, SUM(w.delay_count), SUM(w.delay_time_sum)
+        FROM delay_weekly_totals w JOIN delay_reasons r ON w.reason_id = r.id
+        WHERE w.week_start BETWEEN COALESCE(?, '') AND COALESCE(?, '9999-12-31')
+        GROUP BY w.reason_id
+        ORDER BY SUM(w.delay_time_sum) DESC, SUM(w.delay_count) DESC
+        LIMIT ?
+    ''', (None if start_day is None else str(start_day), None if end_day is None else str(end_day), limit))
+    return cursor.fetchall()
+
+def weekly_delay_totals(cursor, start_day, end_day):
+    """Return (week_start, reason, delay count, total delay time) per week and reason, newest week first."""
+    cursor.execute('''
+        SELECT w.week_start, r.label, w.delay_count, w.delay_time_sum
+        FROM delay_weekly_totals w JOIN delay_reasons r ON w.reason_id = r.id
+        WHERE w.week_start BETWEEN ? AND ?
+        ORDER BY w.week_start DESC, w.delay_time_sum DESC
+    ''', (str(start_day), str(end_day)))
+    return cursor.fetchall()
+
+if __name__ == '__main__':
+    from db_connection import DB_PATH, connect_database, close_database
+    
+    db_path = DB_PATH
+    if not os.path.exists(db_path):
+        print("Database not found. Please run the app first to create the database.")
+    else:
+        conn = connect_database(db_path)
+        cursor = conn.cursor()
+        init_delay_stats(cursor)
+        rebuild_delay_stats(cursor)
+        conn.commit()
+        causes = top_delay_causes(cursor)
+        close_database(conn)
+        
+        if not causes:
+            print("No delays recorded.")
+        else:
+            print("Top delay causes:")
+            for reason, count, total in causes:
+                print(f"  {reason or '(no reason)'}: {count} delays, {total:.1f} min")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Streaming export of performance records and delays.
+
+Records and delays are exported together as one chronological list, with
+the task name and target time of each. Rows are read with fetchmany a
+chunk at a time and written out straight away, so an export holds one
+chunk in memory however many years of history it covers. Date and task
+filters read the created_at and (task_id, created_at) indexes.
+
+CSV and JSON Lines are always available; Parquet needs pyarrow, which is
+optional. Each chunk becomes one Parquet row group.
+
+    python export.py <file.csv|file.jsonl|file.parquet> [--from DAY] [--to DAY] [--task ID]
+"""
+
+import os
+import csv
+import json
+import sqlite3
+import argparse
+from datetime import date, timedelta
+from db_connection import DB_PATH, close_database
+from init_db import open_database
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_COLUMNS = ('kind', 'id', 'task', 'target_time', 'day', 'start_time', 'end_time',
+                  'minutes', 'performance_percentage', 'note', 'created_at')
+
+# Both branches read an index in created_at order and SQLite merges them. Only columns
+# every schema version has are read, so importer.py can read an unmigrated database.
+EXPORT_QUERY = '''
+    SELECT 'record' AS kind, p.id AS id, t.name, t.target_time, DATE(p.created_at), p.start_time, p.end_time,
+           p.actual_time, p.performance_percentage, p.notes, p.created_at AS created_at
+    FROM performance_records p LEFT JOIN tasks t ON p.task_id = t.id
+    WHERE {record_filter}
+    UNION ALL
+    SELECT 'delay', d.id, t.name, t.target_time, DATE(d.created_at), NULL, NULL,
+           d.delay_time, NULL, d.reason, d.created_at
+    FROM delays d LEFT JOIN tasks t ON d.task_id = t.id
+    WHERE {delay_filter}
+    ORDER BY created_at, kind, id
+'''
+
+def export_filter(table, start_day=None, end_day=None, task_id=None):
+    """The WHERE clause of one branch of EXPORT_QUERY."""
+    conditions = []
+    if start_day is not None:
+        conditions.append(f"{table}.created_at >= :start")
+    if end_day is not None:
+        conditions.append(f"{table}.created_at < :end")
+    if task_id is not None:
+        conditions.append(f"{table}.task_id = :task_id")
+    return " AND ".join(conditions) or "1"
+
+def export_chunks(cursor, start_day=None, end_day=None, task_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the export rows, oldest first, as lists of at most chunk_size rows.
+    
+    start_day and end_day (inclusive) are dates or YYYY-MM-DD strings.
+    """
+    params = {'task_id': task_id}
+    if start_day is not None:
+        params['start'] = str(start_day)
+    if end_day is not None:
+        # created_at carries a time, so compare with the start of the next day
+        params['end'] = str(date.fromisoformat(str(end_day)) + timedelta(days=1))
+        
+    cursor.execute(EXPORT_QUERY.format(
+        record_filter=export_filter('p', start_day, end_day, task_id),
+        delay_filter=export_filter('d', start_day, end_day, task_id)
+    ), params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+def write_csv(path, chunks):
+    """Write chunks of rows to a CSV file with a header line; returns the row count."""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+def write_jsonl(path, chunks):
+    """Write chunks of rows as one JSON object per line; returns the row count."""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for rows in chunks:
+            f.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n' for row in rows)
+            count += len(rows)
+    return count
+
+def write_parquet(path, chunks):
+    """Write chunks of rows to a Parquet file, one row group each; returns the row count."""
+    schema = pyarrow.schema([
+        ('kind', pyarrow.string()), ('id', pyarrow.int64()), ('task', pyarrow.string()),
+        ('target_time', pyarrow.float64()), ('day', pyarrow.string()), ('start_time', pyarrow.string()),
+        ('end_time', pyarrow.string()), ('minutes', pyarrow.float64()),
+        ('performance_percentage', pyarrow.float64()), ('note', pyarrow.string()),
+        ('created_at', pyarrow.string()),
+    ])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            columns = [pyarrow.array(column, type=field.type) for column, field in zip(zip(*rows), schema)]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+            count += len(rows)
+    return count
+
+WRITERS = {'.csv': write_csv, '.jsonl': write_jsonl, '.parquet': write_parquet}
+
+def export_data(path, db_path=DB_PATH, start_day=None, end_day=None, task_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Export records and delays to path, in the format its extension names; returns the row count, or None.
+    
+    The file is written under a temporary name and only replaces path once
+    the export is complete.
+    """
+    writer = WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        print(f"Unknown export format: {path} (use .csv, .jsonl or .parquet)")
+        return None
+    if writer is write_parquet and pyarrow is None:
+        print("Parquet export needs pyarrow; install it or export to .csv or .jsonl.")
+        return None
+    if not os.path.exists(db_path):
+        print("Database not found. Please run the app first to create the database.")
+        return None
+        
+    partial_path = path + '.partial'
+    conn = open_database(db_path)
+    try:
+        chunks = export_chunks(conn.cursor(), start_day, end_day, task_id, chunk_size)
+        count = writer(partial_path, chunks)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        print(f"Export failed: {e}")
+        return None
+    finally:
+        close_database(conn)
+        
+    os.replace(partial_path, path)
+    return count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export performance records and delays.")
+    parser.add_argument('path', help="output file ending in .csv, .jsonl or .parquet")
+    parser.add_argument('--from', dest='start_day', help="first day to export (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end_day', help="last day to export (YYYY-MM-DD)")
+    parser.add_argument('--task', dest='task_id', type=int, help="export only this task id")
+    args = parser.parse_args()
+    
+    count = export_data(args.path, start_day=args.start_day, end_day=args.end_day, task_id=args.task_id)
+    if count is not None:
+        print(f"Exported {count} rows to: {args.path}")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bulk import of records and delays from CSV, JSON Lines or another database.
+
+Files use the columns export.py writes (kind, task, target_time,
+start_time, end_time, minutes, note, created_at), so an export from one
+device imports on another; spreadsheet names such as task_name,
+finish_time and notes are understood too. A record with start and end
+times goes through validate_entry, like a record added in the app, and
+one with only minutes is scored like a record from the task screen.
+Another performance.db is read through export.py's query.
+
+Timestamps without an offset are taken to be UTC, as export.py writes
+them; --local-time reads them as this device's local time instead, for
+spreadsheets kept by hand. Another database's timestamps are always UTC.
+
+Rows are parsed and validated in a process pool, a chunk per job, with
+only a few chunks in flight per worker, so memory stays flat however
+large the file. They are loaded with executemany in a single
+transaction, so an import either lands completely or not at all. Records already stored are skipped by
+the same unique key the app uses; delays and records without times are
+skipped when an identical one exists.
+
+    python importer.py [--local-time] <file.csv|file.jsonl|performance.db>
+"""
+
+import os
+import sys
+import csv
+import json
+import sqlite3
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from db_connection import DB_PATH, close_database
+from init_db import open_database
+from ingest import validate_entry, ingest_records, resolve_task
+from export import EXPORT_COLUMNS, export_chunks
+
+IMPORT_CHUNK_SIZE = 5000
+IMPORT_NOTES = "Imported"
+# Chunks parsed ahead of loading, per worker process
+CHUNKS_IN_FLIGHT = 2
+
+# Column names from spreadsheets, mapped to the names export.py writes
+COLUMN_ALIASES = {
+    'task_name': 'task', 'name': 'task',
+    'finish_time': 'end_time',
+    'actual_time': 'minutes', 'delay_time': 'minutes',
+    'notes': 'note', 'reason': 'note',
+}
+
+# Records without start and end times aren't covered by the unique index
+INSERT_UNTIMED_RECORD = '''
+    INSERT INTO performance_records
+        (task_id, actual_time, performance_percentage, notes, created_at, record_day, created_epoch)
+    SELECT :task_id, :actual_time, :performance_percentage, :notes, ts, DATE(ts), CAST(STRFTIME('%s', ts) AS INTEGER)
+    FROM (SELECT COALESCE(:created_at, DATETIME('now')) AS ts)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM performance_records
+        WHERE task_id = :task_id AND created_at = ts AND start_time IS NULL AND actual_time = :actual_time
+    )
+'''
+
+INSERT_DELAY = '''
+    INSERT INTO delays (task_id, delay_time, reason, created_at, created_epoch)
+    SELECT :task_id, :delay_time, :reason, ts, CAST(STRFTIME('%s', ts) AS INTEGER)
+    FROM (SELECT COALESCE(:created_at, DATETIME('now')) AS ts)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM delays
+        WHERE task_id = :task_id AND created_at = ts AND delay_time = :delay_time AND reason IS :reason
+    )
+'''
+
+def parse_timestamp(value, local_time=False):
+    """Normalize an optional ISO timestamp to the UTC YYYY-MM-DD HH:MM:SS that created_at holds.
+    
+    Timestamps without an offset are taken to be UTC already, or this
+    device's local time with local_time.
+    """
+    if not value:
+        return None
+    timestamp = datetime.fromisoformat(str(value).strip())
+    if timestamp.tzinfo is not None or local_time:
+        # astimezone reads a naive timestamp as local time
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat(sep=' ', timespec='seconds')
+
+def parse_row(row, local_time=False):
+    """Validate one imported row, a dict or a JSON Lines line; returns (kind, entry).
+    
+    kind is 'record', 'untimed' or 'delay'. Raises ValueError for bad input.
+    local_time works as in parse_timestamp.
+    """
+    if isinstance(row, str):
+        # JSONDecodeError is a ValueError, so a bad line is reported like any bad row
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError(f"Expected a JSON object, got {type(row).__name__}")
+    row = {COLUMN_ALIASES.get(key.strip().lower(), key.strip().lower()): value
+           for key, value in row.items() if key}
+    kind = str(row.get('kind') or 'record').strip().lower()
+    task_name = str(row.get('task') or '').strip()
+    created_at = parse_timestamp(row.get('created_at'), local_time)
+    note = row.get('note') or None
+    
+    if kind == 'delay':
+        if not task_name:
+            raise ValueError("Task name is required")
+        delay_time = float(row.get('minutes') or 0)
+        if delay_time <= 0:
+            raise ValueError("Delay time must be positive")
+        return 'delay', {'task_name': task_name, 'target_time': float(row.get('target_time') or 0),
+                         'delay_time': delay_time, 'reason': note, 'created_at': created_at}
+    if kind != 'record':
+        raise ValueError(f"Unknown kind: {kind}")
+        
+    if row.get('start_time') and row.get('end_time'):
+        entry = validate_entry(task_name, row.get('target_time'), str(row['start_time']).strip(),
+                               str(row['end_time']).strip(), created_at)
+        entry['notes'] = note or IMPORT_NOTES
+        return 'record', entry
+        
+    # Scored like add_task_performance
+    if not task_name:
+        raise ValueError("Task name is required")
+    target_time = float(row.get('target_time'))
+    actual_time = float(row.get('minutes') or 0)
+    if actual_time <= 0:
+        raise ValueError("Start and end times or a positive number of minutes are required")
+    return 'untimed', {'task_name': task_name, 'target_time': target_time, 'actual_time': actual_time,
+                       'performance_percentage': (target_time / actual_time) * 100,
+                       'notes': note or IMPORT_NOTES, 'created_at': created_at}
+
+def parse_chunk(chunk, local_time=False):
+    """Validate a chunk of (position, row) pairs; meant to run in a worker process.
+    
+    Returns (records, untimed records, delays, errors), where errors are
+    (position, message) pairs.
+    """
+    parsed = {'record': [], 'untimed': [], 'delay': []}
+    errors = []
+    for position, row in chunk:
+        try:
+            kind, entry = parse_row(row, local_time)
+        except (TypeError, ValueError, KeyError) as e:
+            errors.append((position, str(e)))
+            continue
+        parsed[kind].append(entry)
+    return parsed['record'], parsed['untimed'], parsed['delay'], errors
+
+def read_rows(path):
+    """Yield (position, row) for every row of a CSV, JSON Lines or database file.
+    
+    Rows are dicts, except JSON Lines lines, which parse_row decodes so a
+    bad line is reported with the other invalid rows. Positions are line
+    numbers for files and row numbers for databases.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif extension == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, line
+    elif extension in ('.db', '.sqlite', '.sqlite3'):
+        # Read-only, so importing never changes the other device's database
+        source = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            position = 0
+            for rows in export_chunks(source.cursor()):
+                for row in rows:
+                    position += 1
+                    yield position, dict(zip(EXPORT_COLUMNS, row))
+        finally:
+            source.close()
+    else:
+        raise ValueError(f"Unknown import format: {path} (use .csv, .jsonl or .db)")
+
+def read_chunks(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yield lists of at most chunk_size (position, row) pairs."""
+    chunk = []
+    for item in read_rows(path):
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def parse_in_pool(chunks, workers, local_time=False):
+    """Run parse_chunk over chunks in order, in worker processes when the platform allows it."""
+    pool = None
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError, ImportError):
+            # Android and some sandboxes have no process pools; parse here instead
+            pool = None
+    if pool is None:
+        for chunk in chunks:
+            yield parse_chunk(chunk, local_time)
+        return
+        
+    with pool:
+        # pool.map would read and parse the whole file up front; a bounded window of
+        # futures keeps a few chunks per worker in memory. Taken in submission order,
+        # so errors keep their positions.
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parse_chunk, chunk, local_time))
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def load_chunk(cursor, task_ids, records, untimed, delays):
+    """Insert one parsed chunk and return (records added, delays added)."""
+    added = ingest_records(cursor, records, IMPORT_NOTES, task_ids) if records else 0
+    
+    rows = [dict(entry, task_id=resolve_task(cursor, task_ids, entry['task_name'], entry['target_time']))
+            for entry in untimed]
+    if rows:
+        cursor.executemany(INSERT_UNTIMED_RECORD, rows)
+        added += cursor.rowcount
+        
+    rows = [dict(entry, task_id=resolve_task(cursor, task_ids, entry['task_name'], entry['target_time']))
+            for entry in delays]
+    delays_added = 0
+    if rows:
+        cursor.executemany(INSERT_DELAY, rows)
+        delays_added = cursor.rowcount
+    return added, delays_added
+
+def import_data(path, db_path=DB_PATH, workers=None, chunk_size=IMPORT_CHUNK_SIZE, local_time=False):
+    """Import path into db_path in one transaction; returns (records, delays, skipped, errors), or None.
+    
+    records and delays count the rows added, skipped the valid rows that
+    were already stored and errors lists (position, message) for the rows
+    that failed validation. workers=None uses one process per CPU and
+    workers=1 parses in this process. local_time reads timestamps without
+    an offset in CSV and JSON Lines files as local time. Nothing is
+    imported if reading or loading fails.
+    """
+    if not os.path.exists(path):
+        print(f"Import file not found: {path}")
+        return None
+    if not os.path.exists(db_path):
+        print("Database not found. Please run the app first to create the database.")
+        return None
+        
+    # Another database's created_at is UTC whatever the flag says
+    if os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        local_time = False
+        
+    conn = open_database(db_path)
+    cursor = conn.cursor()
+    task_ids = {}
+    records_added = delays_added = valid = 0
+    errors = []
+    try:
+        for records, untimed, delays, chunk_errors in parse_in_pool(read_chunks(path, chunk_size), workers, local_time):
+            added, delays_in_chunk = load_chunk(cursor, task_ids, records, untimed, delays)
+            records_added += added
+            delays_added += delays_in_chunk
+            valid += len(records) + len(untimed) + len(delays)
+            errors.extend(chunk_errors)
+        conn.commit()
+    except (sqlite3.Error, OSError, ValueError) as e:
+        conn.rollback()
+        print(f"Import failed: {e}")
+        return None
+    finally:
+        close_database(conn)
+        
+    return records_added, delays_added, valid - records_added - delays_added, errors
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    local_time = '--local-time' in args
+    if local_time:
+        args.remove('--local-time')
+    if len(args) != 1:
+        print("Usage: python importer.py [--local-time] <file.csv|file.jsonl|performance.db>")
+    else:
+        result = import_data(args[0], local_time=local_time)
+        if result:
+            records, delays, skipped, errors = result
+            print(f"Imported {records} records and {delays} delays; {skipped} already stored.")
+            for position, message in errors[:20]:
+                print(f"  Row {position}: {message}")
+            if len(errors) > 20:
+                print(f"  ... and {len(errors) - 20} more invalid rows")
@@ -1,6 +1,11 @@
-import sqlite3
 import os
-from datetime import datetime
+from db_connection import DB_PATH, connect_database, close_database, run_in_batches
+from rollups import init_rollups
+from delay_stats import init_delay_stats
+from backups import snapshot_database, prune_backups
+
+# Rows per committed batch when a migration backfills a column
+MIGRATION_BATCH_SIZE = 5000
 
 def init_database():
     """Initialize the SQLite database with required tables."""
@@ -9,71 +14,253 @@ def init_database():
         os.makedirs('data')
     
     # Connect to database
-    db_path = os.path.join('data', 'performance.db')
-    conn = sqlite3.connect(db_path)
+    conn = connect_database(DB_PATH)
     cursor = conn.cursor()
     
-    # Create tasks table
+    create_schema(cursor)
+    
+    # Commit changes and close connection
+    conn.commit()
+    close_database(conn)
+    print("Database initialized successfully!")
+
+def create_schema(cursor, batch_size=None, before=None):
+    """Bring the database up to the current schema; returns its schema version.
+    
+    PRAGMA user_version counts the MIGRATIONS a database has had, so each
+    step runs once per database and opening a current one costs a single
+    PRAGMA read. Each step is committed with the version it reaches.
+    Backfills run batch_size rows at a time (MIGRATION_BATCH_SIZE by
+    default), each batch committed on its own; steps are safe to repeat, so
+    an upgrade that is interrupted carries on from its last step. With
+    before, the steps stop short of that step of MIGRATIONS.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    cursor.execute("PRAGMA user_version")
+    version = cursor.fetchone()[0]
+    for step, batched in MIGRATIONS[version:]:
+        if step is before:
+            break
+        if batched:
+            step(cursor, batch_size)
+        else:
+            step(cursor)
+        version += 1
+        cursor.execute(f"PRAGMA user_version = {version}")
+        cursor.connection.commit()
+    return version
+
+def open_database(db_path=DB_PATH, before=None):
+    """Open db_path with connect_database and bring it up to the current schema.
+    
+    The command-line tools open databases this way, so they also work on
+    a file the upgraded app hasn't opened yet. before is passed on to
+    create_schema.
+    """
+    conn = connect_database(db_path)
+    create_schema(conn.cursor(), before=before)
+    return conn
+
+def create_tables(cursor):
+    """Create the tasks, performance_records and delays tables if they are missing."""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tasks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
-            target_time INTEGER NOT NULL,
+            target_time REAL NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
     
-    # Create performance records table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS performance_records (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             task_id INTEGER,
-            start_time TEXT,
-            end_time TEXT,
-            actual_time INTEGER NOT NULL,
+            actual_time REAL NOT NULL,
             performance_percentage REAL NOT NULL,
             notes TEXT,
+            start_time TEXT,
+            end_time TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            record_day TEXT,
+            created_epoch INTEGER,
             FOREIGN KEY (task_id) REFERENCES tasks (id)
         )
     ''')
     
-    # Create delays table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS delays (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             task_id INTEGER,
-            delay_time INTEGER NOT NULL,
+            delay_time REAL NOT NULL,
             reason TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_epoch INTEGER,
+            reason_id INTEGER REFERENCES delay_reasons (id),
             FOREIGN KEY (task_id) REFERENCES tasks (id)
         )
     ''')
+
+def migrate_record_day(cursor, batch_size=None):
+    """Add the indexed record_day column and backfill rows that don't have it yet.
     
-    # Commit changes and close connection
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully!")
+    Period queries filter on record_day ranges instead of DATE(created_at),
+    so SQLite can answer them from the index instead of scanning the table.
+    A trigger fills it in for writers that don't set it. batch_size works
+    as in run_in_batches.
+    """
+    cursor.execute("PRAGMA table_info(performance_records)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'record_day' not in columns:
+        cursor.execute("ALTER TABLE performance_records ADD COLUMN record_day TEXT")
+    
+    run_in_batches(cursor, 'performance_records', '''
+        UPDATE performance_records SET record_day = DATE(created_at)
+        WHERE id >= :start AND id < :stop AND record_day IS NULL
+    ''', batch_size)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_performance_records_record_day
+        ON performance_records (record_day, created_at)
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS performance_records_record_day
+        AFTER INSERT ON performance_records
+        WHEN NEW.record_day IS NULL
+        BEGIN
+            UPDATE performance_records SET record_day = DATE(NEW.created_at)
+            WHERE id = NEW.id;
+        END
+    ''')
+
+def migrate_created_at_index(cursor):
+    """Index created_at so the records list can page through history by key.
+    
+    Exports read delays in created_at order as well.
+    """
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_performance_records_created_at
+        ON performance_records (created_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_delays_created_at
+        ON delays (created_at)
+    ''')
+
+def migrate_task_timeline_index(cursor):
+    """Index a task's records by created_at so its timeline can page by key."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_performance_records_task_created
+        ON performance_records (task_id, created_at)
+    ''')
+
+def migrate_created_epoch(cursor, batch_size=None):
+    """Store created_at as integer epoch seconds next to the text column.
+    
+    List screens format created_epoch with time_format instead of parsing
+    created_at with strptime for every row they render. The app's inserts
+    set it directly and a trigger fills it in for writers that don't.
+    batch_size works as in run_in_batches.
+    """
+    for table in ('performance_records', 'delays'):
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [col[1] for col in cursor.fetchall()]
+        if 'created_epoch' not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN created_epoch INTEGER")
+        run_in_batches(cursor, table, f'''
+            UPDATE {table} SET created_epoch = CAST(STRFTIME('%s', created_at) AS INTEGER)
+            WHERE id >= :start AND id < :stop AND created_epoch IS NULL
+        ''', batch_size)
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_created_epoch
+            AFTER INSERT ON {table}
+            WHEN NEW.created_epoch IS NULL
+            BEGIN
+                UPDATE {table} SET created_epoch = CAST(STRFTIME('%s', NEW.created_at) AS INTEGER)
+                WHERE id = NEW.id;
+            END
+        ''')
+
+def migrate_unique_tasks(cursor):
+    """Make tasks unique per (name, target_time) so ingest can upsert them.
+    
+    Older databases may hold the same task more than once; their records and
+    delays are moved to the oldest copy and the rest are dropped first.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_tasks_name_target'")
+    if cursor.fetchone():
+        return
+    
+    for table in ('performance_records', 'delays'):
+        cursor.execute(f'''
+            UPDATE {table} SET task_id = (
+                SELECT MIN(keep.id) FROM tasks AS dup
+                JOIN tasks AS keep ON keep.name = dup.name AND keep.target_time = dup.target_time
+                WHERE dup.id = {table}.task_id
+            )
+            WHERE task_id IN (
+                SELECT id FROM tasks
+                WHERE id NOT IN (SELECT MIN(id) FROM tasks GROUP BY name, target_time)
+            )
+        ''')
+    cursor.execute("DELETE FROM tasks WHERE id NOT IN (SELECT MIN(id) FROM tasks GROUP BY name, target_time)")
+    cursor.execute("CREATE UNIQUE INDEX idx_tasks_name_target ON tasks (name, target_time)")
+
+# Records that repeat an older record's task name, start and end on the same day,
+# whatever the task's target time, as the app has always told duplicates apart.
+# Rows missing any of those (task detail entries have no times) never clash.
+DUPLICATE_RECORDS = '''
+    task_id IS NOT NULL AND start_time IS NOT NULL AND end_time IS NOT NULL
+    AND record_day IS NOT NULL
+    AND id NOT IN (
+        SELECT MIN(p.id) FROM performance_records p LEFT JOIN tasks t ON p.task_id = t.id
+        GROUP BY COALESCE(t.name, p.task_id), p.start_time, p.end_time, p.record_day
+    )
+'''
+
+def migrate_unique_records(cursor):
+    """Prevent duplicate records with a unique (task, start, end, day) index.
+    
+    Existing duplicates, by task name as in DUPLICATE_RECORDS, are collapsed
+    to their oldest record in one DELETE before the index is built. The
+    index only covers one task id; ingest checks the name across target
+    times. Returns how many records were removed.
+    """
+    cursor.execute(f"DELETE FROM performance_records WHERE {DUPLICATE_RECORDS}")
+    removed = cursor.rowcount
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_performance_records_unique
+        ON performance_records (task_id, start_time, end_time, record_day)
+    ''')
+    return removed
+
+# Every schema change in order, with whether it takes a batch size. A
+# database's user_version is how many it has had, so new steps are only
+# ever appended; changing or reordering one would skip it on some devices.
+MIGRATIONS = (
+    (create_tables, False),
+    (migrate_record_day, True),
+    (migrate_created_at_index, False),
+    (migrate_task_timeline_index, False),
+    (migrate_created_epoch, True),
+    (migrate_unique_tasks, False),
+    (migrate_unique_records, False),
+    (init_rollups, True),
+    (init_delay_stats, True),
+)
 
 def create_backup():
     """Create a backup of the database."""
-    db_path = os.path.join('data', 'performance.db')
+    db_path = DB_PATH
     if not os.path.exists(db_path):
         print("No database to backup.")
         return
     
-    backup_dir = 'backups'
-    os.makedirs(backup_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = os.path.join(backup_dir, f'performance_{timestamp}.db')
-    
-    # Copy the database file
-    with open(db_path, 'rb') as source:
-        with open(backup_path, 'wb') as target:
-            target.write(source.read())
-    
-    print(f"Database backed up to: {backup_path}")
+    # Only the chunks that changed since the last snapshot are written
+    manifest_path = snapshot_database(db_path)
+    if manifest_path:
+        print(f"Database snapshot saved to: {manifest_path}")
+        prune_backups()
 
 if __name__ == '__main__':
     print("Initializing Performance Tracker Database...")
@@ -0,0 +1,75 @@
+"""
+Keyed list reconciliation for the list screens.
+
+Creating Kivy widgets is the expensive part of showing a list, so instead
+of clearing a list and building every row again, a screen describes the
+rows it wants as (key, widget class, properties) and KeyedList brings the
+list in line with them. A key that is already shown keeps its widget and
+only has changed properties set, keys that are gone lose their widget and
+only new keys create one. Showing the same rows again touches no widgets.
+"""
+
+class KeyedList:
+    """The rows of a list widget, kept in sync with keyed row descriptions."""
+    
+    def __init__(self, container):
+        self.container = container
+        # key -> (widget, properties) of every row shown
+        self._rows = {}
+        # keys of the rows shown, top to bottom
+        self._order = []
+        
+    def __len__(self):
+        return len(self._order)
+        
+    def widget(self, key):
+        """The widget showing the row with this key, or None."""
+        row = self._rows.get(key)
+        return row[0] if row else None
+        
+    def update(self, rows):
+        """Show rows, given top to bottom as (key, widget class, properties dict).
+        
+        Keys must be unique. Returns (created, updated, removed), the number
+        of widgets built, changed and taken out of the list.
+        """
+        wanted = {key: (widget_class, properties) for key, widget_class, properties in rows}
+        keys = [key for key, _, _ in rows]
+        
+        # Drop rows that are gone or now need a different kind of widget
+        removed = 0
+        for key in self._order:
+            widget = self._rows[key][0]
+            if key not in wanted or type(widget) is not wanted[key][0]:
+                self.container.remove_widget(widget)
+                del self._rows[key]
+                removed += 1
+        shown = [key for key in self._order if key in self._rows]
+        
+        created = updated = 0
+        for position, key in enumerate(keys):
+            widget_class, properties = wanted[key]
+            row = self._rows.get(key)
+            if row is None:
+                widget = widget_class(**properties)
+                created += 1
+            else:
+                widget, old_properties = row
+                if properties != old_properties:
+                    for name, value in properties.items():
+                        if old_properties.get(name) != value:
+                            setattr(widget, name, value)
+                    updated += 1
+            self._rows[key] = (widget, properties)
+            
+            if position < len(shown) and shown[position] == key:
+                continue
+            # Kivy keeps children bottom first, so display position p is index len - p
+            if widget.parent is self.container:
+                self.container.remove_widget(widget)
+                shown.remove(key)
+            self.container.add_widget(widget, index=len(shown) - position)
+            shown.insert(position, key)
+            
+        self._order = keys
+        return created, updated, removed
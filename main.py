@@ -1,113 +1,135 @@
-from kivymd.app import MDApp
-from kivymd.uix.screen import MDScreen
-from kivymd.uix.button import MDRaisedButton, MDFlatButton
-from kivymd.uix.textfield import MDTextField
-from kivymd.uix.label import MDLabel
-from kivymd.uix.card import MDCard
-from kivymd.uix.list import MDList, OneLineListItem, TwoLineListItem
-from kivymd.uix.scrollview import MDScrollView
-from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.screenmanager import MDScreenManager
-from kivymd.uix.gridlayout import MDGridLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.utils import platform
-import shutil
-from datetime import datetime, timedelta
-import sqlite3
+from startup import timed, lazy_import, report, ENABLED as STARTUP_REPORT
+
+# Only what the home screen needs is imported up front; every other screen
+# lives in its own module and is imported when it is first shown
+with timed("import kivymd.app"):
+    from kivymd.app import MDApp
+with timed("import home screen widgets"):
+    from kivymd.uix.screen import MDScreen
+    from kivymd.uix.button import MDRaisedButton, MDFlatButton
+    from kivymd.uix.label import MDLabel
+    from kivymd.uix.card import MDCard
+    from kivymd.uix.boxlayout import MDBoxLayout
+    from kivymd.uix.screenmanager import MDScreenManager
+    from kivy.clock import Clock
+from datetime import datetime
+from functools import partial
 import os
-import calendar
+import threading
+with timed("import database modules"):
+    from init_db import create_schema
+    from db_connection import DB_PATH
+    from db_worker import DatabaseWorker, CachedQuery
+    from backups import daily_backup
+    from queries import fetch_summaries
+    import tracing
+    from tracing import traced
+
+# Screen name -> (module, class) of the screens built on first navigation
+SCREENS = {
+    'add_record': ('add_record', 'AddRecordScreen'),
+    'records': ('records_screen', 'RecordsScreen'),
+    'daily_details': ('period_details', 'DailyDetailsScreen'),
+    'weekly_details': ('period_details', 'WeeklyDetailsScreen'),
+    'monthly_details': ('period_details', 'MonthlyDetailsScreen'),
+}
+
+class LazyScreenManager(MDScreenManager):
+    """Screen manager that builds registered screens the first time they're needed."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.factories = {}
+        
+    def register(self, name, factory):
+        """Register factory(name) to build the screen called name on first use."""
+        self.factories[name] = factory
+        
+    def has_screen(self, name):
+        return name in self.factories or super().has_screen(name)
+        
+    def get_screen(self, name):
+        # Setting current goes through get_screen, so navigation builds screens too
+        factory = self.factories.pop(name, None)
+        if factory:
+            with timed(f"build {name} screen"):
+                self.add_widget(factory(name))
+        return super().get_screen(name)
 
 class PerformanceTrackerApp(MDApp):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.database = None
+        self.db_worker = None
         self.init_database()
         
     def init_database(self):
-        """Initialize SQLite database and create tables if they don't exist."""
+        """Start the database worker and create tables if they don't exist."""
         if not os.path.exists('data'):
             os.makedirs('data')
-        db_path = os.path.join('data', 'performance.db')
-        self.database = sqlite3.connect(db_path)
-        cursor = self.database.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                target_time REAL NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                actual_time REAL NOT NULL,
-                performance_percentage REAL NOT NULL,
-                notes TEXT,
-                start_time TEXT,
-                end_time TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS delays (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                delay_time REAL NOT NULL,
-                reason TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
-        
-        self.database.commit()
+        self.db_worker = DatabaseWorker(DB_PATH)
+        
+        # The worker runs jobs in order, so this finishes before any screen query
+        self.db_worker.submit(create_schema, self.start_backup, commit=True)
+    
+    def start_backup(self, *args):
+        """Take today's backup on its own thread and connection once the schema is ready."""
+        threading.Thread(target=daily_backup, args=(DB_PATH,), name="DailyBackup", daemon=True).start()
+    
+    def on_start(self):
+        if STARTUP_REPORT:
+            # Runs once the first frame is drawn
+            Clock.schedule_once(lambda dt: report("Time to first frame"))
+        if tracing.ENABLED:
+            self.trace_hud = lazy_import('trace_hud').TraceHud()
+            self.trace_hud.watch(self.home_screen.title_label)
+            
+    def on_stop(self):
+        self.db_worker.close()
+        if STARTUP_REPORT:
+            report("Startup timing at exit")
+        if tracing.ENABLED:
+            count = tracing.dump_chrome_trace()
+            print(f"Trace of {count} spans written to: {tracing.TRACE_FILE}")
+            tracing.report()
         
     def build(self):
         self.theme_cls.primary_palette = "Blue"
         self.theme_cls.theme_style = "Light"
         
-        self.screen_manager = MDScreenManager()
-        self.home_screen = HomeScreen(self.database, name="home")
-        self.add_record_screen = AddRecordScreen(self.database, name="add_record")
-        self.records_screen = RecordsScreen(self.database, name="records")
-        self.daily_details_screen = DailyDetailsScreen(self.database, name="daily_details")
-        self.weekly_details_screen = WeeklyDetailsScreen(self.database, name="weekly_details")
-        self.monthly_details_screen = MonthlyDetailsScreen(self.database, name="monthly_details")
-        
+        self.screen_manager = LazyScreenManager()
+        with timed("build home screen"):
+            self.home_screen = HomeScreen(self.db_worker, name="home")
         self.screen_manager.add_widget(self.home_screen)
-        self.screen_manager.add_widget(self.add_record_screen)
-        self.screen_manager.add_widget(self.records_screen)
-        self.screen_manager.add_widget(self.daily_details_screen)
-        self.screen_manager.add_widget(self.weekly_details_screen)
-        self.screen_manager.add_widget(self.monthly_details_screen)
+        
+        for name, (module_name, class_name) in SCREENS.items():
+            self.screen_manager.register(name, partial(self.build_screen, module_name, class_name))
         
         return self.screen_manager
+        
+    def build_screen(self, module_name, class_name, name):
+        """Import a screen's module and build the screen."""
+        screen_class = getattr(lazy_import(module_name), class_name)
+        return screen_class(self.db_worker, name=name)
 
 class HomeScreen(MDScreen):
-    def __init__(self, database, **kwargs):
+    def __init__(self, db_worker, **kwargs):
         super().__init__(**kwargs)
-        self.database = database
-        self._is_updating = False
+        self.db_worker = db_worker
+        self.summaries = CachedQuery(db_worker)
         self.setup_ui()
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', padding=20, spacing=20)
         
-        # Title
-        title = MDLabel(
+        # Title; with tracing on, five quick taps show the trace overlay
+        self.title_label = MDLabel(
             text="Performance Tracker",
             halign="center",
             font_style="H3",
             size_hint_y=None,
             height=80
         )
-        layout.add_widget(title)
+        layout.add_widget(self.title_label)
         
         # Summary Cards Container
         cards_layout = MDBoxLayout(orientation='vertical', spacing=15, size_hint_y=None, height=420)
@@ -211,52 +233,25 @@ class HomeScreen(MDScreen):
         return card
         
     def on_enter(self):
-        # Prevent multiple simultaneous updates
-        if not self._is_updating:
-            self.update_summaries()
+        self.update_summaries()
         
+    @traced
     def update_summaries(self):
-        # Prevent multiple simultaneous updates
-        if self._is_updating:
-            return
+        # Calculate daily, weekly, monthly summaries from the per-day rollups;
+        # a newer request replaces one still waiting in the worker, and
+        # nothing is queried while the data is unchanged since the last visit
+        today = datetime.now().date()
+        show = partial(self.summaries_loaded, tracing.started())
+        self.summaries.load(today, partial(fetch_summaries, today=today), show, key=self)
         
-        self._is_updating = True
+    def summaries_loaded(self, start, summaries):
+        # Time from asking to drawn, including the wait for the worker and the query
+        self.show_summaries(summaries)
+        tracing.record_since("HomeScreen.update_summaries round trip", start)
         
-        # Calculate and update daily, weekly, monthly summaries
-        cursor = self.database.cursor()
-        
-        # Daily summary
-        today = datetime.now().date()
-        cursor.execute("""
-            SELECT AVG(performance_percentage), COUNT(*) 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) = ?
-        """, (str(today),))
-        daily_result = cursor.fetchone()
-        daily_perf = daily_result[0] if daily_result[0] else 0
-        daily_count = daily_result[1] if daily_result[1] else 0
-        
-        # Weekly summary
-        week_start = today - timedelta(days=today.weekday())
-        cursor.execute("""
-            SELECT AVG(performance_percentage), COUNT(*) 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) >= ?
-        """, (str(week_start),))
-        weekly_result = cursor.fetchone()
-        weekly_perf = weekly_result[0] if weekly_result[0] else 0
-        weekly_count = weekly_result[1] if weekly_result[1] else 0
-        
-        # Monthly summary
-        month_start = today.replace(day=1)
-        cursor.execute("""
-            SELECT AVG(performance_percentage), COUNT(*) 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) >= ?
-        """, (str(month_start),))
-        monthly_result = cursor.fetchone()
-        monthly_perf = monthly_result[0] if monthly_result[0] else 0
-        monthly_count = monthly_result[1] if monthly_result[1] else 0
+    @traced
+    def show_summaries(self, summaries):
+        (daily_perf, daily_count), (weekly_perf, weekly_count), (monthly_perf, monthly_count) = summaries
         
         # Update card contents
         try:
@@ -270,8 +265,7 @@ class HomeScreen(MDScreen):
             self.monthly_card.children[0].children[1].text = f"{monthly_count} records"
         except Exception as e:
             print(f"Error updating card contents: {e}")
-        
-        self._is_updating = False
+            tracing.record_error("HomeScreen.show_summaries", e)
     
     def go_to_add_record(self, *args):
         self.manager.current = "add_record"
@@ -288,626 +282,6 @@ class HomeScreen(MDScreen):
     def go_to_monthly_details(self, *args):
         self.manager.current = "monthly_details"
 
-class DailyDetailsScreen(MDScreen):
-    def __init__(self, database, **kwargs):
-        super().__init__(**kwargs)
-        self.database = database
-        self.current_date = datetime.now().date()
-        self._is_loading = False
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        # Back button
-        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
-        layout.add_widget(back_btn)
-        
-        # Title and date navigation
-        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
-        prev_btn = MDFlatButton(text="◀", on_release=self.prev_day)
-        self.date_label = MDLabel(text="", halign="center", font_style="H5")
-        next_btn = MDFlatButton(text="▶", on_release=self.next_day)
-        nav_layout.add_widget(prev_btn)
-        nav_layout.add_widget(self.date_label)
-        nav_layout.add_widget(next_btn)
-        layout.add_widget(nav_layout)
-        
-        # Today button
-        today_btn = MDFlatButton(text="Today", on_release=self.go_to_today)
-        layout.add_widget(today_btn)
-        
-        # Performance summary for the day
-        self.summary_label = MDLabel(
-            text="",
-            halign="center",
-            font_style="H6",
-            size_hint_y=None,
-            height=40
-        )
-        layout.add_widget(self.summary_label)
-        
-        # Records list
-        scroll = ScrollView()
-        self.record_list = MDList()
-        scroll.add_widget(self.record_list)
-        layout.add_widget(scroll)
-        
-        self.add_widget(layout)
-        
-    def on_enter(self):
-        if not self._is_loading:
-            self.update_display()
-        
-    def update_display(self):
-        if self._is_loading:
-            return
-        
-        self._is_loading = True
-        self.date_label.text = self.current_date.strftime("%A, %B %d, %Y")
-        self.load_records_for_date()
-        self._is_loading = False
-        
-    def load_records_for_date(self):
-        # Ensure we clear the list first to prevent duplicates
-        self.record_list.clear_widgets()
-        
-        cursor = self.database.cursor()
-        cursor.execute("""
-            SELECT t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) = ?
-            ORDER BY p.created_at DESC
-        """, (str(self.current_date),))
-        
-        records = cursor.fetchall()
-        
-        if records:
-            total_perf = sum(record[5] for record in records)
-            avg_perf = total_perf / len(records)
-            self.summary_label.text = f"Daily Summary: {len(records)} records, {avg_perf:.1f}% avg performance"
-            
-            for name, target_time, start_time, end_time, actual_time, performance, created_at in records:
-                time_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%H:%M')
-                item = TwoLineListItem(
-                    text=f"{name} | {start_time}-{end_time} | Perf: {performance:.1f}%",
-                    secondary_text=f"Target: {target_time:.1f} min | Actual: {actual_time:.1f} min | Added: {time_str}"
-                )
-                self.record_list.add_widget(item)
-        else:
-            self.summary_label.text = "No records for this date"
-            
-    def prev_day(self, *args):
-        self.current_date -= timedelta(days=1)
-        self.update_display()
-        
-    def next_day(self, *args):
-        self.current_date += timedelta(days=1)
-        self.update_display()
-        
-    def go_to_today(self, *args):
-        self.current_date = datetime.now().date()
-        self.update_display()
-        
-    def go_back(self, *args):
-        self.manager.current = "home"
-
-class WeeklyDetailsScreen(MDScreen):
-    def __init__(self, database, **kwargs):
-        super().__init__(**kwargs)
-        self.database = database
-        self.current_week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
-        self._is_loading = False
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        # Back button
-        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
-        layout.add_widget(back_btn)
-        
-        # Title and week navigation
-        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
-        prev_btn = MDFlatButton(text="◀", on_release=self.prev_week)
-        self.week_label = MDLabel(text="", halign="center", font_style="H5")
-        next_btn = MDFlatButton(text="▶", on_release=self.next_week)
-        nav_layout.add_widget(prev_btn)
-        nav_layout.add_widget(self.week_label)
-        nav_layout.add_widget(next_btn)
-        layout.add_widget(nav_layout)
-        
-        # This week button
-        this_week_btn = MDFlatButton(text="This Week", on_release=self.go_to_this_week)
-        layout.add_widget(this_week_btn)
-        
-        # Performance summary for the week
-        self.summary_label = MDLabel(
-            text="",
-            halign="center",
-            font_style="H6",
-            size_hint_y=None,
-            height=40
-        )
-        layout.add_widget(self.summary_label)
-        
-        # Records list grouped by day
-        scroll = ScrollView()
-        self.record_list = MDList()
-        scroll.add_widget(self.record_list)
-        layout.add_widget(scroll)
-        
-        self.add_widget(layout)
-        
-    def on_enter(self):
-        if not self._is_loading:
-            self.update_display()
-        
-    def update_display(self):
-        if self._is_loading:
-            return
-        
-        self._is_loading = True
-        week_end = self.current_week_start + timedelta(days=6)
-        self.week_label.text = f"{self.current_week_start.strftime('%b %d')} - {week_end.strftime('%b %d, %Y')}"
-        self.load_records_for_week()
-        self._is_loading = False
-        
-    def load_records_for_week(self):
-        # Ensure we clear the list first to prevent duplicates
-        self.record_list.clear_widgets()
-        
-        cursor = self.database.cursor()
-        week_end = self.current_week_start + timedelta(days=6)
-        cursor.execute("""
-            SELECT t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) BETWEEN ? AND ?
-            ORDER BY p.created_at DESC
-        """, (str(self.current_week_start), str(week_end)))
-        
-        records = cursor.fetchall()
-        
-        if records:
-            total_perf = sum(record[5] for record in records)
-            avg_perf = total_perf / len(records)
-            self.summary_label.text = f"Weekly Summary: {len(records)} records, {avg_perf:.1f}% avg performance"
-            
-            # Group records by day
-            daily_records = {}
-            for record in records:
-                date = datetime.strptime(record[6], '%Y-%m-%d %H:%M:%S').date()
-                if date not in daily_records:
-                    daily_records[date] = []
-                daily_records[date].append(record)
-            
-            for date in sorted(daily_records.keys(), reverse=True):
-                day_records = daily_records[date]
-                day_name = date.strftime('%A, %B %d')
-                daily_avg = sum(r[5] for r in day_records) / len(day_records)
-                
-                # Day header
-                day_item = OneLineListItem(
-                    text=f"{day_name} - {len(day_records)} records, {daily_avg:.1f}% avg"
-                )
-                self.record_list.add_widget(day_item)
-                
-                # Records for this day
-                for name, target_time, start_time, end_time, actual_time, performance, created_at in day_records:
-                    time_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%H:%M')
-                    item = TwoLineListItem(
-                        text=f"  {name} | {start_time}-{end_time} | Perf: {performance:.1f}%",
-                        secondary_text=f"  Target: {target_time:.1f} min | Actual: {actual_time:.1f} min"
-                    )
-                    self.record_list.add_widget(item)
-        else:
-            self.summary_label.text = "No records for this week"
-            
-    def prev_week(self, *args):
-        self.current_week_start -= timedelta(days=7)
-        self.update_display()
-        
-    def next_week(self, *args):
-        self.current_week_start += timedelta(days=7)
-        self.update_display()
-        
-    def go_to_this_week(self, *args):
-        self.current_week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
-        self.update_display()
-        
-    def go_back(self, *args):
-        self.manager.current = "home"
-
-class MonthlyDetailsScreen(MDScreen):
-    def __init__(self, database, **kwargs):
-        super().__init__(**kwargs)
-        self.database = database
-        self.current_month = datetime.now().date().replace(day=1)
-        self._is_loading = False
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        # Back button
-        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
-        layout.add_widget(back_btn)
-        
-        # Title and month navigation
-        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
-        prev_btn = MDFlatButton(text="◀", on_release=self.prev_month)
-        self.month_label = MDLabel(text="", halign="center", font_style="H5")
-        next_btn = MDFlatButton(text="▶", on_release=self.next_month)
-        nav_layout.add_widget(prev_btn)
-        nav_layout.add_widget(self.month_label)
-        nav_layout.add_widget(next_btn)
-        layout.add_widget(nav_layout)
-        
-        # This month button
-        this_month_btn = MDFlatButton(text="This Month", on_release=self.go_to_this_month)
-        layout.add_widget(this_month_btn)
-        
-        # Performance summary for the month
-        self.summary_label = MDLabel(
-            text="",
-            halign="center",
-            font_style="H6",
-            size_hint_y=None,
-            height=40
-        )
-        layout.add_widget(self.summary_label)
-        
-        # Records list grouped by week
-        scroll = ScrollView()
-        self.record_list = MDList()
-        scroll.add_widget(self.record_list)
-        layout.add_widget(scroll)
-        
-        self.add_widget(layout)
-        
-    def on_enter(self):
-        if not self._is_loading:
-            self.update_display()
-        
-    def update_display(self):
-        if self._is_loading:
-            return
-        
-        self._is_loading = True
-        self.month_label.text = self.current_month.strftime('%B %Y')
-        self.load_records_for_month()
-        self._is_loading = False
-        
-    def load_records_for_month(self):
-        # Ensure we clear the list first to prevent duplicates
-        self.record_list.clear_widgets()
-        
-        cursor = self.database.cursor()
-        
-        # Calculate month end
-        if self.current_month.month == 12:
-            month_end = self.current_month.replace(year=self.current_month.year + 1, month=1) - timedelta(days=1)
-        else:
-            month_end = self.current_month.replace(month=self.current_month.month + 1) - timedelta(days=1)
-            
-        cursor.execute("""
-            SELECT t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            WHERE DATE(p.created_at) BETWEEN ? AND ?
-            ORDER BY p.created_at DESC
-        """, (str(self.current_month), str(month_end)))
-        
-        records = cursor.fetchall()
-        
-        if records:
-            total_perf = sum(record[5] for record in records)
-            avg_perf = total_perf / len(records)
-            self.summary_label.text = f"Monthly Summary: {len(records)} records, {avg_perf:.1f}% avg performance"
-            
-            # Group records by week
-            weekly_records = {}
-            for record in records:
-                date = datetime.strptime(record[6], '%Y-%m-%d %H:%M:%S').date()
-                week_start = date - timedelta(days=date.weekday())
-                if week_start not in weekly_records:
-                    weekly_records[week_start] = []
-                weekly_records[week_start].append(record)
-            
-            for week_start in sorted(weekly_records.keys(), reverse=True):
-                week_records = weekly_records[week_start]
-                week_end = week_start + timedelta(days=6)
-                weekly_avg = sum(r[5] for r in week_records) / len(week_records)
-                
-                # Week header
-                week_item = OneLineListItem(
-                    text=f"Week {week_start.strftime('%b %d')} - {week_end.strftime('%b %d')}: {len(week_records)} records, {weekly_avg:.1f}% avg"
-                )
-                self.record_list.add_widget(week_item)
-                
-                # Sample records for this week (showing first 3)
-                for i, (name, target_time, start_time, end_time, actual_time, performance, created_at) in enumerate(week_records[:3]):
-                    date_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%m/%d')
-                    item = TwoLineListItem(
-                        text=f"  {date_str} {name} | Perf: {performance:.1f}%",
-                        secondary_text=f"  {start_time}-{end_time} | Target: {target_time:.1f} | Actual: {actual_time:.1f}"
-                    )
-                    self.record_list.add_widget(item)
-                
-                if len(week_records) > 3:
-                    more_item = OneLineListItem(text=f"  ... and {len(week_records) - 3} more records")
-                    self.record_list.add_widget(more_item)
-        else:
-            self.summary_label.text = "No records for this month"
-            
-    def prev_month(self, *args):
-        if self.current_month.month == 1:
-            self.current_month = self.current_month.replace(year=self.current_month.year - 1, month=12)
-        else:
-            self.current_month = self.current_month.replace(month=self.current_month.month - 1)
-        self.update_display()
-        
-    def next_month(self, *args):
-        if self.current_month.month == 12:
-            self.current_month = self.current_month.replace(year=self.current_month.year + 1, month=1)
-        else:
-            self.current_month = self.current_month.replace(month=self.current_month.month + 1)
-        self.update_display()
-        
-    def go_to_this_month(self, *args):
-        self.current_month = datetime.now().date().replace(day=1)
-        self.update_display()
-        
-    def go_back(self, *args):
-        self.manager.current = "home"
-
-class AddRecordScreen(MDScreen):
-    def __init__(self, database, **kwargs):
-        super().__init__(**kwargs)
-        self.database = database
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=20)
-        
-        # Back button
-        back_btn = MDFlatButton(
-            text="← Back to Home",
-            on_release=self.go_back
-        )
-        layout.add_widget(back_btn)
-        
-        # Title
-        title = MDLabel(
-            text="Add Today's Record",
-            halign="center",
-            font_style="H4",
-            size_hint_y=None,
-            height=60
-        )
-        layout.add_widget(title)
-        
-        # Auto-generated task name (read-only)
-        self.task_name_label = MDLabel(
-            text="",
-            halign="center",
-            font_style="H6",
-            size_hint_y=None,
-            height=40
-        )
-        layout.add_widget(self.task_name_label)
-        
-        # Input fields
-        input_layout = MDBoxLayout(orientation='vertical', spacing=15, size_hint_y=None, height=250)
-        
-        self.target_time = MDTextField(
-            hint_text="Target Duration (minutes)",
-            helper_text="Enter target duration (decimals allowed: 11.5)",
-            helper_text_mode="on_error",
-            input_filter="float",
-            size_hint_y=None,
-            height=60
-        )
-        
-        self.start_time = MDTextField(
-            hint_text="Start Time (HH:MM)",
-            helper_text="e.g. 08:00",
-            helper_text_mode="on_error",
-            size_hint_y=None,
-            height=60
-        )
-        
-        self.finish_time = MDTextField(
-            hint_text="Finish Time (HH:MM)",
-            helper_text="e.g. 09:15",
-            helper_text_mode="on_error",
-            size_hint_y=None,
-            height=60
-        )
-        
-        input_layout.add_widget(self.target_time)
-        input_layout.add_widget(self.start_time)
-        input_layout.add_widget(self.finish_time)
-        
-        layout.add_widget(input_layout)
-        
-        # Add Record button
-        add_btn = MDRaisedButton(
-            text="Add Record",
-            size_hint_y=None,
-            height=60,
-            on_release=self.add_record
-        )
-        layout.add_widget(add_btn)
-        
-        self.add_widget(layout)
-        
-    def on_enter(self):
-        # Generate task name when screen is entered
-        now = datetime.now()
-        weekday = calendar.day_abbr[now.weekday()]
-        date_str = now.strftime("%d.%m")
-        task_name = f"{weekday}{date_str}"
-        self.task_name_label.text = f"Task: {task_name}"
-        
-    def add_record(self, *args):
-        # Prevent double-clicking by disabling button temporarily
-        add_btn = None
-        for child in self.children[0].children:
-            if hasattr(child, 'text') and child.text == "Add Record":
-                add_btn = child
-                break
-        
-        if add_btn:
-            add_btn.disabled = True
-        
-        target_time = self.target_time.text.strip()
-        start_time = self.start_time.text.strip()
-        finish_time = self.finish_time.text.strip()
-        
-        if not target_time or not start_time or not finish_time:
-            if add_btn:
-                add_btn.disabled = False
-            self.show_dialog("Error", "Please fill in all fields")
-            return
-            
-        try:
-            target_time = float(target_time)
-            start_dt = datetime.strptime(start_time, "%H:%M")
-            finish_dt = datetime.strptime(finish_time, "%H:%M")
-            if finish_dt < start_dt:
-                finish_dt = finish_dt.replace(day=start_dt.day + 1)
-            actual_duration = (finish_dt - start_dt).total_seconds() / 60.0
-            performance_percentage = (target_time / actual_duration) * 100 if actual_duration > 0 else 0
-        except Exception as e:
-            if add_btn:
-                add_btn.disabled = False
-            self.show_dialog("Error", f"Invalid input: {e}")
-            return
-            
-        # Generate task name
-        now = datetime.now()
-        weekday = calendar.day_abbr[now.weekday()]
-        date_str = now.strftime("%d.%m")
-        task_name = f"{weekday}{date_str}"
-        
-        cursor = self.database.cursor()
-        
-        # Check for duplicate records for today with same task name and times
-        today_date = now.strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT COUNT(*) FROM performance_records p 
-            JOIN tasks t ON p.task_id = t.id 
-            WHERE t.name = ? AND p.start_time = ? AND p.end_time = ? 
-            AND DATE(p.created_at) = ?
-        """, (task_name, start_time, finish_time, today_date))
-        
-        if cursor.fetchone()[0] > 0:
-            if add_btn:
-                add_btn.disabled = False
-            self.show_dialog("Duplicate Record", "A record with the same task name and times already exists for today!")
-            return
-        
-        cursor.execute("SELECT id FROM tasks WHERE name = ? AND target_time = ?", (task_name, target_time))
-        row = cursor.fetchone()
-        if row:
-            task_id = row[0]
-        else:
-            cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", (task_name, target_time))
-            task_id = cursor.lastrowid
-            
-        cursor.execute(
-            "INSERT INTO performance_records (task_id, actual_time, performance_percentage, notes, start_time, end_time) VALUES (?, ?, ?, ?, ?, ?)",
-            (task_id, actual_duration, performance_percentage, "Manual entry", start_time, finish_time)
-        )
-        self.database.commit()
-        
-        self.target_time.text = ""
-        self.start_time.text = ""
-        self.finish_time.text = ""
-        
-        if add_btn:
-            add_btn.disabled = False
-        
-        self.show_dialog("Success", f"Record added!\nActual: {actual_duration:.2f} min\nPerformance: {performance_percentage:.1f}%")
-        
-    def go_back(self, *args):
-        self.manager.current = "home"
-        
-    def show_dialog(self, title, text):
-        dialog = MDDialog(
-            title=title,
-            text=text,
-            buttons=[MDFlatButton(text="OK", on_release=lambda x: dialog.dismiss())]
-        )
-        dialog.open()
-
-class RecordsScreen(MDScreen):
-    def __init__(self, database, **kwargs):
-        super().__init__(**kwargs)
-        self.database = database
-        self._is_loading = False
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        # Back button
-        back_btn = MDFlatButton(
-            text="← Back to Home",
-            on_release=self.go_back
-        )
-        layout.add_widget(back_btn)
-        
-        # Title
-        title = MDLabel(
-            text="All Performance Records",
-            halign="center",
-            font_style="H5",
-            size_hint_y=None,
-            height=50
-        )
-        layout.add_widget(title)
-        
-        # Records list
-        scroll = ScrollView()
-        self.record_list = MDList()
-        scroll.add_widget(self.record_list)
-        layout.add_widget(scroll)
-        
-        self.add_widget(layout)
-        
-    def on_enter(self):
-        if not self._is_loading:
-            self.load_records()
-        
-    def load_records(self):
-        if self._is_loading:
-            return
-        
-        self._is_loading = True
-        
-        # Ensure we clear the list first to prevent duplicates
-        self.record_list.clear_widgets()
-        
-        cursor = self.database.cursor()
-        cursor.execute("""
-            SELECT t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at 
-            FROM performance_records p JOIN tasks t ON p.task_id = t.id 
-            ORDER BY p.created_at DESC
-        """)
-        
-        for name, target_time, start_time, end_time, actual_time, performance, created_at in cursor.fetchall():
-            date_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
-            item = OneLineListItem(
-                text=f"{name} ({date_str}) | {start_time}-{end_time} | Target: {target_time:.1f} | Actual: {actual_time:.1f} | Perf: {performance:.1f}%"
-            )
-            self.record_list.add_widget(item)
-        
-        self._is_loading = False
-        
-    def go_back(self, *args):
-        self.manager.current = "home"
-
 if __name__ == '__main__':
     if not os.path.exists('data/performance.db'):
         from init_db import init_database
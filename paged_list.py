@@ -0,0 +1,98 @@
+"""
+Keyset-paged lists for the screens that show a long history.
+
+A screen mixes in PagedList, builds its list with build_paged_view() and
+describes its query: page_job(after) returns the worker job for the page
+below the entry keyed after (None for the first page), page_key(entry)
+gives an entry's key and page_row(entry) the data of its row. A page
+shorter than page_size is the last one. reload_pages() starts again from
+the top; later pages load as the user scrolls near the end, and the
+recycled view only builds widgets for the rows on screen.
+"""
+
+from kivymd.uix.list import OneLineListItem
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.clock import Clock
+from kivy.metrics import dp
+from tracing import traced
+
+class PagedList:
+    """Mixin for a screen with a RecycleView list loaded a page at a time."""
+    
+    page_size = None
+    # Printed with the error when a page fails to load
+    page_error = "Could not load the list"
+    
+    def build_paged_view(self):
+        """Create and return self.page_view, which asks for the next page as it nears the end."""
+        # page_key of each shown entry, in the same order as page_view.data
+        self.page_keys = []
+        self._has_more = True
+        self._page_pending = False
+        
+        self.page_view = RecycleView()
+        rows_layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(48)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        rows_layout.bind(minimum_height=rows_layout.setter('height'))
+        self.page_view.add_widget(rows_layout)
+        # The view class lives on the layout, so it can only be set once the layout is added
+        self.page_view.viewclass = OneLineListItem
+        self.page_view.bind(scroll_y=self.on_page_scroll)
+        return self.page_view
+        
+    @traced
+    def reload_pages(self):
+        """Empty the list and load its first page; this replaces any page still in flight."""
+        self.page_keys = []
+        self._has_more = True
+        self._page_pending = False
+        self.page_view.data = []
+        self.page_view.scroll_y = 1
+        self.load_next_page()
+        
+    @traced
+    def load_next_page(self):
+        """Load the page below the last entry shown, unless one is loading or the list is complete."""
+        if self._page_pending or not self._has_more:
+            return
+            
+        self._page_pending = True
+        after = self.page_keys[-1] if self.page_keys else None
+        self.db_worker.submit(self.page_job(after), self.show_page, key=self, on_error=self.page_failed)
+        
+    def page_failed(self, error):
+        """Let the next scroll ask again for a page that failed to load."""
+        self._page_pending = False
+        print(f"{self.page_error}: {error}")
+        
+    @traced
+    def show_page(self, entries):
+        """Append a page loaded by load_next_page to the list."""
+        self._page_pending = False
+        self._has_more = len(entries) == self.page_size
+        if not entries:
+            return
+            
+        # Growing the list changes scroll_y, so keep the rows in view where they are
+        view = self.page_view
+        scrolled = (1 - view.scroll_y) * max(view.layout_manager.height - view.height, 0)
+        view.data.extend(self.page_row(entry) for entry in entries)
+        self.page_keys.extend(self.page_key(entry) for entry in entries)
+        Clock.schedule_once(lambda dt: self.restore_scroll(scrolled))
+        
+    def restore_scroll(self, scrolled):
+        """Scroll back to where the user was before a page was appended."""
+        view = self.page_view
+        scrollable = view.layout_manager.height - view.height
+        if scrollable > 0:
+            view.scroll_y = max(0, 1 - scrolled / scrollable)
+            
+    def on_page_scroll(self, view, scroll_y):
+        """Fetch the next page before the user reaches the end of the list."""
+        if scroll_y <= 0.1:
+            self.load_next_page()
@@ -0,0 +1,353 @@
+from kivymd.uix.screen import MDScreen
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.label import MDLabel
+from kivymd.uix.list import MDList, OneLineListItem, TwoLineListItem
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivy.uix.scrollview import ScrollView
+from datetime import datetime, date, timedelta
+from functools import partial
+from time_format import format_time
+from queries import fetch_day_records, fetch_week_groups, fetch_month_groups
+from keyed_list import KeyedList
+from db_worker import CachedQuery
+from tracing import traced
+
+# Periods each screen keeps results for; the shown one and its neighbours fit with room to spare
+PERIOD_CACHE_SIZE = 9
+
+def shift_month(month, months):
+    """The first day of the month months away from month, which is a first of the month."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def month_end(month):
+    """The last day of the month starting at month."""
+    return shift_month(month, 1) - timedelta(days=1)
+
+class DailyDetailsScreen(MDScreen):
+    def __init__(self, db_worker, **kwargs):
+        super().__init__(**kwargs)
+        self.db_worker = db_worker
+        self.records = CachedQuery(db_worker, size=PERIOD_CACHE_SIZE)
+        self.current_date = datetime.now().date()
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Back button
+        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
+        layout.add_widget(back_btn)
+        
+        # Title and date navigation
+        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
+        prev_btn = MDFlatButton(text="◀", on_release=self.prev_day)
+        self.date_label = MDLabel(text="", halign="center", font_style="H5")
+        next_btn = MDFlatButton(text="▶", on_release=self.next_day)
+        nav_layout.add_widget(prev_btn)
+        nav_layout.add_widget(self.date_label)
+        nav_layout.add_widget(next_btn)
+        layout.add_widget(nav_layout)
+        
+        # Today button
+        today_btn = MDFlatButton(text="Today", on_release=self.go_to_today)
+        layout.add_widget(today_btn)
+        
+        # Performance summary for the day
+        self.summary_label = MDLabel(
+            text="",
+            halign="center",
+            font_style="H6",
+            size_hint_y=None,
+            height=40
+        )
+        layout.add_widget(self.summary_label)
+        
+        # Records list
+        scroll = ScrollView()
+        self.record_list = MDList()
+        self.rows = KeyedList(self.record_list)
+        scroll.add_widget(self.record_list)
+        layout.add_widget(scroll)
+        
+        self.add_widget(layout)
+        
+    def on_enter(self):
+        self.update_display()
+        
+    @traced
+    def update_display(self):
+        self.date_label.text = self.current_date.strftime("%A, %B %d, %Y")
+        self.load_records_for_date()
+        
+    @traced
+    def load_records_for_date(self):
+        # Rapid prev/next taps replace each other, so only the last day is drawn
+        job = partial(fetch_day_records, day=self.current_date)
+        self.records.load(self.current_date, job, self.show_records_for_date, key=self)
+        
+        # Have the neighbouring days ready before the user pages to them
+        for day in (self.current_date - timedelta(days=1), self.current_date + timedelta(days=1)):
+            self.records.prefetch(day, partial(fetch_day_records, day=day))
+    
+    @traced
+    def show_records_for_date(self, records):
+        # Rows are keyed by record id, so only changed records touch widgets
+        rows = []
+        if records:
+            total_perf = sum(record[5] for record in records)
+            avg_perf = total_perf / len(records)
+            self.summary_label.text = f"Daily Summary: {len(records)} records, {avg_perf:.1f}% avg performance"
+            
+            for name, target_time, start_time, end_time, actual_time, performance, created_epoch, record_id in records:
+                time_str = format_time(created_epoch)
+                rows.append((record_id, TwoLineListItem, {
+                    'text': f"{name} | {start_time}-{end_time} | Perf: {performance:.1f}%",
+                    'secondary_text': f"Target: {target_time:.1f} min | Actual: {actual_time:.1f} min | Added: {time_str}"
+                }))
+        else:
+            self.summary_label.text = "No records for this date"
+        self.rows.update(rows)
+            
+    def prev_day(self, *args):
+        self.current_date -= timedelta(days=1)
+        self.update_display()
+        
+    def next_day(self, *args):
+        self.current_date += timedelta(days=1)
+        self.update_display()
+        
+    def go_to_today(self, *args):
+        self.current_date = datetime.now().date()
+        self.update_display()
+        
+    def go_back(self, *args):
+        self.manager.current = "home"
+
+class WeeklyDetailsScreen(MDScreen):
+    def __init__(self, db_worker, **kwargs):
+        super().__init__(**kwargs)
+        self.db_worker = db_worker
+        self.records = CachedQuery(db_worker, size=PERIOD_CACHE_SIZE)
+        self.current_week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Back button
+        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
+        layout.add_widget(back_btn)
+        
+        # Title and week navigation
+        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
+        prev_btn = MDFlatButton(text="◀", on_release=self.prev_week)
+        self.week_label = MDLabel(text="", halign="center", font_style="H5")
+        next_btn = MDFlatButton(text="▶", on_release=self.next_week)
+        nav_layout.add_widget(prev_btn)
+        nav_layout.add_widget(self.week_label)
+        nav_layout.add_widget(next_btn)
+        layout.add_widget(nav_layout)
+        
+        # This week button
+        this_week_btn = MDFlatButton(text="This Week", on_release=self.go_to_this_week)
+        layout.add_widget(this_week_btn)
+        
+        # Performance summary for the week
+        self.summary_label = MDLabel(
+            text="",
+            halign="center",
+            font_style="H6",
+            size_hint_y=None,
+            height=40
+        )
+        layout.add_widget(self.summary_label)
+        
+        # Records list grouped by day
+        scroll = ScrollView()
+        self.record_list = MDList()
+        self.rows = KeyedList(self.record_list)
+        scroll.add_widget(self.record_list)
+        layout.add_widget(scroll)
+        
+        self.add_widget(layout)
+        
+    def on_enter(self):
+        self.update_display()
+        
+    @traced
+    def update_display(self):
+        week_end = self.current_week_start + timedelta(days=6)
+        self.week_label.text = f"{self.current_week_start.strftime('%b %d')} - {week_end.strftime('%b %d, %Y')}"
+        self.load_records_for_week()
+        
+    @traced
+    def load_records_for_week(self):
+        # Rapid prev/next taps replace each other, so only the last week is drawn
+        week_end = self.current_week_start + timedelta(days=6)
+        job = partial(fetch_week_groups, start_day=self.current_week_start, end_day=week_end)
+        self.records.load(self.current_week_start, job, self.show_records_for_week, key=self)
+        
+        # Have the neighbouring weeks ready before the user pages to them
+        for week_start in (self.current_week_start - timedelta(days=7), self.current_week_start + timedelta(days=7)):
+            job = partial(fetch_week_groups, start_day=week_start, end_day=week_start + timedelta(days=6))
+            self.records.prefetch(week_start, job)
+        
+    @traced
+    def show_records_for_week(self, day_groups):
+        # Rows are keyed by day and record id, so only changed rows touch widgets
+        rows = []
+        if day_groups:
+            # Days arrive grouped and averaged by SQL, newest first
+            total_count = sum(count for _, count, _, _ in day_groups)
+            avg_perf = sum(count * average for _, count, average, _ in day_groups) / total_count
+            self.summary_label.text = f"Weekly Summary: {total_count} records, {avg_perf:.1f}% avg performance"
+            
+            for record_day, day_count, daily_avg, day_records in day_groups:
+                day_name = date.fromisoformat(record_day).strftime('%A, %B %d')
+                
+                # Day header
+                rows.append((('day', record_day), OneLineListItem, {
+                    'text': f"{day_name} - {day_count} records, {daily_avg:.1f}% avg"
+                }))
+                
+                # Records for this day
+                for name, target_time, start_time, end_time, actual_time, performance, record_id in day_records:
+                    rows.append((record_id, TwoLineListItem, {
+                        'text': f"  {name} | {start_time}-{end_time} | Perf: {performance:.1f}%",
+                        'secondary_text': f"  Target: {target_time:.1f} min | Actual: {actual_time:.1f} min"
+                    }))
+        else:
+            self.summary_label.text = "No records for this week"
+        self.rows.update(rows)
+            
+    def prev_week(self, *args):
+        self.current_week_start -= timedelta(days=7)
+        self.update_display()
+        
+    def next_week(self, *args):
+        self.current_week_start += timedelta(days=7)
+        self.update_display()
+        
+    def go_to_this_week(self, *args):
+        self.current_week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
+        self.update_display()
+        
+    def go_back(self, *args):
+        self.manager.current = "home"
+
+class MonthlyDetailsScreen(MDScreen):
+    def __init__(self, db_worker, **kwargs):
+        super().__init__(**kwargs)
+        self.db_worker = db_worker
+        self.records = CachedQuery(db_worker, size=PERIOD_CACHE_SIZE)
+        self.current_month = datetime.now().date().replace(day=1)
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Back button
+        back_btn = MDFlatButton(text="← Back to Home", on_release=self.go_back)
+        layout.add_widget(back_btn)
+        
+        # Title and month navigation
+        nav_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=60, spacing=10)
+        prev_btn = MDFlatButton(text="◀", on_release=self.prev_month)
+        self.month_label = MDLabel(text="", halign="center", font_style="H5")
+        next_btn = MDFlatButton(text="▶", on_release=self.next_month)
+        nav_layout.add_widget(prev_btn)
+        nav_layout.add_widget(self.month_label)
+        nav_layout.add_widget(next_btn)
+        layout.add_widget(nav_layout)
+        
+        # This month button
+        this_month_btn = MDFlatButton(text="This Month", on_release=self.go_to_this_month)
+        layout.add_widget(this_month_btn)
+        
+        # Performance summary for the month
+        self.summary_label = MDLabel(
+            text="",
+            halign="center",
+            font_style="H6",
+            size_hint_y=None,
+            height=40
+        )
+        layout.add_widget(self.summary_label)
+        
+        # Records list grouped by week
+        scroll = ScrollView()
+        self.record_list = MDList()
+        self.rows = KeyedList(self.record_list)
+        scroll.add_widget(self.record_list)
+        layout.add_widget(scroll)
+        
+        self.add_widget(layout)
+        
+    def on_enter(self):
+        self.update_display()
+        
+    @traced
+    def update_display(self):
+        self.month_label.text = self.current_month.strftime('%B %Y')
+        self.load_records_for_month()
+        
+    @traced
+    def load_records_for_month(self):
+        # Rapid prev/next taps replace each other, so only the last month is drawn
+        job = partial(fetch_month_groups, start_day=self.current_month, end_day=month_end(self.current_month), shown_per_week=3)
+        self.records.load(self.current_month, job, self.show_records_for_month, key=self)
+        
+        # Have the neighbouring months ready before the user pages to them
+        for month in (shift_month(self.current_month, -1), shift_month(self.current_month, 1)):
+            job = partial(fetch_month_groups, start_day=month, end_day=month_end(month), shown_per_week=3)
+            self.records.prefetch(month, job)
+    
+    @traced
+    def show_records_for_month(self, week_groups):
+        # Rows are keyed by week and record id, so only changed rows touch widgets
+        rows = []
+        if week_groups:
+            # Weeks arrive grouped and averaged by SQL, with only the 3 records shown per week
+            total_count = sum(count for _, count, _, _ in week_groups)
+            avg_perf = sum(count * average for _, count, average, _ in week_groups) / total_count
+            self.summary_label.text = f"Monthly Summary: {total_count} records, {avg_perf:.1f}% avg performance"
+            
+            for week_start, week_count, weekly_avg, week_records in week_groups:
+                week_start = date.fromisoformat(week_start)
+                week_end = week_start + timedelta(days=6)
+                
+                # Week header
+                rows.append((('week', week_start), OneLineListItem, {
+                    'text': f"Week {week_start.strftime('%b %d')} - {week_end.strftime('%b %d')}: {week_count} records, {weekly_avg:.1f}% avg"
+                }))
+                
+                # Sample records for this week (showing first 3)
+                for date_str, name, target_time, start_time, end_time, actual_time, performance, record_id in week_records:
+                    rows.append((record_id, TwoLineListItem, {
+                        'text': f"  {date_str} {name} | Perf: {performance:.1f}%",
+                        'secondary_text': f"  {start_time}-{end_time} | Target: {target_time:.1f} | Actual: {actual_time:.1f}"
+                    }))
+                
+                if week_count > 3:
+                    rows.append((('more', week_start), OneLineListItem, {
+                        'text': f"  ... and {week_count - 3} more records"
+                    }))
+        else:
+            self.summary_label.text = "No records for this month"
+        self.rows.update(rows)
+            
+    def prev_month(self, *args):
+        self.current_month = shift_month(self.current_month, -1)
+        self.update_display()
+        
+    def next_month(self, *args):
+        self.current_month = shift_month(self.current_month, 1)
+        self.update_display()
+        
+    def go_to_this_month(self, *args):
+        self.current_month = datetime.now().date().replace(day=1)
+        self.update_display()
+        
+    def go_back(self, *args):
+        self.manager.current = "home"
@@ -6,7 +6,11 @@ Modern cross-platform app that builds to Android APK on Windows
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
-import sqlite3
+from db_connection import DB_PATH, connect_database, close_database
+from init_db import create_schema
+from ingest import resolve_task
+from queries import add_task_performance, fetch_recent_records
+from rollups import period_summary
 import os
 from datetime import datetime, timedelta
 import asyncio
@@ -27,39 +31,19 @@ class PerformanceTrackerApp(toga.App):
         """Initialize SQLite database."""
         if not os.path.exists('data'):
             os.makedirs('data')
-        self.db_path = os.path.join('data', 'performance.db')
+        self.db_path = DB_PATH
         self.init_tables()
 
     def init_tables(self):
         """Create database tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_database(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                target_time REAL NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                actual_time REAL NOT NULL,
-                performance_percentage REAL NOT NULL,
-                notes TEXT,
-                start_time TEXT,
-                end_time TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
+        # The same schema and migrations as the Kivy app, so both can open one database
+        create_schema(cursor)
         
         conn.commit()
-        conn.close()
+        close_database(conn)
 
     def setup_ui(self):
         """Setup the main user interface."""
@@ -214,37 +198,21 @@ class PerformanceTrackerApp(toga.App):
             if not task_name:
                 await self.main_window.info_dialog("Error", "Please enter a task name")
                 return
-            
-            # Calculate performance percentage
-            performance = (target_time / actual_time) * 100 if actual_time > 0 else 0
+            if actual_time <= 0:
+                await self.main_window.info_dialog("Error", "Actual time must be positive")
+                return
             
             # Save to database
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
-            # Insert or get task
-            cursor.execute(
-                "INSERT OR IGNORE INTO tasks (name, target_time) VALUES (?, ?)",
-                (task_name, target_time)
-            )
-            cursor.execute(
-                "SELECT id FROM tasks WHERE name = ? AND target_time = ?",
-                (task_name, target_time)
-            )
-            task_id = cursor.fetchone()[0]
-            
-            # Insert performance record
-            cursor.execute('''
-                INSERT INTO performance_records 
-                (task_id, actual_time, performance_percentage, notes, start_time, end_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                task_id, actual_time, performance,
-                notes, datetime.now().isoformat(), datetime.now().isoformat()
-            ))
+            # Insert or get task, then record against its target like the Kivy task screen
+            task_id = resolve_task(cursor, {}, task_name, target_time)
+            entry = add_task_performance(cursor, task_id, actual_time, notes)
+            performance = entry[5]
             
             conn.commit()
-            conn.close()
+            close_database(conn)
             
             # Update UI
             self.update_summary()
@@ -269,22 +237,14 @@ class PerformanceTrackerApp(toga.App):
     def update_summary(self):
         """Update the performance summary display."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
-            # Get today's records
+            # Today's records, from the per-day rollups
             today = datetime.now().date()
-            cursor.execute('''
-                SELECT AVG(performance_percentage), COUNT(*)
-                FROM performance_records
-                WHERE DATE(created_at) = ?
-            ''', (today,))
+            avg_performance, count = period_summary(cursor, today, today)
             
-            result = cursor.fetchone()
-            avg_performance = result[0] if result[0] else 0
-            count = result[1] if result[1] else 0
-            
-            conn.close()
+            close_database(conn)
             
             self.daily_performance_label.text = f"Daily Performance: {avg_performance:.1f}%"
             self.records_count_label.text = f"Records Today: {count}"
@@ -298,20 +258,11 @@ class PerformanceTrackerApp(toga.App):
             # Clear existing records
             self.records_list.clear()
             
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_database(self.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT t.name, pr.actual_time, pr.performance_percentage, 
-                       pr.created_at, pr.notes
-                FROM performance_records pr
-                JOIN tasks t ON pr.task_id = t.id
-                ORDER BY pr.created_at DESC
-                LIMIT 10
-            ''')
-            
-            records = cursor.fetchall()
-            conn.close()
+            records = fetch_recent_records(cursor, limit=10)
+            close_database(conn)
             
             for record in records:
                 task_name, actual_time, performance, created_at, notes = record
@@ -0,0 +1,196 @@
+"""
+Database queries shared by the app screens.
+
+Each function takes a cursor, so the screens can hand them to the
+background DatabaseWorker as jobs.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+from rollups import period_summary
+
+RECORDS_PAGE_SIZE = 50
+TIMELINE_PAGE_SIZE = 30
+
+def fetch_records_page(cursor, after=None, limit=RECORDS_PAGE_SIZE):
+    """Fetch one page of records, newest first.
+    
+    after is the (created_at, id) key of the last row already shown; the page
+    continues strictly below it, so each page costs one index seek no matter
+    how deep into the history the user has scrolled.
+    """
+    if after is None:
+        cursor.execute("""
+            SELECT p.id, t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at, p.created_epoch
+            FROM performance_records p JOIN tasks t ON p.task_id = t.id
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT ?
+        """, (limit,))
+    else:
+        cursor.execute("""
+            SELECT p.id, t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_at, p.created_epoch
+            FROM performance_records p JOIN tasks t ON p.task_id = t.id
+            WHERE (p.created_at, p.id) < (?, ?)
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT ?
+        """, (after[0], after[1], limit))
+    
+    return cursor.fetchall()
+
+def fetch_recent_records(cursor, limit=10):
+    """Fetch (name, actual_time, performance_percentage, created_at, notes) of the newest records."""
+    cursor.execute("""
+        SELECT t.name, p.actual_time, p.performance_percentage, p.created_at, p.notes
+        FROM performance_records p JOIN tasks t ON p.task_id = t.id
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT ?
+    """, (limit,))
+    return cursor.fetchall()
+
+def fetch_summaries(cursor, today):
+    """Return (average, count) pairs for today, this week and this month."""
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    return (
+        period_summary(cursor, today, today),
+        period_summary(cursor, week_start),
+        period_summary(cursor, month_start),
+    )
+
+def fetch_day_records(cursor, day):
+    """Fetch the records of one day, newest first, each ending with its id."""
+    cursor.execute("""
+        SELECT t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.created_epoch, p.id
+        FROM performance_records p JOIN tasks t ON p.task_id = t.id
+        WHERE p.record_day = ?
+        ORDER BY p.created_at DESC
+    """, (str(day),))
+    return cursor.fetchall()
+
+def group_rows(rows):
+    """Turn rows of (key, count, average, *detail) into (key, count, average, details)."""
+    return [
+        (key, count, average, [row[3:] for row in group])
+        for (key, count, average), group in groupby(rows, key=lambda row: row[:3])
+    ]
+
+def fetch_week_groups(cursor, start_day, end_day):
+    """Fetch a week's records grouped by day, newest day first.
+    
+    The per-day count and average come from window aggregates in the same
+    pass that returns the rows, so nothing is re-parsed or summed in Python.
+    """
+    cursor.execute("""
+        SELECT p.record_day,
+               COUNT(*) OVER (PARTITION BY p.record_day),
+               AVG(p.performance_percentage) OVER (PARTITION BY p.record_day),
+               t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage, p.id
+        FROM performance_records p JOIN tasks t ON p.task_id = t.id
+        WHERE p.record_day BETWEEN ? AND ?
+        ORDER BY p.record_day DESC, p.created_at DESC
+    """, (str(start_day), str(end_day)))
+    return group_rows(cursor.fetchall())
+
+def fetch_month_groups(cursor, start_day, end_day, shown_per_week=3):
+    """Fetch a month's records grouped by Monday-based week, newest week first.
+    
+    Each week carries its full count and average but only its newest
+    shown_per_week records, since that is all the monthly screen displays.
+    """
+    cursor.execute("""
+        SELECT week_start, week_count, week_average,
+               day_label, name, target_time, start_time, end_time, actual_time, performance_percentage, id
+        FROM (
+            SELECT DATE(p.record_day, 'weekday 0', '-6 days') AS week_start,
+                   COUNT(*) OVER week AS week_count,
+                   AVG(p.performance_percentage) OVER week AS week_average,
+                   ROW_NUMBER() OVER (week ORDER BY p.created_at DESC) AS position,
+                   STRFTIME('%m/%d', p.record_day) AS day_label,
+                   t.name, t.target_time, p.start_time, p.end_time, p.actual_time, p.performance_percentage,
+                   p.created_at, p.id
+            FROM performance_records p JOIN tasks t ON p.task_id = t.id
+            WHERE p.record_day BETWEEN ? AND ?
+            WINDOW week AS (PARTITION BY DATE(p.record_day, 'weekday 0', '-6 days'))
+        )
+        WHERE position <= ?
+        ORDER BY week_start DESC, created_at DESC
+    """, (str(start_day), str(end_day), shown_per_week))
+    return group_rows(cursor.fetchall())
+
+def fetch_task(cursor, task_id):
+    """Fetch (name, target_time) of a task, or None."""
+    cursor.execute(
+        "SELECT name, target_time FROM tasks WHERE id = ?",
+        (task_id,)
+    )
+    return cursor.fetchone()
+
+# A task's records and delays as one list. Each branch reads its table's
+# (task_id, created_at) index newest first and SQLite merges the two, so a
+# page stops reading as soon as it has enough rows.
+TIMELINE_QUERY = """
+    SELECT 'record' AS kind, id, created_at, created_epoch, actual_time, performance_percentage, notes
+    FROM performance_records
+    WHERE task_id = :task_id {record_filter}
+    UNION ALL
+    SELECT 'delay' AS kind, id, created_at, created_epoch, delay_time, NULL, reason
+    FROM delays
+    WHERE task_id = :task_id {delay_filter}
+    ORDER BY created_at DESC, kind DESC, id DESC
+    LIMIT :limit
+"""
+TIMELINE_FILTER = "AND created_at <= :created_at AND (created_at, '{kind}', id) < (:created_at, :kind, :id)"
+
+def timeline_key(entry):
+    """The (created_at, kind, id) key timeline entries are ordered by."""
+    kind, entry_id, created_at = entry[:3]
+    return created_at, kind, entry_id
+
+def fetch_task_timeline(cursor, task_id, after=None, limit=TIMELINE_PAGE_SIZE):
+    """Fetch one page of a task's records and delays merged newest first.
+    
+    Entries are (kind, id, created_at, created_epoch, minutes, percentage,
+    text), where kind is 'record' or 'delay'; a delay has no percentage and
+    its text is the reason. after is the timeline_key of the last entry
+    already shown and works like the key of fetch_records_page.
+    """
+    params = {'task_id': task_id, 'limit': limit}
+    if after is None:
+        query = TIMELINE_QUERY.format(record_filter='', delay_filter='')
+    else:
+        query = TIMELINE_QUERY.format(
+            record_filter=TIMELINE_FILTER.format(kind='record'),
+            delay_filter=TIMELINE_FILTER.format(kind='delay')
+        )
+        params['created_at'], params['kind'], params['id'] = after
+    
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+def add_task_performance(cursor, task_id, actual_time, notes):
+    """Record performance against a task's target time and return its timeline entry."""
+    cursor.execute(
+        "SELECT target_time FROM tasks WHERE id = ?",
+        (task_id,)
+    )
+    target_time = cursor.fetchone()[0]
+    
+    # Calculate performance percentage
+    performance_percentage = (target_time / actual_time) * 100
+    
+    cursor.execute("""
+        INSERT INTO performance_records
+        (task_id, actual_time, performance_percentage, notes, record_day, created_epoch)
+        VALUES (?, ?, ?, ?, DATE('now'), CAST(STRFTIME('%s', 'now') AS INTEGER))
+        RETURNING 'record', id, created_at, created_epoch, actual_time, performance_percentage, notes
+    """, (task_id, actual_time, performance_percentage, notes))
+    return cursor.fetchone()
+
+def add_delay(cursor, task_id, delay_time, reason):
+    """Record a delay for a task and return its timeline entry."""
+    cursor.execute("""
+        INSERT INTO delays (task_id, delay_time, reason, created_epoch)
+        VALUES (?, ?, ?, CAST(STRFTIME('%s', 'now') AS INTEGER))
+        RETURNING 'delay', id, created_at, created_epoch, delay_time, NULL, reason
+    """, (task_id, delay_time, reason))
+    return cursor.fetchone()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Query plan checks for the app's SQL.
+
+QUERIES lists every query the apps run, as the function that runs it. The
+checker seeds a database with a generated history (see benchmark.py), runs
+each function with a trace callback to capture the exact statements it
+sends, and asks SQLite for their plans with EXPLAIN QUERY PLAN. Writes
+are rolled back afterwards.
+
+Each query has a kind:
+
+- hot: runs on a screen or on every entry; every table must be read
+  with SEARCH on an index, never SCAN
+- index_walk: a LIMITed list in index order; SCAN ... USING INDEX is
+  fine, since it stops after one page, but a plain SCAN is not
+- maintenance: runs over the whole history on purpose; only reported
+
+The statements triggers run are not captured. Run it after changing any
+SQL or index; it exits with status 1 when a query has lost its index:
+
+    python query_plans.py [--records 20000] [--years 2] [--verbose]
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import tempfile
+from datetime import date, timedelta
+from db_connection import connect_database, close_database
+from init_db import DUPLICATE_RECORDS, migrate_unique_records
+from benchmark import create_history_database
+from queries import (
+    fetch_summaries, fetch_recent_records, fetch_day_records, fetch_week_groups, fetch_month_groups,
+    fetch_records_page, fetch_task, fetch_task_timeline, timeline_key, add_task_performance, add_delay
+)
+from delay_stats import top_delay_causes, weekly_delay_totals
+from rollups import period_summary
+from ingest import ingest_records, validate_entry
+from export import export_chunks
+from analytics import PerformanceSeries
+from check_duplicates import ALL_RECORDS
+
+PLAN_RECORDS = 20000
+PLAN_YEARS = 2
+PAGE_OFFSET = 500
+
+# Statements the trace sees that aren't queries: transaction control and trigger bodies
+SKIPPED_STATEMENTS = ('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', '--')
+# "SCAN p" or, before SQLite 3.36, "SCAN TABLE performance_records AS p"
+SCAN = re.compile(r'^SCAN (?:TABLE )?(\S+)(.*)$')
+INDEX_WALK = re.compile(r' USING (?:COVERING )?INDEX ')
+
+def all_rows(cursor, statement, *params):
+    """Run a query and fetch every row."""
+    cursor.execute(statement, params)
+    return cursor.fetchall()
+
+# (name, kind, job); a job takes a cursor and the values from sample_values
+QUERIES = (
+    ('fetch_summaries', 'hot', lambda cursor, s: fetch_summaries(cursor, s['day'])),
+    ('period_summary', 'hot', lambda cursor, s: period_summary(cursor, s['day'], s['day'])),
+    ('fetch_recent_records', 'index_walk', lambda cursor, s: fetch_recent_records(cursor)),
+    ('fetch_day_records', 'hot', lambda cursor, s: fetch_day_records(cursor, s['day'])),
+    ('fetch_week_groups', 'hot', lambda cursor, s: fetch_week_groups(cursor, s['week_start'], s['week_end'])),
+    ('fetch_month_groups', 'hot', lambda cursor, s: fetch_month_groups(cursor, s['month_start'], s['month_end'])),
+    ('fetch_records_page', 'index_walk', lambda cursor, s: fetch_records_page(cursor)),
+    ('fetch_records_page after', 'hot', lambda cursor, s: fetch_records_page(cursor, after=s['records_key'])),
+    ('fetch_task', 'hot', lambda cursor, s: fetch_task(cursor, s['task_id'])),
+    ('fetch_task_timeline', 'hot', lambda cursor, s: fetch_task_timeline(cursor, s['task_id'])),
+    ('fetch_task_timeline after', 'hot',
+     lambda cursor, s: fetch_task_timeline(cursor, s['task_id'], after=s['timeline_key'])),
+    ('top_delay_causes', 'hot', lambda cursor, s: top_delay_causes(cursor, s['day'] - timedelta(weeks=4), limit=3)),
+    ('weekly_delay_totals', 'hot', lambda cursor, s: weekly_delay_totals(cursor, s['month_start'], s['day'])),
+    ('add_task_performance', 'hot', lambda cursor, s: add_task_performance(cursor, s['task_id'], 30, "Plan check")),
+    ('add_delay', 'hot', lambda cursor, s: add_delay(cursor, s['task_id'], 5, "Plan check")),
+    ('ingest_records', 'hot',
+     lambda cursor, s: ingest_records(cursor, [validate_entry("Plan check", 30, "01:00", "01:30")])),
+    ('export_chunks filtered', 'hot',
+     lambda cursor, s: list(export_chunks(cursor, s['day'] - timedelta(days=7), s['day'], s['task_id']))),
+    ('PerformanceSeries.refresh', 'hot', lambda cursor, s: PerformanceSeries().refresh(cursor)),
+    ('export_chunks', 'maintenance', lambda cursor, s: list(export_chunks(cursor))),
+    ('duplicate check', 'maintenance',
+     lambda cursor, s: all_rows(cursor, f"SELECT COUNT(*) FROM performance_records WHERE {DUPLICATE_RECORDS}")),
+    ('show_all_records', 'maintenance', lambda cursor, s: all_rows(cursor, ALL_RECORDS)),
+)
+
+def sample_values(cursor):
+    """Days, ids and page keys from the seeded history for the queries to look up."""
+    cursor.execute("SELECT MAX(record_day) FROM performance_records")
+    day = date.fromisoformat(cursor.fetchone()[0])
+    week_start = day - timedelta(days=day.weekday())
+    month_start = day.replace(day=1)
+    cursor.execute("SELECT task_id FROM performance_records ORDER BY created_at DESC LIMIT 1")
+    task_id = cursor.fetchone()[0]
+    cursor.execute("SELECT created_at, id FROM performance_records ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+                   (PAGE_OFFSET,))
+    records_key = cursor.fetchone()
+    timeline = fetch_task_timeline(cursor, task_id)
+    return {
+        'day': day,
+        'week_start': week_start,
+        'week_end': week_start + timedelta(days=6),
+        'month_start': month_start,
+        'month_end': (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1),
+        'task_id': task_id,
+        'records_key': records_key,
+        'timeline_key': timeline_key(timeline[-1]),
+    }
+
+def query_plan(cursor, statement):
+    """The detail lines of statement's EXPLAIN QUERY PLAN."""
+    cursor.execute(f"EXPLAIN QUERY PLAN {statement}")
+    return [row[3] for row in cursor.fetchall()]
+
+def plan_problems(plan, kind):
+    """The lines of a plan that kind of query must not have."""
+    if kind == 'maintenance':
+        return []
+    problems = []
+    for line in plan:
+        match = SCAN.match(line.strip())
+        if not match:
+            continue
+        table, rest = match.groups()
+        # Subqueries, views and VALUES are scanned from temporary results, not tables
+        if table.startswith('(') or table == 'CONSTANT':
+            continue
+        if kind == 'index_walk' and INDEX_WALK.search(rest + ' '):
+            continue
+        problems.append(line.strip())
+    return problems
+
+def traced_statements(conn, job):
+    """Run job and return the SQL statements it sent, parameters filled in."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        job()
+    finally:
+        conn.set_trace_callback(None)
+        # Writes are only checked, never kept
+        conn.rollback()
+    # Each trigger program a write fires reports the outer statement again
+    return list(dict.fromkeys(statement.strip() for statement in statements
+                              if not statement.lstrip().upper().startswith(SKIPPED_STATEMENTS)))
+
+def check_queries(db_path, queries=QUERIES):
+    """Check every query against the database at db_path.
+    
+    Returns (name, kind, statement, plan, problems) per statement run.
+    """
+    conn = connect_database(db_path)
+    try:
+        cursor = conn.cursor()
+        sample = sample_values(cursor)
+        results = []
+        for name, kind, job in queries:
+            for statement in traced_statements(conn, lambda: job(cursor, sample)):
+                plan = query_plan(cursor, statement)
+                results.append((name, kind, statement, plan, plan_problems(plan, kind)))
+        return results
+    finally:
+        close_database(conn)
+
+def run_checks(records=PLAN_RECORDS, years=PLAN_YEARS, seed=0):
+    """Seed a temporary database with a generated history and check every query against it."""
+    work_dir = tempfile.mkdtemp(prefix='query_plans_')
+    db_path = os.path.join(work_dir, 'performance.db')
+    try:
+        create_history_database(db_path, records, years, seed)
+        # Queries only ever see databases the app has cleaned up
+        conn = connect_database(db_path)
+        migrate_unique_records(conn.cursor())
+        conn.commit()
+        close_database(conn)
+        return check_queries(db_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_results(results, verbose=False):
+    """Print the plan of every failing query, or of every query with verbose; returns how many failed."""
+    failed = 0
+    for name, kind, statement, plan, problems in results:
+        if problems:
+            failed += 1
+            print(f"❌ {name} ({kind}) scans a table:")
+        elif verbose:
+            print(f"✅ {name} ({kind})")
+        else:
+            continue
+        print("    " + " ".join(statement.split()))
+        for line in plan:
+            print(f"    {'!' if line.strip() in problems else ' '} {line}")
+    print(f"{len(results)} statements from {len({result[0] for result in results})} queries checked, {failed} scanning.")
+    return failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check that the app's queries read their indexes.")
+    parser.add_argument('--records', type=int, default=PLAN_RECORDS, help="records in the seeded history")
+    parser.add_argument('--years', type=int, default=PLAN_YEARS, help="years of history to spread them over")
+    parser.add_argument('--verbose', action='store_true', help="print every plan, not only the failing ones")
+    args = parser.parse_args()
+    
+    if print_results(run_checks(args.records, args.years), args.verbose):
+        sys.exit(1)
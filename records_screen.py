@@ -0,0 +1,75 @@
+from kivymd.uix.screen import MDScreen
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.label import MDLabel
+from kivymd.uix.boxlayout import MDBoxLayout
+from functools import partial
+from time_format import format_date
+from queries import fetch_records_page, RECORDS_PAGE_SIZE
+from paged_list import PagedList
+from tracing import traced
+
+class RecordsScreen(PagedList, MDScreen):
+    page_size = RECORDS_PAGE_SIZE
+    page_error = "Could not load records"
+    
+    def __init__(self, db_worker, **kwargs):
+        super().__init__(**kwargs)
+        self.db_worker = db_worker
+        # Data version the list was loaded at
+        self._version = None
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = MDBoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Back button
+        back_btn = MDFlatButton(
+            text="← Back to Home",
+            on_release=self.go_back
+        )
+        layout.add_widget(back_btn)
+        
+        # Title
+        title = MDLabel(
+            text="All Performance Records",
+            halign="center",
+            font_style="H5",
+            size_hint_y=None,
+            height=50
+        )
+        layout.add_widget(title)
+        
+        # Records list: a recycled view only builds widgets for the rows on screen
+        self.record_view = self.build_paged_view()
+        layout.add_widget(self.record_view)
+        
+        self.add_widget(layout)
+        
+    def on_enter(self):
+        # Keep the list, and where it was scrolled to, if no data changed since it was loaded
+        version = self.db_worker.version
+        if version is None or version != self._version:
+            self._version = version
+            self.load_records()
+        
+    @traced
+    def load_records(self):
+        # Start again from the newest record
+        self.reload_pages()
+        
+    def page_job(self, after):
+        return partial(fetch_records_page, after=after)
+        
+    def page_key(self, record):
+        record_id, created_at = record[0], record[7]
+        return (created_at, record_id)
+        
+    def page_row(self, record):
+        record_id, name, target_time, start_time, end_time, actual_time, performance, created_at, created_epoch = record
+        date_str = format_date(created_epoch)
+        return {
+            'text': f"{name} ({date_str}) | {start_time}-{end_time} | Target: {target_time:.1f} | Actual: {actual_time:.1f} | Perf: {performance:.1f}%"
+        }
+        
+    def go_back(self, *args):
+        self.manager.current = "home"
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Headless render benchmarks of the list screens.
+
+Building widgets, not running SQL, is most of what the daily, weekly,
+monthly and records screens cost on a phone. This builds each of them
+against generated histories of increasing size (see benchmark.py) in an
+offscreen SDL window with Kivy's mock GL backend, so it runs on a Linux
+box without a device or display. For each screen and size it measures:
+
+- build: constructing the screen
+- enter: from on_enter until the loaded rows are laid out and drawn
+- reenter: entering again with nothing changed, which should reuse rows
+- the widgets created by the first entry and by the second
+- the process's peak RSS once the screen is drawn (not on Windows); the
+  OS only reports the peak of the whole process, so this is the highest
+  so far across every screen and size run before, not the screen's own
+
+Results are written and compared as in benchmark.py:
+
+    python render_benchmark.py [--sizes 1000,10000,100000] [--out FILE] [--compare OLD.json]
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta, timezone
+
+# Read when Kivy is first imported: an offscreen window, no GL and no command line parsing
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from kivy.config import Config
+# Frames are pumped by hand, so the clock must not sleep to hold 60 fps
+Config.set('graphics', 'maxfps', '0')
+
+import kivy
+import kivymd
+from kivy.base import EventLoop
+from kivymd.app import MDApp
+from db_connection import connect_database, close_database
+from init_db import migrate_unique_records
+from db_worker import DatabaseWorker
+from period_details import DailyDetailsScreen, WeeklyDetailsScreen, MonthlyDetailsScreen
+from records_screen import RecordsScreen
+from benchmark import (
+    BENCHMARK_SIZES, BENCHMARK_YEARS, BENCHMARK_REPEATS, BENCHMARK_DIR, REGRESSION_THRESHOLD,
+    create_history_database, compare_results, git_label, save_results, load_results, report_regressions
+)
+
+# Each screen with the method its loaded rows arrive in
+SCREENS = (
+    ('daily_details', DailyDetailsScreen, 'show_records_for_date'),
+    ('weekly_details', WeeklyDetailsScreen, 'show_records_for_week'),
+    ('monthly_details', MonthlyDetailsScreen, 'show_records_for_month'),
+    ('records', RecordsScreen, 'show_page'),
+)
+# Frames drawn after the rows arrive; a recycled list builds its rows on the next frame
+RENDER_FRAMES = 3
+RENDER_TIMEOUT = 120.0
+
+def pump_until(done, timeout=RENDER_TIMEOUT):
+    """Run Kivy frames until done() is true; raises RuntimeError after timeout seconds."""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Nothing rendered within {timeout:.0f} s")
+        EventLoop.idle()
+
+def drain(db_worker):
+    """Wait for every queued job, such as prefetches, and its callback to finish."""
+    finished = []
+    # Jobs run in order and callbacks are delivered in order, so this one comes last
+    db_worker.submit(lambda cursor: None, finished.append)
+    pump_until(lambda: finished)
+
+def draw_frames(frames=RENDER_FRAMES):
+    """Run frames Kivy frames: layout, recycled views and drawing."""
+    for _ in range(frames):
+        EventLoop.idle()
+
+def point_at(screen, day):
+    """Have a period screen show the period holding day; the records list starts at the newest anyway."""
+    if isinstance(screen, DailyDetailsScreen):
+        screen.current_date = day
+    elif isinstance(screen, WeeklyDetailsScreen):
+        screen.current_week_start = day - timedelta(days=day.weekday())
+    elif isinstance(screen, MonthlyDetailsScreen):
+        screen.current_month = day.replace(day=1)
+
+def widget_ids(screen):
+    """ids of the widgets in screen's tree."""
+    return {id(widget) for widget in screen.walk(restrict=True)}
+
+def peak_rss_kb():
+    """Peak resident memory of this process since it started, in KiB, or None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def render_screen(window, db_worker, screen_class, show_method, day):
+    """Build one screen, enter it twice and return its timings and widget counts."""
+    drain(db_worker)
+    start = time.perf_counter()
+    screen = screen_class(db_worker)
+    build_ms = (time.perf_counter() - start) * 1000
+    point_at(screen, day)
+    window.add_widget(screen)
+    try:
+        draw_frames()
+        
+        # Stop the clock once the loaded rows are drawn, not when the prefetches are done
+        shown = []
+        show = getattr(screen, show_method)
+        setattr(screen, show_method, lambda rows: (show(rows), shown.append(True)))
+        before = widget_ids(screen)
+        start = time.perf_counter()
+        screen.dispatch('on_enter')
+        pump_until(lambda: shown)
+        draw_frames()
+        enter_ms = (time.perf_counter() - start) * 1000
+        after = widget_ids(screen)
+        
+        # Nothing changed, so this should come from the cache and reuse every row
+        drain(db_worker)
+        start = time.perf_counter()
+        screen.dispatch('on_enter')
+        drain(db_worker)
+        draw_frames()
+        reenter_ms = (time.perf_counter() - start) * 1000
+        
+        return {
+            'build_ms': build_ms,
+            'enter_ms': enter_ms,
+            'reenter_ms': reenter_ms,
+            'created': len(after - before),
+            'recreated': len(widget_ids(screen) - after),
+            'widgets': len(after),
+            'process_peak_rss_kb': peak_rss_kb(),
+        }
+    finally:
+        window.remove_widget(screen)
+
+def render_size(window, records, years=BENCHMARK_YEARS, repeats=BENCHMARK_REPEATS, seed=0):
+    """Generate a history of this many records and render every screen against it."""
+    work_dir = tempfile.mkdtemp(prefix='render_benchmark_')
+    db_path = os.path.join(work_dir, 'performance.db')
+    try:
+        records, delays, _ = create_history_database(db_path, records, years, seed)
+        # Screens only ever see databases the app has cleaned up
+        conn = connect_database(db_path)
+        migrate_unique_records(conn.cursor())
+        conn.commit()
+        last_day = date.fromisoformat(conn.execute("SELECT MAX(record_day) FROM performance_records").fetchone()[0])
+        close_database(conn)
+        
+        db_worker = DatabaseWorker(db_path)
+        try:
+            timings, widgets, peak_rss = {}, {}, {}
+            for name, screen_class, show_method in SCREENS:
+                runs = [render_screen(window, db_worker, screen_class, show_method, last_day) for _ in range(repeats)]
+                for metric in ('build', 'enter', 'reenter'):
+                    values = [run[f'{metric}_ms'] for run in runs]
+                    timings[f'{name}_{metric}'] = {'median_ms': round(statistics.median(values), 3),
+                                                   'min_ms': round(min(values), 3)}
+                widgets[name] = {key: runs[-1][key] for key in ('created', 'recreated', 'widgets')}
+                peak_rss[name] = runs[-1]['process_peak_rss_kb']
+        finally:
+            db_worker.close()
+        return {'records': records, 'delays': delays, 'timings': timings, 'widgets': widgets, 'process_peak_rss_kb': peak_rss}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_render_benchmark(sizes=BENCHMARK_SIZES, years=BENCHMARK_YEARS, repeats=BENCHMARK_REPEATS, seed=0, label=None):
+    """Render every screen at every size; returns the results as a JSON-ready dict."""
+    # The screens' KivyMD widgets read their theme from the running app
+    MDApp()
+    EventLoop.ensure_window()
+    window = EventLoop.window
+    
+    results = {
+        'label': label or git_label(),
+        'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'kivy': kivy.__version__,
+        'kivymd': kivymd.__version__,
+        'platform': platform.platform(),
+        'window': list(window.size),
+        'years': years,
+        'repeats': repeats,
+        'seed': seed,
+        'sizes': {},
+    }
+    for size in sizes:
+        print(f"Rendering screens with {size} records...")
+        results['sizes'][str(size)] = render_size(window, size, years, repeats, seed)
+    return results
+
+def compare_widgets(old, new):
+    """Screens that now create more widgets; returns (size, screen, old count, new count) for each.
+    
+    Both runs must use the same seed for the counts to be comparable.
+    """
+    grown = []
+    for size, result in new['sizes'].items():
+        old_widgets = old['sizes'].get(size, {}).get('widgets', {})
+        for name, counts in result['widgets'].items():
+            before = old_widgets.get(name, {}).get('created')
+            if before is not None and counts['created'] > before:
+                grown.append((size, name, before, counts['created']))
+    return grown
+
+def print_results(results):
+    """Print each size's median timings and widget counts as a table."""
+    for size, result in results['sizes'].items():
+        print(f"\n{size} records, {result['delays']} delays")
+        for name, _, _ in SCREENS:
+            timings = [result['timings'][f'{name}_{metric}']['median_ms'] for metric in ('build', 'enter', 'reenter')]
+            widgets = result['widgets'][name]
+            peak = result['process_peak_rss_kb'][name]
+            print(f"  {name:<16} build {timings[0]:8.1f} ms  enter {timings[1]:9.1f} ms  "
+                  f"reenter {timings[2]:8.1f} ms  {widgets['created']:6} widgets created, "
+                  f"{widgets['recreated']} on reenter" + (f", process peak RSS so far {peak / 1024:.0f} MB" if peak else ""))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the list screens headlessly on generated histories.")
+    parser.add_argument('--sizes', default=','.join(map(str, BENCHMARK_SIZES)), help="comma-separated record counts")
+    parser.add_argument('--years', type=int, default=BENCHMARK_YEARS, help="years of history to spread them over")
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS, help="renders per screen; the median is kept")
+    parser.add_argument('--label', help="name of this run (defaults to the git commit)")
+    parser.add_argument('--out', help=f"results file (defaults to {BENCHMARK_DIR}/<label>-render.json)")
+    parser.add_argument('--compare', help="earlier results file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown that counts as a regression, as a fraction")
+    args = parser.parse_args()
+    
+    results = run_render_benchmark([int(size) for size in args.sizes.split(',')], args.years, args.repeats,
+                                   label=args.label)
+    print_results(results)
+    save_results(results, args.out or os.path.join(BENCHMARK_DIR, f"{results['label']}-render.json"))
+    
+    if args.compare:
+        old = load_results(args.compare)
+        regressions = compare_results(old, results, args.threshold)
+        report_regressions(old, regressions)
+        grown = compare_widgets(old, results)
+        if grown:
+            print(f"Creating more widgets than {old['label']}:")
+            for size, name, before, after in grown:
+                print(f"  {size} records, {name}: {before} -> {after}")
+        if regressions or grown:
+            sys.exit(1)
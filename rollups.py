@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Per-day performance rollups for the home dashboard.
+
+daily_rollups keeps one row per record_day with the count, sum, min and max
+of performance_percentage and the total actual_time. Triggers on
+performance_records keep it current inside the same transaction as every
+insert, update and delete, so the home screen sums at most a month of small
+rows instead of aggregating the raw history.
+"""
+
+import os
+from db_connection import run_in_batches, begin_rebuild, finish_rebuild
+
+# Add one record's values to its day (NEW) or take them away again (OLD).
+# Rows without a record_day match nothing and are left out of the rollups.
+ADD_TO_DAY = '''
+    INSERT INTO daily_rollups
+        (day, record_count, performance_sum, performance_min, performance_max, actual_time_sum)
+    SELECT NEW.record_day, 1, NEW.performance_percentage, NEW.performance_percentage,
+           NEW.performance_percentage, NEW.actual_time
+    WHERE NEW.record_day IS NOT NULL
+    ON CONFLICT(day) DO UPDATE SET
+        record_count = record_count + 1,
+        performance_sum = performance_sum + excluded.performance_sum,
+        performance_min = MIN(performance_min, excluded.performance_min),
+        performance_max = MAX(performance_max, excluded.performance_max),
+        actual_time_sum = actual_time_sum + excluded.actual_time_sum;
+'''
+
+REMOVE_FROM_DAY = '''
+    UPDATE daily_rollups SET
+        record_count = record_count - 1,
+        performance_sum = performance_sum - OLD.performance_percentage,
+        actual_time_sum = actual_time_sum - OLD.actual_time,
+        performance_min = (SELECT MIN(performance_percentage) FROM performance_records
+                           WHERE record_day = OLD.record_day),
+        performance_max = (SELECT MAX(performance_percentage) FROM performance_records
+                           WHERE record_day = OLD.record_day)
+    WHERE day = OLD.record_day;
+    DELETE FROM daily_rollups WHERE day = OLD.record_day AND record_count <= 0;
+'''
+
+def init_rollups(cursor, batch_size=None):
+    """Create the rollup table and its triggers, building it on first use.
+    
+    batch_size is passed on to rebuild_rollups. A build that was
+    interrupted is run again from the start.
+    """
+    is_new = begin_rebuild(cursor, 'daily_rollups')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_rollups (
+            day TEXT PRIMARY KEY,
+            record_count INTEGER NOT NULL,
+            performance_sum REAL NOT NULL,
+            performance_min REAL,
+            performance_max REAL,
+            actual_time_sum REAL NOT NULL
+        )
+    ''')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_rollups_insert
+        AFTER INSERT ON performance_records
+        BEGIN {ADD_TO_DAY} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_rollups_delete
+        AFTER DELETE ON performance_records
+        BEGIN {REMOVE_FROM_DAY} END
+    ''')
+    # Covers the record_day backfill as well as edited values
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_rollups_update
+        AFTER UPDATE OF record_day, performance_percentage, actual_time ON performance_records
+        BEGIN {REMOVE_FROM_DAY} {ADD_TO_DAY} END
+    ''')
+    
+    if is_new:
+        rebuild_rollups(cursor, batch_size)
+        finish_rebuild(cursor, 'daily_rollups')
+
+def rebuild_rollups(cursor, batch_size=None):
+    """Regenerate every rollup row from performance_records.
+    
+    With batch_size the records are added a committed batch at a time, as
+    in run_in_batches; each batch merges into the days already summed.
+    """
+    cursor.execute("DELETE FROM daily_rollups")
+    run_in_batches(cursor, 'performance_records', '''
+        INSERT INTO daily_rollups
+            (day, record_count, performance_sum, performance_min, performance_max, actual_time_sum)
+        SELECT record_day, COUNT(*), SUM(performance_percentage), MIN(performance_percentage),
+               MAX(performance_percentage), SUM(actual_time)
+        FROM performance_records
+        WHERE id >= :start AND id < :stop AND record_day IS NOT NULL
+        GROUP BY record_day
+        ON CONFLICT(day) DO UPDATE SET
+            record_count = record_count + excluded.record_count,
+            performance_sum = performance_sum + excluded.performance_sum,
+            performance_min = MIN(performance_min, excluded.performance_min),
+            performance_max = MAX(performance_max, excluded.performance_max),
+            actual_time_sum = actual_time_sum + excluded.actual_time_sum
+    ''', batch_size)
+
+def period_summary(cursor, start_day, end_day=None):
+    """Return (average performance, record count) for days from start_day on.
+    
+    end_day is inclusive; without it every day from start_day onwards counts.
+    """
+    if end_day is None:
+        cursor.execute('''
+            SELECT SUM(performance_sum), SUM(record_count)
+            FROM daily_rollups WHERE day >= ?
+        ''', (str(start_day),))
+    else:
+        cursor.execute('''
+            SELECT SUM(performance_sum), SUM(record_count)
+            FROM daily_rollups WHERE day BETWEEN ? AND ?
+        ''', (str(start_day), str(end_day)))
+    
+    total, count = cursor.fetchone()
+    if not count:
+        return 0, 0
+    return total / count, count
+
+if __name__ == '__main__':
+    from db_connection import DB_PATH, connect_database, close_database
+    from init_db import migrate_record_day
+    
+    db_path = DB_PATH
+    if not os.path.exists(db_path):
+        print("Database not found. Please run the app first to create the database.")
+    else:
+        conn = connect_database(db_path)
+        cursor = conn.cursor()
+        migrate_record_day(cursor)
+        init_rollups(cursor)
+        rebuild_rollups(cursor)
+        conn.commit()
+        cursor.execute("SELECT COUNT(*), SUM(record_count) FROM daily_rollups")
+        days, records = cursor.fetchone()
+        close_database(conn)
+        print(f"Rebuilt rollups: {days} days, {records or 0} records.")
@@ -0,0 +1,45 @@
+"""
+Cold start timing.
+
+main.py imports this module first and wraps its imports and screen builds
+in timed(), so a slow start can be broken down into the modules and
+screens that caused it. Set PERFORMANCE_STARTUP_REPORT=1 to have the app
+print the breakdown once its first frame is drawn and again on exit.
+Timings nest: a screen build includes importing its module.
+"""
+
+import os
+import sys
+import time
+import importlib
+from contextlib import contextmanager
+
+STARTED = time.perf_counter()
+ENABLED = bool(os.environ.get('PERFORMANCE_STARTUP_REPORT'))
+
+# (label, seconds) in the order they finished
+timings = []
+
+@contextmanager
+def timed(label):
+    """Record how long the body of the with-block takes under label."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((label, time.perf_counter() - start))
+
+def lazy_import(module_name):
+    """Import module_name on first use, timing it the first time only."""
+    module = sys.modules.get(module_name)
+    if module is None:
+        with timed(f"import {module_name}"):
+            module = importlib.import_module(module_name)
+    return module
+
+def report(title="Startup timing"):
+    """Print the recorded timings, slowest first, and the time since start."""
+    elapsed = time.perf_counter() - STARTED
+    print(f"{title}: {elapsed * 1000:.0f} ms since main.py was imported")
+    for label, seconds in sorted(timings, key=lambda timing: timing[1], reverse=True):
+        print(f"  {seconds * 1000:8.1f} ms  {label}")
@@ -4,16 +4,27 @@ from kivymd.uix.button import MDRaisedButton, MDFlatButton
 from kivymd.uix.label import MDLabel
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.dialog import MDDialog
-from kivymd.uix.list import MDList, OneLineListItem
-from kivy.uix.scrollview import ScrollView
-from datetime import datetime
-import sqlite3
+from datetime import date, timedelta
+from functools import partial
+from time_format import format_timestamp
+from queries import (
+    fetch_task, fetch_task_timeline, timeline_key, add_task_performance, add_delay, TIMELINE_PAGE_SIZE
+)
+from delay_stats import top_delay_causes
+from paged_list import PagedList
+from tracing import traced
 
-class TaskDetailsScreen(MDScreen):
-    def __init__(self, task_id, database, **kwargs):
+# Weeks of delays summarized under "Top delay causes"
+DELAY_CAUSE_WEEKS = 4
+
+class TaskDetailsScreen(PagedList, MDScreen):
+    page_size = TIMELINE_PAGE_SIZE
+    page_error = "Could not load the task history"
+    
+    def __init__(self, task_id, db_worker, **kwargs):
         super().__init__(**kwargs)
         self.task_id = task_id
-        self.database = database
+        self.db_worker = db_worker
         self.setup_ui()
         self.load_task_details()
         
@@ -31,6 +42,16 @@ class TaskDetailsScreen(MDScreen):
         )
         layout.add_widget(self.task_info)
         
+        # Top delay causes across all tasks, from the weekly totals
+        self.delay_causes = MDLabel(
+            text="",
+            halign="left",
+            font_style="Caption",
+            size_hint_y=None,
+            height=60
+        )
+        layout.add_widget(self.delay_causes)
+        
         # Performance input section
         input_layout = MDBoxLayout(orientation='vertical', spacing=10, size_hint_y=None, height=200)
         
@@ -77,63 +98,81 @@ class TaskDetailsScreen(MDScreen):
         )
         layout.add_widget(history_label)
         
-        # Scrollable performance history
-        scroll = ScrollView()
-        self.history_list = MDList()
-        scroll.add_widget(self.history_list)
-        layout.add_widget(scroll)
+        # Records and delays in one list, newest first, loaded a page at a time
+        self.history_view = self.build_paged_view()
+        layout.add_widget(self.history_view)
         
         self.add_widget(layout)
     
+    @traced
     def load_task_details(self):
         """Load task details from database."""
-        cursor = self.database.cursor()
-        cursor.execute(
-            "SELECT name, target_time FROM tasks WHERE id = ?",
-            (self.task_id,)
-        )
-        task = cursor.fetchone()
-        
+        self.db_worker.submit(partial(fetch_task, task_id=self.task_id), self.show_task_details)
+    
+    @traced
+    def show_task_details(self, task):
+        """Show the task loaded by load_task_details."""
         if task:
             name, target_time = task
             self.task_info.text = f"Task: {name}\nTarget Time: {target_time} minutes"
             self.load_performance_history()
+            self.load_delay_causes()
     
+    @traced
     def load_performance_history(self):
-        """Load performance history for the task."""
-        self.history_list.clear_widgets()
-        cursor = self.database.cursor()
+        """Load the first page of the task's timeline."""
+        # Start again from the newest entry
+        self.reload_pages()
         
-        # Load performance records
-        cursor.execute("""
-            SELECT actual_time, performance_percentage, notes, created_at
-            FROM performance_records
-            WHERE task_id = ?
-            ORDER BY created_at DESC
-        """, (self.task_id,))
+    def page_job(self, after):
+        """The job loading the timeline page below the entry keyed after."""
+        return partial(fetch_task_timeline, task_id=self.task_id, after=after)
         
-        for actual_time, percentage, notes, created_at in cursor.fetchall():
-            date_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M')
-            item = OneLineListItem(
-                text=f"{date_str} - Time: {actual_time}min, Performance: {percentage:.1f}%"
-            )
-            self.history_list.add_widget(item)
+    def page_key(self, entry):
+        """The keyset key of a timeline entry."""
+        return timeline_key(entry)
         
-        # Load delays
-        cursor.execute("""
-            SELECT delay_time, reason, created_at
-            FROM delays
-            WHERE task_id = ?
-            ORDER BY created_at DESC
-        """, (self.task_id,))
+    def page_row(self, entry):
+        """Turn a timeline entry into the data of one list row."""
+        kind, _, _, created_epoch, minutes, percentage, text = entry
+        date_str = format_timestamp(created_epoch)
+        if kind == 'record':
+            return {'text': f"{date_str} - Time: {minutes}min, Performance: {percentage:.1f}%"}
+        return {'text': f"{date_str} - Delay: {minutes}min - {text}"}
         
-        for delay_time, reason, created_at in cursor.fetchall():
-            date_str = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M')
-            item = OneLineListItem(
-                text=f"{date_str} - Delay: {delay_time}min - {reason}"
-            )
-            self.history_list.add_widget(item)
+    def insert_entry(self, entry):
+        """Show a newly saved entry without reloading the timeline."""
+        # New entries belong at the top; walk down only past entries that sort above it
+        key = timeline_key(entry)
+        index = 0
+        while index < len(self.page_keys) and self.page_keys[index] > key:
+            index += 1
+        if self.page_keys and index == len(self.page_keys) and self._has_more:
+            # It falls below the loaded pages and will arrive with them
+            return
+        self.page_keys.insert(index, key)
+        self.history_view.data.insert(index, self.page_row(entry))
     
+    @traced
+    def load_delay_causes(self):
+        """Load the costliest delay reasons of the last few weeks."""
+        start_day = date.today() - timedelta(weeks=DELAY_CAUSE_WEEKS)
+        self.db_worker.submit(
+            partial(top_delay_causes, start_day=start_day, limit=3),
+            self.show_delay_causes,
+            key=self.delay_causes
+        )
+        
+    @traced
+    def show_delay_causes(self, causes):
+        """Show the reasons loaded by load_delay_causes."""
+        if not causes:
+            self.delay_causes.text = ""
+            return
+            
+        lines = [f"{reason or '(no reason)'}: {total:.0f} min in {count} delays" for reason, count, total in causes]
+        self.delay_causes.text = f"Top delay causes (last {DELAY_CAUSE_WEEKS} weeks):\n" + "\n".join(lines)
+        
     def record_performance(self, *args):
         """Record performance for the task."""
         actual_time = self.actual_time.text.strip()
@@ -149,32 +188,21 @@ class TaskDetailsScreen(MDScreen):
             self.show_dialog("Error", "Actual time must be a number")
             return
         
-        # Get target time
-        cursor = self.database.cursor()
-        cursor.execute(
-            "SELECT target_time FROM tasks WHERE id = ?",
-            (self.task_id,)
+        # Record performance against the task's target time
+        self.db_worker.submit(
+            partial(add_task_performance, task_id=self.task_id, actual_time=actual_time, notes=notes),
+            self.performance_recorded,
+            commit=True,
+            on_error=self.show_error
         )
-        target_time = cursor.fetchone()[0]
-        
-        # Calculate performance percentage
-        performance_percentage = (target_time / actual_time) * 100
-        
-        # Record performance
-        cursor.execute("""
-            INSERT INTO performance_records 
-            (task_id, actual_time, performance_percentage, notes)
-            VALUES (?, ?, ?, ?)
-        """, (self.task_id, actual_time, performance_percentage, notes))
-        
-        self.database.commit()
-        
+    
+    def performance_recorded(self, entry):
+        """Reset the form and show the new record once it is saved."""
         # Clear input fields
         self.actual_time.text = ""
         self.notes.text = ""
         
-        # Refresh history
-        self.load_performance_history()
+        self.insert_entry(entry)
     
     def show_delay_dialog(self, *args):
         """Show dialog to record a delay."""
@@ -230,17 +258,22 @@ class TaskDetailsScreen(MDScreen):
             return
         
         # Record delay
-        cursor = self.database.cursor()
-        cursor.execute("""
-            INSERT INTO delays (task_id, delay_time, reason)
-            VALUES (?, ?, ?)
-        """, (self.task_id, delay_time, reason))
-        
-        self.database.commit()
-        
-        # Close dialog and refresh history
+        self.db_worker.submit(
+            partial(add_delay, task_id=self.task_id, delay_time=delay_time, reason=reason),
+            self.delay_recorded,
+            commit=True,
+            on_error=self.show_error
+        )
+    
+    def delay_recorded(self, entry):
+        """Close the delay dialog and show the new delay once it is saved."""
         self.delay_dialog.dismiss()
-        self.load_performance_history()
+        self.insert_entry(entry)
+        self.load_delay_causes()
+    
+    def show_error(self, error):
+        """Report a failed database write."""
+        self.show_dialog("Error", f"Could not save: {error}")
     
     def show_dialog(self, title, text):
         """Show a dialog with the given title and text."""
@@ -34,43 +34,13 @@ class PerformanceTrackerTester:
             
     def init_test_database(self):
         """Initialize test database with same schema as main app"""
+        from init_db import create_schema
+        
         conn = sqlite3.connect(self.test_db_path)
         cursor = conn.cursor()
         
-        # Create tasks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_name TEXT NOT NULL,
-                target_time INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create performance_records table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                actual_time INTEGER NOT NULL,
-                target_time INTEGER NOT NULL,
-                performance_percentage REAL NOT NULL,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
-        
-        # Create delays table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS delays (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                delay_minutes INTEGER NOT NULL,
-                reason TEXT,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
+        # The schema every entry point migrates to
+        create_schema(cursor)
         
         conn.commit()
         conn.close()
@@ -109,14 +79,14 @@ class PerformanceTrackerTester:
         # Test tasks table schema
         cursor.execute("PRAGMA table_info(tasks)")
         columns = [col[1] for col in cursor.fetchall()]
-        expected_columns = ['id', 'task_name', 'target_time', 'created_at']
+        expected_columns = ['id', 'name', 'target_time', 'created_at']
         schema_correct = all(col in columns for col in expected_columns)
         self.assert_test(schema_correct, "Tasks table schema correct", f"Found columns: {columns}")
         
         # Test performance_records table schema
         cursor.execute("PRAGMA table_info(performance_records)")
         columns = [col[1] for col in cursor.fetchall()]
-        expected_columns = ['id', 'task_id', 'actual_time', 'target_time', 'performance_percentage', 'recorded_at']
+        expected_columns = ['id', 'task_id', 'actual_time', 'performance_percentage', 'record_day', 'created_at', 'created_epoch']
         schema_correct = all(col in columns for col in expected_columns)
         self.assert_test(schema_correct, "Performance records table schema correct", f"Found columns: {columns}")
         
@@ -128,7 +98,7 @@ class PerformanceTrackerTester:
         cursor = conn.cursor()
         
         # Test task creation
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Test Task 1", 30))
         task_id = cursor.lastrowid
         conn.commit()
@@ -136,16 +106,16 @@ class PerformanceTrackerTester:
         self.assert_test(task_id > 0, "Task creation returns valid ID")
         
         # Test task retrieval
-        cursor.execute("SELECT task_name, target_time FROM tasks WHERE id = ?", (task_id,))
+        cursor.execute("SELECT name, target_time FROM tasks WHERE id = ?", (task_id,))
         result = cursor.fetchone()
         self.assert_test(result is not None, "Task can be retrieved")
         self.assert_test(result[0] == "Test Task 1", "Task name stored correctly")
         self.assert_test(result[1] == 30, "Task target time stored correctly")
         
         # Test multiple task creation
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Test Task 2", 45))
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Test Task 3", 60))
         conn.commit()
         
@@ -161,7 +131,7 @@ class PerformanceTrackerTester:
         cursor = conn.cursor()
         
         # Create a test task
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Performance Test Task", 60))
         task_id = cursor.lastrowid
         conn.commit()
@@ -172,9 +142,9 @@ class PerformanceTrackerTester:
         performance_percentage = (target_time / actual_time) * 100
         
         cursor.execute("""
-            INSERT INTO performance_records (task_id, actual_time, target_time, performance_percentage)
-            VALUES (?, ?, ?, ?)
-        """, (task_id, actual_time, target_time, performance_percentage))
+            INSERT INTO performance_records (task_id, actual_time, performance_percentage)
+            VALUES (?, ?, ?)
+        """, (task_id, actual_time, performance_percentage))
         record_id = cursor.lastrowid
         conn.commit()
         
@@ -191,9 +161,9 @@ class PerformanceTrackerTester:
         
         # Test performance recording with poor performance (over target)
         cursor.execute("""
-            INSERT INTO performance_records (task_id, actual_time, target_time, performance_percentage)
-            VALUES (?, ?, ?, ?)
-        """, (task_id, 90, 60, (60 / 90) * 100))
+            INSERT INTO performance_records (task_id, actual_time, performance_percentage)
+            VALUES (?, ?, ?)
+        """, (task_id, 90, (60 / 90) * 100))
         conn.commit()
         
         cursor.execute("SELECT COUNT(*) FROM performance_records WHERE task_id = ?", (task_id,))
@@ -208,14 +178,14 @@ class PerformanceTrackerTester:
         cursor = conn.cursor()
         
         # Create a test task
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Delay Test Task", 30))
         task_id = cursor.lastrowid
         conn.commit()
         
         # Test delay recording
         cursor.execute("""
-            INSERT INTO delays (task_id, delay_minutes, reason)
+            INSERT INTO delays (task_id, delay_time, reason)
             VALUES (?, ?, ?)
         """, (task_id, 15, "Equipment malfunction"))
         delay_id = cursor.lastrowid
@@ -224,14 +194,14 @@ class PerformanceTrackerTester:
         self.assert_test(delay_id > 0, "Delay record created successfully")
         
         # Verify delay data
-        cursor.execute("SELECT delay_minutes, reason FROM delays WHERE id = ?", (delay_id,))
+        cursor.execute("SELECT delay_time, reason FROM delays WHERE id = ?", (delay_id,))
         result = cursor.fetchone()
-        self.assert_test(result[0] == 15, "Delay minutes stored correctly")
+        self.assert_test(result[0] == 15, "Delay time stored correctly")
         self.assert_test(result[1] == "Equipment malfunction", "Delay reason stored correctly")
         
         # Test multiple delays for same task
         cursor.execute("""
-            INSERT INTO delays (task_id, delay_minutes, reason)
+            INSERT INTO delays (task_id, delay_time, reason)
             VALUES (?, ?, ?)
         """, (task_id, 5, "Material shortage"))
         conn.commit()
@@ -248,29 +218,29 @@ class PerformanceTrackerTester:
         cursor = conn.cursor()
         
         # Create a test task
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Relationship Test Task", 40))
         task_id = cursor.lastrowid
         conn.commit()
         
         # Create related performance record
         cursor.execute("""
-            INSERT INTO performance_records (task_id, actual_time, target_time, performance_percentage)
-            VALUES (?, ?, ?, ?)
-        """, (task_id, 35, 40, (40/35)*100))
+            INSERT INTO performance_records (task_id, actual_time, performance_percentage)
+            VALUES (?, ?, ?)
+        """, (task_id, 35, (40/35)*100))
         
         # Create related delay record
         cursor.execute("""
-            INSERT INTO delays (task_id, delay_minutes, reason)
+            INSERT INTO delays (task_id, delay_time, reason)
             VALUES (?, ?, ?)
         """, (task_id, 10, "Test delay"))
         conn.commit()
         
         # Test relationship query - get all data for a task
         cursor.execute("""
-            SELECT t.task_name, t.target_time, 
+            SELECT t.name, t.target_time, 
                    p.actual_time, p.performance_percentage,
-                   d.delay_minutes, d.reason
+                   d.delay_time, d.reason
             FROM tasks t
             LEFT JOIN performance_records p ON t.id = p.task_id
             LEFT JOIN delays d ON t.id = d.task_id
@@ -292,7 +262,7 @@ class PerformanceTrackerTester:
         
         # Test zero target time (should be prevented in UI, but test DB)
         try:
-            cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+            cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                           ("Zero Time Task", 0))
             conn.commit()
             # If this succeeds, it's not necessarily wrong, but worth noting
@@ -301,7 +271,7 @@ class PerformanceTrackerTester:
             self.assert_test(False, "Zero target time caused error", str(e))
         
         # Test very large numbers
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("Large Time Task", 9999))
         task_id = cursor.lastrowid
         conn.commit()
@@ -311,16 +281,1389 @@ class PerformanceTrackerTester:
         self.assert_test(result == 9999, "Large target time stored correctly")
         
         # Test empty strings
-        cursor.execute("INSERT INTO tasks (task_name, target_time) VALUES (?, ?)", 
+        cursor.execute("INSERT INTO tasks (name, target_time) VALUES (?, ?)", 
                       ("", 30))
         conn.commit()
         
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE task_name = ''")
+        cursor.execute("SELECT COUNT(*) FROM tasks WHERE name = ''")
         count = cursor.fetchone()[0]
         self.assert_test(count == 1, "Empty task name handled")
         
         conn.close()
         
+    def test_record_day_migration(self):
+        """Test record_day backfill and indexed period lookups"""
+        from init_db import migrate_record_day
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        
+        # Legacy rows only have created_at
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                performance_percentage REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.executemany(
+            "INSERT INTO performance_records (performance_percentage, created_at) VALUES (?, ?)",
+            [(100.0, '2025-06-02 08:15:00'), (80.0, '2025-06-02 23:59:59'), (90.0, '2025-06-03 00:00:00')]
+        )
+        
+        migrate_record_day(cursor)
+        cursor.execute("SELECT COUNT(*) FROM performance_records WHERE record_day IS NULL")
+        self.assert_test(cursor.fetchone()[0] == 0, "record_day backfilled for existing rows")
+        
+        cursor.execute("SELECT COUNT(*) FROM performance_records WHERE record_day = ?", ('2025-06-02',))
+        count = cursor.fetchone()[0]
+        self.assert_test(count == 2, "record_day matches DATE(created_at)", f"Found {count} records")
+        
+        # Running the migration again must be harmless
+        migrate_record_day(cursor)
+        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM performance_records WHERE record_day BETWEEN ? AND ?",
+                       ('2025-06-01', '2025-06-07'))
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assert_test("USING INDEX" in plan, "Period query uses record_day index", plan)
+        
+        conn.close()
+        
+    def test_daily_rollups(self):
+        """Test that rollups follow inserts and deletes and match a rebuild"""
+        from rollups import init_rollups, rebuild_rollups, period_summary
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                actual_time REAL NOT NULL,
+                performance_percentage REAL NOT NULL,
+                record_day TEXT
+            )
+        """)
+        cursor.execute("INSERT INTO performance_records (actual_time, performance_percentage, record_day) VALUES (60, 50.0, '2025-06-01')")
+        init_rollups(cursor)
+        
+        cursor.executemany(
+            "INSERT INTO performance_records (actual_time, performance_percentage, record_day) VALUES (?, ?, ?)",
+            [(30, 100.0, '2025-06-02'), (40, 75.0, '2025-06-02'), (20, 150.0, '2025-06-03'), (25, 120.0, None)]
+        )
+        avg_perf, count = period_summary(cursor, '2025-06-02', '2025-06-02')
+        self.assert_test(count == 2 and abs(avg_perf - 87.5) < 0.01, "Daily rollup follows inserts",
+                         f"Got {count} records, {avg_perf}%")
+        
+        # Deleting the day's best record must also move the max back
+        cursor.execute("DELETE FROM performance_records WHERE performance_percentage = 100.0")
+        cursor.execute("SELECT record_count, performance_max, actual_time_sum FROM daily_rollups WHERE day = '2025-06-02'")
+        self.assert_test(cursor.fetchone() == (1, 75.0, 40.0), "Daily rollup follows deletes")
+        
+        # Backfilling a missing record_day counts the row
+        cursor.execute("UPDATE performance_records SET record_day = '2025-06-03' WHERE record_day IS NULL")
+        avg_perf, count = period_summary(cursor, '2025-06-01')
+        self.assert_test(count == 4, "Rollups include backfilled rows", f"Got {count} records")
+        
+        cursor.execute("SELECT * FROM daily_rollups ORDER BY day")
+        incremental = cursor.fetchall()
+        rebuild_rollups(cursor)
+        cursor.execute("SELECT * FROM daily_rollups ORDER BY day")
+        self.assert_test(cursor.fetchall() == incremental, "Incremental rollups match a full rebuild")
+        
+        conn.close()
+        
+    def test_connection_profiles(self):
+        """Test that the shared connection factory applies WAL and profile pragmas"""
+        from db_connection import connect_database, close_database, PROFILES
+        
+        for profile, settings in PROFILES.items():
+            conn = connect_database(self.test_db_path, profile=profile)
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute("PRAGMA cache_size")
+            cache_size = cursor.fetchone()[0]
+            self.assert_test(journal_mode == 'wal' and cache_size == settings['cache_size'],
+                             f"Connection profile '{profile}' applied",
+                             f"journal_mode={journal_mode}, cache_size={cache_size}")
+            close_database(conn)
+        
+    def test_period_grouping(self):
+        """Test SQL grouping for the weekly and monthly detail screens"""
+        from queries import fetch_week_groups, fetch_month_groups
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, target_time REAL)")
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                actual_time REAL,
+                performance_percentage REAL,
+                start_time TEXT,
+                end_time TEXT,
+                created_at TIMESTAMP,
+                record_day TEXT
+            )
+        """)
+        cursor.execute("INSERT INTO tasks VALUES (1, 'Mon02.06', 30)")
+        # Sunday June 1st belongs to the week starting Monday May 26th
+        rows = [('2025-06-01 09:00:00', 50.0)] + [(f'2025-06-0{day} 0{hour}:00:00', 100.0 + hour)
+                                                 for day in (2, 3) for hour in range(3)]
+        cursor.executemany("""
+            INSERT INTO performance_records
+            (task_id, actual_time, performance_percentage, start_time, end_time, created_at, record_day)
+            VALUES (1, 30, ?, '08:00', '08:30', ?, DATE(?))
+        """, [(perf, created_at, created_at) for created_at, perf in rows])
+        
+        days = fetch_week_groups(cursor, '2025-06-02', '2025-06-08')
+        self.assert_test([(day, count, len(records)) for day, count, _, records in days] ==
+                         [('2025-06-03', 3, 3), ('2025-06-02', 3, 3)], "Weekly screen groups by day")
+        
+        weeks = fetch_month_groups(cursor, '2025-06-01', '2025-06-30', shown_per_week=2)
+        summary = [(week, count, round(average, 2), len(records)) for week, count, average, records in weeks]
+        self.assert_test(summary == [('2025-06-02', 6, 101.0, 2), ('2025-05-26', 1, 50.0, 1)],
+                         "Monthly screen groups by week", f"Got {summary}")
+        self.assert_test(weeks[0][3][0][0] == '06/03', "Monthly screen shows newest records first")
+        
+        conn.close()
+        
+    def test_epoch_timestamps(self):
+        """Test created_epoch backfill and the cached timestamp formatter"""
+        from init_db import migrate_created_epoch
+        from time_format import format_time, format_date, format_timestamp
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        for table in ('performance_records', 'delays'):
+            cursor.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, created_at TIMESTAMP)")
+            cursor.execute(f"INSERT INTO {table} (created_at) VALUES ('2025-06-02 23:05:59')")
+        
+        migrate_created_epoch(cursor)
+        migrate_created_epoch(cursor)
+        cursor.execute("SELECT created_epoch FROM performance_records")
+        epoch = cursor.fetchone()[0]
+        cursor.execute("SELECT created_epoch FROM delays")
+        self.assert_test(cursor.fetchone()[0] == epoch, "created_epoch backfilled for both tables")
+        
+        cursor.execute("INSERT INTO delays (created_at) VALUES ('2025-06-02 23:05:59')")
+        cursor.execute("SELECT created_epoch FROM delays WHERE id = ?", (cursor.lastrowid,))
+        self.assert_test(cursor.fetchone()[0] == epoch, "created_epoch filled in for other writers")
+        
+        expected = datetime.strptime('2025-06-02 23:05:59', '%Y-%m-%d %H:%M:%S')
+        self.assert_test(format_time(epoch) == expected.strftime('%H:%M'), "format_time matches strptime")
+        self.assert_test(format_date(epoch, '%m/%d') == expected.strftime('%m/%d'), "format_date matches strptime")
+        self.assert_test(format_timestamp(epoch) == '2025-06-02 23:05', "format_timestamp matches strptime")
+        
+        conn.close()
+    
+    def test_batched_ingest(self):
+        """Test batch validation, task upserts and duplicate skipping"""
+        from init_db import migrate_unique_tasks, migrate_unique_records
+        from ingest import validate_batch, ingest_records
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, target_time INTEGER NOT NULL)")
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                start_time TEXT,
+                end_time TEXT,
+                actual_time INTEGER NOT NULL,
+                performance_percentage REAL NOT NULL,
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                record_day TEXT,
+                created_epoch INTEGER
+            )
+        """)
+        cursor.execute("CREATE TABLE delays (id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER)")
+        # A legacy duplicate task whose delay must move to the kept copy
+        cursor.executemany("INSERT INTO tasks (name, target_time) VALUES (?, ?)", [('Mon02.06', 30), ('Mon02.06', 30)])
+        cursor.execute("INSERT INTO delays (task_id) VALUES (2)")
+        migrate_unique_tasks(cursor)
+        migrate_unique_records(cursor)
+        cursor.execute("SELECT COUNT(*), MIN(d.task_id) FROM tasks, delays d")
+        self.assert_test(cursor.fetchone() == (1, 1), "Duplicate tasks merged before the unique index")
+        
+        entries, errors = validate_batch([
+            ('Mon02.06', '30', '08:00', '08:45', '2025-06-02 08:45:00'),
+            ('Mon02.06', 30, '23:50', '00:20', '2025-06-02 23:55:00'),
+            ('Mon02.06', 30, '08:00', '08:45', '2025-06-02 09:00:00'),
+            ('Mon02.06', 30, '8 am', '09:00'),
+        ])
+        self.assert_test(len(entries) == 3 and [position for position, _ in errors] == [3],
+                         "Batch validation rejects bad times", f"Errors: {errors}")
+        self.assert_test(entries[1]['actual_time'] == 30.0, "Overnight entries span midnight")
+        
+        inserted = ingest_records(cursor, entries)
+        self.assert_test(inserted == 2, "Duplicate within the batch skipped", f"Inserted {inserted}")
+        self.assert_test(ingest_records(cursor, entries[:1]) == 0, "Duplicate of a stored record skipped")
+        
+        cursor.execute("SELECT COUNT(*) FROM tasks")
+        self.assert_test(cursor.fetchone()[0] == 1, "Existing task reused by the upsert")
+        retargeted = dict(entries[0], target_time=45.0)
+        self.assert_test(ingest_records(cursor, [retargeted]) == 0,
+                         "Same task name and times skipped whatever the target time")
+        cursor.execute("SELECT record_day, created_epoch FROM performance_records ORDER BY id LIMIT 1")
+        self.assert_test(cursor.fetchone() == ('2025-06-02', 1748853900), "record_day and created_epoch follow created_at")
+        
+        conn.close()
+        
+    def test_record_deduplication(self):
+        """Test the set-based duplicate cleanup and the unique record index"""
+        from init_db import migrate_unique_records
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        # Task 2 has task 1's name with another target time; task 3 is a different task
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, target_time REAL)")
+        cursor.executemany("INSERT INTO tasks VALUES (?, ?, ?)", [(1, 'Mon02.06', 30), (2, 'Mon02.06', 45), (3, 'Tue03.06', 30)])
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                start_time TEXT,
+                end_time TEXT,
+                record_day TEXT
+            )
+        """)
+        cursor.executemany(
+            "INSERT INTO performance_records (task_id, start_time, end_time, record_day) VALUES (?, ?, ?, ?)",
+            [(1, '08:00', '08:45', '2025-06-02'), (1, '08:00', '08:45', '2025-06-02'),
+             (1, '08:00', '08:45', '2025-06-03'), (1, '08:00', '08:45', '2025-06-02'),
+             (1, None, None, '2025-06-02'), (1, None, None, '2025-06-02'),
+             (2, '08:00', '08:45', '2025-06-02'), (3, '08:00', '08:45', '2025-06-02')]
+        )
+        
+        removed = migrate_unique_records(cursor)
+        cursor.execute("SELECT id FROM performance_records ORDER BY id")
+        kept = [row[0] for row in cursor.fetchall()]
+        self.assert_test(removed == 3 and kept == [1, 3, 5, 6, 8], "Duplicates by task name collapsed to the oldest record",
+                         f"Removed {removed}, kept {kept}")
+        
+        try:
+            cursor.execute("INSERT INTO performance_records (task_id, start_time, end_time, record_day) VALUES (1, '08:00', '08:45', '2025-06-02')")
+            self.assert_test(False, "Unique index rejects duplicates")
+        except sqlite3.IntegrityError:
+            self.assert_test(True, "Unique index rejects duplicates")
+        
+        self.assert_test(migrate_unique_records(cursor) == 0, "Deduplication only runs once")
+        
+        conn.close()
+        
+    def test_online_backup(self):
+        """Test stepwise backups, their integrity check and retention"""
+        from backups import backup_database, prune_backups, list_backups
+        
+        backup_dir = tempfile.mkdtemp()
+        try:
+            conn = sqlite3.connect(self.test_db_path)
+            conn.executemany("INSERT INTO tasks (name, target_time) VALUES (?, ?)",
+                             [(f"Task {i}", 30) for i in range(500)])
+            conn.commit()
+            expected_count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            conn.close()
+            
+            steps = []
+            backup_path = backup_database(self.test_db_path, backup_dir, pages=2, pause=0,
+                                          progress=lambda status, remaining, total: steps.append(remaining))
+            self.assert_test(backup_path is not None and len(steps) > 1, "Backup copied in several steps",
+                             f"{len(steps)} steps")
+            
+            backup = sqlite3.connect(backup_path)
+            count = backup.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            journal_mode = backup.execute("PRAGMA journal_mode").fetchone()[0]
+            backup.close()
+            self.assert_test(count == expected_count and journal_mode == 'delete', "Backup holds every row in one file")
+            
+            # Three backups a day for three weeks of days
+            for day in range(1, 22):
+                for hour in (8, 12, 18):
+                    open(os.path.join(backup_dir, f"performance_202506{day:02d}_{hour:02d}0000.db"), 'w').close()
+            open(os.path.join(backup_dir, "performance_20250621_190000.db.partial"), 'w').close()
+            
+            prune_backups(backup_dir, keep_daily=3, keep_weekly=3)
+            kept = [name for _, name in list_backups(backup_dir)]
+            expected = [os.path.basename(backup_path)] + [f"performance_202506{day:02d}_180000.db" for day in (21, 20, 15)]
+            self.assert_test(kept == expected, "Retention keeps the newest daily and weekly backups", f"Kept {kept}")
+            self.assert_test(len(os.listdir(backup_dir)) == len(expected), "Unfinished backups removed")
+        finally:
+            shutil.rmtree(backup_dir)
+        
+    def test_incremental_snapshots(self):
+        """Test that snapshots store changed chunks only and restore exactly"""
+        import json
+        import hashlib
+        from backups import snapshot_database, restore_snapshot, prune_backups, CHUNK_DIR
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'performance.db')
+            backup_dir = os.path.join(work_dir, 'backups')
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+            conn.executemany("INSERT INTO notes (body) VALUES (?)", [("x" * 200,) for _ in range(2000)])
+            conn.commit()
+            
+            taken = snapshot_database(db_path, backup_dir, chunk_size=4096, pause=0)
+            # Snapshots are named by the second they were taken; date this one back
+            first = os.path.join(os.path.dirname(taken), 'performance_20250601_080000.json')
+            os.rename(taken, first)
+            conn.execute("UPDATE notes SET body = 'changed' WHERE id = 1000")
+            conn.commit()
+            conn.close()
+            second = snapshot_database(db_path, backup_dir, chunk_size=4096, pause=0)
+            
+            with open(first) as f:
+                first_manifest = json.load(f)
+            with open(second) as f:
+                second_manifest = json.load(f)
+            self.assert_test(second_manifest['new_chunks'] <= 3 < len(second_manifest['chunks']),
+                             "Second snapshot stores only changed chunks",
+                             f"{second_manifest['new_chunks']} of {len(second_manifest['chunks'])}")
+            
+            restored_path = os.path.join(work_dir, 'restored.db')
+            for manifest_path, manifest, body in ((first, first_manifest, 'x' * 200), (second, second_manifest, 'changed')):
+                ok = restore_snapshot(manifest_path, restored_path)
+                with open(restored_path, 'rb') as f:
+                    exact = hashlib.sha256(f.read()).hexdigest() == manifest['sha256']
+                restored = sqlite3.connect(restored_path)
+                restored_body = restored.execute("SELECT body FROM notes WHERE id = 1000").fetchone()[0]
+                restored.close()
+                self.assert_test(ok and exact and restored_body == body, "Snapshot restores exactly",
+                                 os.path.basename(manifest_path))
+            
+            chunk_files = lambda: sum(len(names) for _, _, names in os.walk(os.path.join(backup_dir, CHUNK_DIR)))
+            before = chunk_files()
+            prune_backups(backup_dir, keep_daily=1, keep_weekly=1)
+            self.assert_test(chunk_files() == len(set(second_manifest['chunks'])) < before,
+                             "Pruning a snapshot removes its unshared chunks")
+        finally:
+            shutil.rmtree(work_dir)
+        
+    def test_startup_timing(self):
+        """Test lazy imports and the startup timing records"""
+        import startup
+        
+        sys.modules.pop('colorsys', None)
+        recorded = len(startup.timings)
+        module = startup.lazy_import('colorsys')
+        startup.lazy_import('colorsys')
+        labels = [label for label, _ in startup.timings[recorded:]]
+        self.assert_test(module.__name__ == 'colorsys' and labels == ['import colorsys'],
+                         "Lazy import timed on first use only", f"Recorded {labels}")
+                         
+        with startup.timed("build test screen"):
+            pass
+        label, seconds = startup.timings[-1]
+        self.assert_test(label == "build test screen" and seconds >= 0, "Timed block recorded")
+        
+    def test_numpy_analytics(self):
+        """Test the columnar analytics against plain Python results"""
+        from analytics import PerformanceSeries
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, target_time REAL)")
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                actual_time REAL,
+                performance_percentage REAL,
+                created_epoch INTEGER
+            )
+        """)
+        cursor.execute("INSERT INTO tasks VALUES (1, 'Mon02.06', 30)")
+        # Monday 2025-06-02 00:00 UTC, then one record per day at 08:00 and 17:00
+        monday = 1748822400
+        performances = [110, 120, 90, 100, 105, 101, 80, 100, 100, 100]
+        rows = [(monday + day * 86400 + hour * 3600, perf)
+                for day, perf in enumerate(performances[:5]) for hour in (8, 17)]
+        cursor.executemany("INSERT INTO performance_records (task_id, actual_time, performance_percentage, created_epoch) VALUES (1, 30, ?, ?)",
+                           [(perf, epoch) for epoch, perf in rows])
+                           
+        series = PerformanceSeries(utc_offset=0)
+        self.assert_test(series.load(cursor) == 10 and series.target[0] == 30.0, "Series loads every record")
+        
+        perf = [perf for _, perf in rows]
+        rolling = series.rolling_average(3)
+        expected = [sum(perf[i:i + 3]) / 3 for i in range(len(perf) - 2)]
+        self.assert_test(len(rolling) == len(expected) and all(abs(a - b) < 1e-9 for a, b in zip(rolling, expected)),
+                         "Rolling average matches a Python loop")
+        self.assert_test(abs(series.percentiles((50,))[0] - sorted(perf)[4:6][0] / 2 - sorted(perf)[4:6][1] / 2) < 1e-9,
+                         "Median matches sorted middle values")
+                         
+        counts, averages = series.by_weekday()
+        self.assert_test(list(counts) == [2, 2, 2, 2, 2, 0, 0] and averages[0] == 110, "Weekday distribution")
+        counts, _ = series.by_hour()
+        self.assert_test(counts[8] == 5 and counts[17] == 5 and counts.sum() == 10, "Hour distribution")
+        
+        # Daily averages 110, 120, 90, 100, 105 against a 100% target
+        day = monday // 86400
+        self.assert_test(series.streaks(today=day + 4) == (2, 2), "Streaks of days on target",
+                         f"Got {series.streaks(today=day + 4)}")
+                         
+        cursor.execute("INSERT INTO performance_records (task_id, actual_time, performance_percentage, created_epoch) VALUES (1, 30, 100, ?)",
+                       (monday - 86400,))
+        appended = series.refresh(cursor)
+        self.assert_test(appended == 1 and len(series) == 11 and series.epochs[0] == monday - 86400,
+                         "Refresh appends only new records in time order")
+                         
+        # Ids out of time order, as imports and backfills leave them
+        cursor.execute("DELETE FROM performance_records")
+        cursor.executemany("INSERT INTO performance_records (id, task_id, actual_time, performance_percentage, created_epoch) VALUES (?, 1, 30, 100, ?)",
+                           [(1, monday + 300), (2, monday + 100), (3, monday + 200)])
+        series = PerformanceSeries(utc_offset=0)
+        series.load(cursor)
+        self.assert_test(list(series.epochs) == [monday + 100, monday + 200, monday + 300] and list(series.ids) == [2, 3, 1],
+                         "Series loads records in time order, not id order", f"Got {list(series.ids)}")
+        series = PerformanceSeries(utc_offset=0)
+        series.append([5, 4], [monday + 50, monday + 10], [30, 30], [90, 80], [30, 30])
+        self.assert_test(list(series.ids) == [4, 5], "An unsorted first batch is sorted", f"Got {list(series.ids)}")
+        
+        conn.close()
+        
+    def test_delay_stats(self):
+        """Test reason normalization, weekly delay totals and top causes"""
+        from delay_stats import init_delay_stats, rebuild_delay_stats, top_delay_causes, weekly_delay_totals
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE delays (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                delay_time REAL NOT NULL,
+                reason TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Existing delays are picked up when the tables are first built
+        cursor.execute("INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (1, 10, 'Traffic', '2025-06-02 08:00:00')")
+        init_delay_stats(cursor)
+        cursor.executemany(
+            "INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (1, ?, ?, ?)",
+            [(5, '  traffic ', '2025-06-04 08:00:00'), (20, 'Machine down', '2025-06-05 08:00:00'),
+             (30, 'TRAFFIC', '2025-06-10 08:00:00'), (7, 'Machine down', '2025-06-11 08:00:00')]
+        )
+        
+        cursor.execute("SELECT COUNT(*) FROM delay_reasons")
+        self.assert_test(cursor.fetchone()[0] == 2, "Reasons differing in case and spaces share an entry")
+        
+        weeks = weekly_delay_totals(cursor, '2025-06-01', '2025-06-30')
+        self.assert_test(weeks == [('2025-06-09', 'Traffic', 1, 30.0), ('2025-06-09', 'Machine down', 1, 7.0),
+                                   ('2025-06-02', 'Machine down', 1, 20.0), ('2025-06-02', 'Traffic', 2, 15.0)],
+                         "Delays summed per reason and Monday-based week", f"Got {weeks}")
+                         
+        causes = top_delay_causes(cursor)
+        self.assert_test(causes == [('Traffic', 3, 45.0), ('Machine down', 2, 27.0)], "Top causes from weekly totals",
+                         f"Got {causes}")
+        self.assert_test(top_delay_causes(cursor, start_day='2025-06-09', limit=1) == [('Traffic', 1, 30.0)],
+                         "Top causes limited to recent weeks")
+                         
+        cursor.execute("DELETE FROM delays WHERE reason = 'TRAFFIC'")
+        cursor.execute("UPDATE delays SET delay_time = 8 WHERE delay_time = 7")
+        cursor.execute("SELECT * FROM delay_weekly_totals ORDER BY week_start, reason_id")
+        incremental = cursor.fetchall()
+        rebuild_delay_stats(cursor)
+        cursor.execute("SELECT * FROM delay_weekly_totals ORDER BY week_start, reason_id")
+        self.assert_test(cursor.fetchall() == incremental, "Incremental delay totals match a full rebuild")
+        
+        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM delays WHERE task_id = ? ORDER BY created_at DESC", (1,))
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assert_test("idx_delays_task_created" in plan and "TEMP B-TREE" not in plan,
+                         "Task delay history uses its index", plan)
+                         
+        conn.close()
+        
+    def test_task_timeline(self):
+        """Test the merged, keyset-paged task timeline"""
+        from init_db import migrate_task_timeline_index
+        from delay_stats import init_delay_stats
+        from queries import fetch_task_timeline, timeline_key, add_task_performance, add_delay, TIMELINE_QUERY
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, target_time REAL)")
+        cursor.execute("""
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, actual_time REAL, performance_percentage REAL,
+                notes TEXT, record_day TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, created_epoch INTEGER
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE delays (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, delay_time REAL NOT NULL, reason TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, created_epoch INTEGER
+            )
+        """)
+        migrate_task_timeline_index(cursor)
+        init_delay_stats(cursor)
+        cursor.executemany("INSERT INTO tasks VALUES (?, ?, 30)", [(1, 'Timeline'), (2, 'Other')])
+        cursor.executemany(
+            "INSERT INTO performance_records (task_id, actual_time, performance_percentage, created_at) VALUES (?, 30, 100, ?)",
+            [(1, '2025-06-01 08:00:00'), (1, '2025-06-03 08:00:00'), (2, '2025-06-04 08:00:00'), (1, '2025-06-05 08:00:00')]
+        )
+        cursor.executemany(
+            "INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (?, 5, 'Jam', ?)",
+            [(1, '2025-06-02 08:00:00'), (1, '2025-06-03 08:00:00'), (2, '2025-06-06 08:00:00')]
+        )
+        
+        entries = []
+        after = None
+        while True:
+            page = fetch_task_timeline(cursor, 1, after=after, limit=2)
+            entries.extend(page)
+            if len(page) < 2:
+                break
+            after = timeline_key(page[-1])
+        order = [(created_at[:10], kind) for kind, _, created_at, *_ in entries]
+        self.assert_test(order == [('2025-06-05', 'record'), ('2025-06-03', 'record'), ('2025-06-03', 'delay'),
+                                   ('2025-06-02', 'delay'), ('2025-06-01', 'record')],
+                         "Records and delays merged newest first across pages", f"Got {order}")
+        
+        entry = add_task_performance(cursor, 1, 20, "Quick")
+        self.assert_test(entry[0] == 'record' and entry[6] == "Quick" and abs(entry[5] - 150) < 0.01,
+                         "Saved record returned as a timeline entry", f"Got {entry}")
+        delay = add_delay(cursor, 1, 5, "Jam")
+        self.assert_test(fetch_task_timeline(cursor, 1, limit=1)[0] == entry and delay[0] == 'delay' and delay[6] == "Jam",
+                         "Saved entries head the timeline", f"Got {delay}")
+        
+        query = TIMELINE_QUERY.format(record_filter='', delay_filter='')
+        cursor.execute("EXPLAIN QUERY PLAN " + query, {'task_id': 1, 'limit': 2})
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assert_test("MERGE" in plan and "idx_performance_records_task_created" in plan and "idx_delays_task_created" in plan,
+                         "Timeline merges two index scans", plan)
+        
+        conn.close()
+        
+    def test_keyed_list(self):
+        """Test that list refreshes only touch the rows that changed"""
+        from keyed_list import KeyedList
+        
+        class Row:
+            def __init__(self, text):
+                self.text = text
+                self.parent = None
+                
+        class Container:
+            # Keeps children bottom first, like a Kivy layout
+            def __init__(self):
+                self.children = []
+                
+            def add_widget(self, widget, index=0):
+                widget.parent = self
+                self.children.insert(index, widget)
+                
+            def remove_widget(self, widget):
+                widget.parent = None
+                self.children.remove(widget)
+                
+        container = Container()
+        rows = KeyedList(container)
+        shown = lambda: [widget.text for widget in reversed(container.children)]
+        
+        self.assert_test(rows.update([(key, Row, {'text': key}) for key in 'abc']) == (3, 0, 0),
+                         "First refresh builds every row")
+        first = rows.widget('b')
+        self.assert_test(rows.update([(key, Row, {'text': key}) for key in 'abc']) == (0, 0, 0),
+                         "Unchanged refresh touches no widgets")
+        
+        counts = rows.update([('d', Row, {'text': 'd'}), ('b', Row, {'text': 'B'}), ('a', Row, {'text': 'a'})])
+        self.assert_test(counts == (1, 1, 1) and shown() == ['d', 'B', 'a'],
+                         "Only the delta is added, updated or removed", f"Got {counts}, {shown()}")
+        self.assert_test(rows.widget('b') is first, "Updated rows keep their widget")
+        
+        rows.update([])
+        self.assert_test(container.children == [] and len(rows) == 0, "Emptied list removes every row")
+        
+    def test_data_version(self):
+        """Test the worker's data version and the cached screen queries"""
+        import threading
+        from functools import partial
+        from db_worker import DatabaseWorker, CachedQuery
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'version.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            
+            worker = DatabaseWorker(db_path)
+            def settle():
+                # Jobs run in order, so once the second runs the first has updated the version
+                done = threading.Event()
+                worker.submit(lambda cursor: None)
+                worker.submit(lambda cursor: done.set())
+                done.wait(5)
+                return worker.version
+                
+            start = settle()
+            self.assert_test(settle() == start, "Reads leave the data version alone")
+            worker.submit(lambda cursor: cursor.execute("INSERT INTO items DEFAULT VALUES"), commit=True)
+            after_write = settle()
+            self.assert_test(after_write[1] == start[1] + 1, "Writes through the worker bump the version")
+            conn.execute("INSERT INTO items DEFAULT VALUES")
+            conn.commit()
+            after_external = settle()
+            self.assert_test(after_external[0] != after_write[0], "Writes from other connections bump the version")
+            
+            import time
+            from kivy.clock import Clock
+            def count(cursor):
+                return cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            def pump(shown, expected):
+                # Callbacks come back through the Kivy clock
+                deadline = time.time() + 5
+                while len(shown) < expected and time.time() < deadline:
+                    Clock.tick()
+                    time.sleep(0.01)
+                return shown
+                
+            shown = []
+            cache = CachedQuery(worker, size=2)
+            cache.load('home', count, shown.append, key='home')
+            pump(shown, 1)
+            # Back home while the write is still queued behind a slow job, with a prefetch read before it
+            gate = threading.Event()
+            worker.submit(lambda cursor: gate.wait(5))
+            cache.prefetch('next', count)
+            worker.submit(lambda cursor: cursor.execute("INSERT INTO items DEFAULT VALUES"), commit=True)
+            cache.load('home', count, shown.append, key='home')
+            cache.load('next', count, shown.append, key='next')
+            gate.set()
+            pump(shown, 3)
+            self.assert_test(shown == [2, 3, 3] and cache.hits == 0,
+                             "Loads after a queued write see it, not the cache or an older prefetch", f"Showed {shown}")
+            worker.close()
+            conn.close()
+        finally:
+            shutil.rmtree(work_dir)
+        
+        class Worker:
+            version = (1, 0)
+            def submit(self, job, callback, key=None):
+                callback(job(None))
+            def cancel(self, key):
+                pass
+                
+        queries = []
+        def job(day, cursor):
+            queries.append(day)
+            return f"rows of {day}"
+        shown = []
+        fake = Worker()
+        cache = CachedQuery(fake)
+        cache.load('mon', partial(job, 'mon'), shown.append)
+        cache.load('mon', partial(job, 'mon'), shown.append)
+        self.assert_test(queries == ['mon'] and shown == ['rows of mon'] * 2 and cache.hits == 1,
+                         "Unchanged data is shown without a query", f"Queried {queries}")
+        cache.load('tue', partial(job, 'tue'), shown.append)
+        fake.version = (1, 1)
+        cache.load('tue', partial(job, 'tue'), shown.append)
+        self.assert_test(queries == ['mon', 'tue', 'tue'], "New parameters or a new version query again",
+                         f"Queried {queries}")
+        
+    def test_period_cache(self):
+        """Test the bounded period cache and neighbour prefetching"""
+        from datetime import date
+        from functools import partial
+        from db_worker import CachedQuery
+        from period_details import shift_month, month_end
+        
+        class Worker:
+            version = (1, 0)
+            def submit(self, job, callback, key=None, on_error=None):
+                callback(job(None))
+            def cancel(self, key):
+                pass
+                
+        queries = []
+        def job(period, cursor):
+            queries.append(period)
+            return period
+        shown = []
+        cache = CachedQuery(Worker(), size=3)
+        
+        cache.load(5, partial(job, 5), shown.append)
+        cache.prefetch(4, partial(job, 4))
+        cache.prefetch(6, partial(job, 6))
+        cache.prefetch(4, partial(job, 4))
+        cache.load(4, partial(job, 4), shown.append)
+        self.assert_test(queries == [5, 4, 6] and shown == [5, 4], "Paging to a prefetched period needs no query",
+                         f"Queried {queries}")
+        
+        cache.prefetch(3, partial(job, 3))
+        self.assert_test(len(cache) == 3, "Cache stays within its size")
+        cache.load(4, partial(job, 4), shown.append)
+        cache.load(5, partial(job, 5), shown.append)
+        self.assert_test(queries == [5, 4, 6, 3, 5], "Least recently used period evicted first", f"Queried {queries}")
+        
+        class QueueWorker(Worker):
+            """Runs jobs only when asked, skipping ones whose key has moved on, like DatabaseWorker."""
+            def __init__(self):
+                self.jobs = []
+                self.latest = {}
+            def submit(self, job, callback, key=None, on_error=None):
+                self.jobs.append((len(self.jobs), key, job, callback, on_error))
+                if key is not None:
+                    self.latest[key] = len(self.jobs) - 1
+            def cancel(self, key):
+                self.latest[key] = None
+            def live(self):
+                return [item for item in self.jobs if item[1] is None or self.latest.get(item[1]) == item[0]]
+            def run(self):
+                jobs, self.jobs = self.live(), []
+                for _, _, job, callback, on_error in jobs:
+                    try:
+                        result = job(None)
+                    except RuntimeError as e:
+                        on_error(e)
+                    else:
+                        callback(result)
+                
+        worker = QueueWorker()
+        queries, shown = [], []
+        cache = CachedQuery(worker, size=9)
+        for period in range(20):
+            cache.prefetch(period, partial(job, period))
+        cache.prefetch(19, partial(job, 19))
+        self.assert_test(len(worker.live()) == 2, "Fast paging keeps only the newest prefetches", f"{len(worker.live())} live")
+        cache.load(19, partial(job, 19), shown.append, key='screen')
+        self.assert_test(len(worker.jobs) == 20, "Loading a period being prefetched queries nothing new")
+        worker.run()
+        self.assert_test(queries == [18, 19] and shown == [19], "Prefetch answers the waiting load", f"Queried {queries}")
+        
+        def broken(cursor):
+            raise RuntimeError("disk I/O error")
+        cache.prefetch(30, broken)
+        cache.load(30, partial(job, 30), shown.append, key='screen')
+        worker.run()
+        worker.run()
+        self.assert_test(shown == [19, 30], "A load waiting on a failed prefetch queries itself", f"Shown {shown}")
+        
+        months = [shift_month(date(2025, 1, 1), -1), shift_month(date(2025, 12, 1), 1), month_end(date(2024, 2, 1))]
+        self.assert_test(months == [date(2024, 12, 1), date(2026, 1, 1), date(2024, 2, 29)], "Month navigation crosses years",
+                         f"Got {months}")
+        
+    def test_export(self):
+        """Test streamed CSV and JSON Lines exports with filters"""
+        import csv
+        import json
+        from export import export_data, export_chunks
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'export.db')
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, target_time REAL)")
+            cursor.execute("""
+                CREATE TABLE performance_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, actual_time REAL,
+                    performance_percentage REAL, start_time TEXT, end_time TEXT, notes TEXT,
+                    record_day TEXT, created_at TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE delays (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, delay_time REAL NOT NULL,
+                    reason TEXT, created_at TIMESTAMP
+                )
+            """)
+            cursor.executemany("INSERT INTO tasks VALUES (?, ?, 30)", [(1, 'Mon02.06'), (2, 'Tue03.06')])
+            cursor.executemany("""
+                INSERT INTO performance_records
+                (task_id, actual_time, performance_percentage, start_time, end_time, notes, record_day, created_at)
+                VALUES (?, 30, 100, '08:00', '08:30', 'ok', DATE(?), ?)
+            """, [(1, '2025-06-02 09:00:00', '2025-06-02 09:00:00'), (2, '2025-06-03 09:00:00', '2025-06-03 09:00:00'),
+                  (2, '2025-06-04 09:00:00', '2025-06-04 09:00:00')])
+            cursor.executemany("INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (?, 5, 'Jam', ?)",
+                               [(1, '2025-06-02 10:00:00'), (2, '2025-06-03 23:59:00')])
+            conn.commit()
+            
+            chunks = [len(rows) for rows in export_chunks(cursor, chunk_size=2)]
+            self.assert_test(chunks == [2, 2, 1], "Export read in chunks", f"Got {chunks}")
+            conn.close()
+            
+            csv_path = os.path.join(work_dir, 'out.csv')
+            count = export_data(csv_path, db_path, chunk_size=2)
+            with open(csv_path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            order = [(row['kind'], row['created_at'][:10]) for row in rows]
+            self.assert_test(count == 5 and order == [('record', '2025-06-02'), ('delay', '2025-06-02'),
+                                                      ('record', '2025-06-03'), ('delay', '2025-06-03'),
+                                                      ('record', '2025-06-04')],
+                             "CSV export merges records and delays by time", f"Got {order}")
+            
+            jsonl_path = os.path.join(work_dir, 'out.jsonl')
+            count = export_data(jsonl_path, db_path, start_day='2025-06-03', end_day='2025-06-03', task_id=2)
+            with open(jsonl_path) as f:
+                lines = [json.loads(line) for line in f]
+            self.assert_test(count == 2 and [line['kind'] for line in lines] == ['record', 'delay']
+                             and lines[1]['task'] == 'Tue03.06' and lines[1]['note'] == 'Jam',
+                             "JSON Lines export filtered by day and task", f"Got {lines}")
+            self.assert_test(export_data(os.path.join(work_dir, 'out.txt'), db_path) is None
+                             and sorted(os.listdir(work_dir)) == ['export.db', 'out.csv', 'out.jsonl'],
+                             "Unknown formats rejected without leaving files")
+        finally:
+            shutil.rmtree(work_dir)
+        
+    def create_app_database(self, db_path):
+        """Create an empty database with the app's current schema at db_path"""
+        from init_db import create_schema
+        
+        conn = sqlite3.connect(db_path)
+        create_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+        
+    def create_baseline_database(self, db_path):
+        """Create a database with the first release's tables at db_path, holding one record and one delay"""
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, target_time INTEGER NOT NULL,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE performance_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, start_time TEXT, end_time TEXT,
+                actual_time INTEGER NOT NULL, performance_percentage REAL NOT NULL, notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE delays (id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, delay_time INTEGER NOT NULL,
+                                 reason TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO tasks (name, target_time) VALUES ('Legacy', 30);
+            INSERT INTO performance_records (task_id, start_time, end_time, actual_time, performance_percentage, created_at)
+            VALUES (1, '08:00', '08:30', 30, 100.0, '2025-05-05 08:30:00');
+            INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (1, 10, 'Jam', '2025-05-05 09:00:00');
+        """)
+        conn.commit()
+        conn.close()
+        
+    def test_bulk_import(self):
+        """Test importing CSV, JSON Lines and another database"""
+        import json
+        from importer import import_data
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'performance.db')
+            self.create_app_database(db_path)
+            
+            csv_path = os.path.join(work_dir, 'history.csv')
+            with open(csv_path, 'w') as f:
+                f.write("task_name,target_time,start_time,finish_time,created_at,notes\n"
+                        "Mon02.06,30,08:00,08:45,2025-06-02 08:45:00,\n"
+                        "Mon02.06,30,23:50,00:20,2025-06-02 23:55:00,Night shift\n"
+                        "Mon02.06,30,08:00,08:45,2025-06-02 09:00:00,\n"
+                        "Mon02.06,30,8 am,09:00,,\n")
+            result = import_data(csv_path, db_path, workers=1)
+            self.assert_test(result[:3] == (2, 0, 1) and [position for position, _ in result[3]] == [5],
+                             "CSV import skips duplicates and reports bad rows", f"Got {result}")
+            
+            conn = sqlite3.connect(db_path)
+            night = conn.execute("SELECT actual_time, performance_percentage, notes FROM performance_records WHERE start_time = '23:50'").fetchone()
+            conn.close()
+            self.assert_test(night == (30, 100.0, 'Night shift'), "Imported overnight record spans midnight", f"Got {night}")
+            
+            jsonl_path = os.path.join(work_dir, 'history.jsonl')
+            with open(jsonl_path, 'w') as f:
+                for row in ({'kind': 'record', 'task': 'Tue03.06', 'target_time': 30, 'minutes': 40,
+                             'created_at': '2025-06-03T10:00:00+02:00'},
+                            {'kind': 'delay', 'task': 'Tue03.06', 'target_time': 30, 'minutes': 15,
+                             'note': 'Jam', 'created_at': '2025-06-03 09:00:00'}):
+                    f.write(json.dumps(row) + "\n")
+            result = import_data(jsonl_path, db_path, workers=1)
+            self.assert_test(result == (1, 1, 0, []), "JSON Lines import loads records and delays", f"Got {result}")
+            self.assert_test(import_data(jsonl_path, db_path, workers=1) == (0, 0, 2, []),
+                             "Importing the same file twice adds nothing")
+            with open(jsonl_path, 'a') as f:
+                f.write('{"task": "Tue03.06", "target_time": 30,\n[1, 2]\n')
+            result = import_data(jsonl_path, db_path, workers=1)
+            self.assert_test(result and result[:3] == (0, 0, 2) and [position for position, _ in result[3]] == [3, 4],
+                             "Malformed and non-object JSON lines reported per row", f"Got {result}")
+            
+            # Merge everything into a second device's database
+            other_path = os.path.join(work_dir, 'other.db')
+            self.create_app_database(other_path)
+            result = import_data(db_path, other_path)
+            conn = sqlite3.connect(other_path)
+            created = conn.execute("SELECT created_at FROM performance_records WHERE start_time IS NULL").fetchone()
+            delay_totals = conn.execute("SELECT delay_count FROM delay_weekly_totals").fetchall()
+            conn.close()
+            self.assert_test(result == (3, 1, 0, []) and created == ('2025-06-03 08:00:00',) and delay_totals == [(1,)],
+                             "Database merge copies records and delays", f"Got {result}, {created}, {delay_totals}")
+                             
+            # A device that never ran an upgraded app; importing must not change it either
+            baseline_path = os.path.join(work_dir, 'baseline.db')
+            self.create_baseline_database(baseline_path)
+            result = import_data(baseline_path, other_path)
+            conn = sqlite3.connect(baseline_path)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(performance_records)")]
+            conn.close()
+            self.assert_test(result == (1, 1, 0, []) and 'record_day' not in columns,
+                             "Database merge reads an unmigrated database", f"Got {result}, {columns}")
+                             
+            # Many more chunks than the pool keeps in flight, still parsed in order
+            many_path = os.path.join(work_dir, 'many.csv')
+            with open(many_path, 'w') as f:
+                f.write("task_name,target_time,minutes,created_at\n")
+                f.writelines(f"Bulk,30,{minutes},2025-07-01 08:{minutes:02d}:00\n" for minutes in range(1, 41))
+                f.write("Bulk,30,-5,\n")
+            result = import_data(many_path, db_path, workers=2, chunk_size=3)
+            self.assert_test(result and result[0] == 40 and [position for position, _ in result[3]] == [42],
+                             "Chunked pool import keeps row positions", f"Got {result}")
+        finally:
+            shutil.rmtree(work_dir)
+            
+        import time
+        from importer import parse_timestamp
+        saved_tz = os.environ.get('TZ')
+        try:
+            os.environ['TZ'] = 'Asia/Kolkata'
+            time.tzset()
+            self.assert_test(parse_timestamp('2025-06-03 09:00:00') == '2025-06-03 09:00:00' and
+                             parse_timestamp('2025-06-03 09:00:00', local_time=True) == '2025-06-03 03:30:00',
+                             "Naive timestamps read as UTC, or as local time when asked")
+        finally:
+            if saved_tz is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = saved_tz
+            time.tzset()
+        
+    def test_benchmark(self):
+        """Test the history generator and the benchmark comparison"""
+        import json
+        from datetime import date
+        from benchmark import generate_history, benchmark_size, compare_results
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'performance.db')
+            self.create_app_database(db_path)
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            records, delays, duplicates = generate_history(cursor, 800, years=1, seed=3, today=date(2025, 6, 30))
+            
+            cursor.execute("SELECT COUNT(*), MIN(record_day), MAX(record_day) FROM performance_records")
+            count, first_day, last_day = cursor.fetchone()
+            self.assert_test(count == records + duplicates and duplicates > 0,
+                             "History holds the requested records plus duplicates", f"Got {count}, {duplicates}")
+            self.assert_test(first_day == '2024-07-01' and last_day >= '2025-06-30',
+                             "History spans the requested years", f"Got {first_day} to {last_day}")
+            cursor.execute("SELECT COUNT(*) FROM delays")
+            self.assert_test(cursor.fetchone()[0] == delays > 0, "Delays generated with the records")
+            cursor.execute("SELECT COUNT(DISTINCT reason), (SELECT COUNT(*) FROM delay_reasons) FROM delays")
+            spellings, reasons = cursor.fetchone()
+            self.assert_test(reasons < spellings, "Delay reasons vary in spelling", f"Got {reasons} of {spellings}")
+            cursor.execute("SELECT SUM(record_count) FROM daily_rollups")
+            self.assert_test(cursor.fetchone()[0] == count, "Generated records reach the rollups")
+            cursor.execute("SELECT COUNT(*) FROM performance_records WHERE end_time < start_time")
+            self.assert_test(cursor.fetchone()[0] > 0, "Some shifts run past midnight")
+            conn.close()
+        finally:
+            shutil.rmtree(work_dir)
+            
+        result = benchmark_size(300, years=1, repeats=1)
+        paths = {'duplicate_check', 'duplicate_cleanup', 'home_summaries', 'day_load', 'week_load', 'month_load',
+                 'records_first_page', 'records_deep_page', 'task_timeline', 'delay_causes', 'backup', 'export_csv'}
+        self.assert_test(set(result['timings']) == paths and json.loads(json.dumps(result)) == result,
+                         "Every query path timed and JSON-ready", f"Got {sorted(result['timings'])}")
+        
+        old = {'label': 'old', 'sizes': {'300': result}}
+        new = json.loads(json.dumps(old))
+        new['sizes']['300']['timings']['backup']['median_ms'] = result['timings']['backup']['median_ms'] * 2 + 1
+        self.assert_test(compare_results(old, old) == [] and
+                         [path for _, path, _, _ in compare_results(old, new)] == ['backup'],
+                         "Comparison reports only the slower path")
+        
+    def test_query_plans(self):
+        """Test that every registered query reads an index"""
+        from init_db import create_schema
+        from query_plans import QUERIES, run_checks, query_plan, plan_problems
+        
+        results = run_checks(records=2000, years=1)
+        checked = {name for name, _, _, _, _ in results}
+        self.assert_test(checked == {name for name, _, _ in QUERIES},
+                         "Every registered query ran", f"Missing {sorted({name for name, _, _ in QUERIES} - checked)}")
+        scanning = [name for name, _, _, _, problems in results if problems]
+        self.assert_test(not scanning, "No hot query scans a table", f"Scanning: {scanning}")
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        create_schema(cursor)
+        plan = query_plan(cursor, "SELECT COUNT(*) FROM performance_records WHERE DATE(created_at) = '2025-01-01'")
+        self.assert_test(plan_problems(plan, 'hot') and not plan_problems(plan, 'maintenance'),
+                         "A filter on an expression is caught as a table scan", f"Plan: {plan}")
+        plan = query_plan(cursor, "SELECT id FROM performance_records ORDER BY created_at DESC LIMIT 10")
+        self.assert_test(plan_problems(plan, 'hot') and not plan_problems(plan, 'index_walk'),
+                         "An ordered index walk only passes as one", f"Plan: {plan}")
+        conn.close()
+        
+    def test_schema_migrations(self):
+        """Test the versioned, batched schema migrations"""
+        from init_db import MIGRATIONS, create_schema
+        from rollups import init_rollups, rebuild_rollups
+        from delay_stats import init_delay_stats, rebuild_delay_stats
+        
+        def legacy_database():
+            """A database from the first release: INTEGER times, none of the later columns, duplicates."""
+            conn = sqlite3.connect(':memory:')
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, target_time INTEGER NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+            cursor.execute("""
+                CREATE TABLE performance_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, start_time TEXT, end_time TEXT,
+                    actual_time INTEGER NOT NULL, performance_percentage REAL NOT NULL, notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE TABLE delays (id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER, delay_time INTEGER NOT NULL, reason TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+            cursor.executemany("INSERT INTO tasks (name, target_time) VALUES (?, ?)", [('Shift', 30), ('Shift', 30), ('Audit', 45)])
+            cursor.executemany("""
+                INSERT INTO performance_records (task_id, start_time, end_time, actual_time, performance_percentage, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(1 + i % 3, f'{8 + i % 5:02d}:00', f'{8 + i % 5:02d}:30', 30 + i % 4, 100.0 - i, f'2025-06-{1 + i % 9:02d} 10:{i:02d}:00')
+                  for i in range(23)] + [(2, '08:00', '08:30', 30, 100.0, '2025-06-01 10:00:00')])
+            cursor.executemany("INSERT INTO delays (task_id, delay_time, reason, created_at) VALUES (?, ?, ?, ?)",
+                               [(1 + i % 3, 5 + i, ('Jam', 'jam ', 'Power')[i % 3], f'2025-06-{1 + i % 9:02d} 11:00:00')
+                                for i in range(11)])
+            conn.commit()
+            return conn
+            
+        conn = legacy_database()
+        cursor = conn.cursor()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        version = create_schema(cursor, batch_size=4)
+        conn.set_trace_callback(None)
+        cursor.execute("PRAGMA user_version")
+        self.assert_test(version == len(MIGRATIONS) == cursor.fetchone()[0], "Every migration recorded in user_version")
+        backfills = [statement for statement in statements if 'SET record_day = DATE(created_at)' in statement]
+        self.assert_test(len(backfills) == 6, "Backfill runs in batches", f"Got {len(backfills)} statements")
+        self.assert_test(not conn.in_transaction, "Migrations leave nothing uncommitted")
+        
+        cursor.execute("SELECT COUNT(*) FROM performance_records WHERE record_day IS NULL OR created_epoch IS NULL")
+        self.assert_test(cursor.fetchone()[0] == 0, "Legacy rows backfilled")
+        cursor.execute("SELECT COUNT(*) FROM tasks")
+        self.assert_test(cursor.fetchone()[0] == 2, "Duplicate tasks merged")
+        cursor.execute("SELECT day, record_count, performance_sum, performance_min, performance_max, actual_time_sum FROM daily_rollups ORDER BY day")
+        batched_rollups = cursor.fetchall()
+        cursor.execute("SELECT * FROM delay_weekly_totals ORDER BY week_start, reason_id")
+        batched_totals = cursor.fetchall()
+        rebuild_rollups(cursor)
+        rebuild_delay_stats(cursor)
+        cursor.execute("SELECT day, record_count, performance_sum, performance_min, performance_max, actual_time_sum FROM daily_rollups ORDER BY day")
+        self.assert_test(cursor.fetchall() == batched_rollups and batched_rollups, "Batched rollups match a rebuild")
+        cursor.execute("SELECT * FROM delay_weekly_totals ORDER BY week_start, reason_id")
+        self.assert_test(cursor.fetchall() == batched_totals and batched_totals, "Batched delay totals match a rebuild")
+        conn.commit()
+        
+        cursor.execute("INSERT INTO performance_records (task_id, actual_time, performance_percentage) VALUES (1, 30, 100)")
+        cursor.execute("SELECT record_day FROM performance_records WHERE id = ?", (cursor.lastrowid,))
+        self.assert_test(cursor.fetchone()[0] is not None, "record_day filled in for other writers")
+        conn.commit()
+        
+        statements = []
+        conn.set_trace_callback(statements.append)
+        create_schema(cursor)
+        conn.set_trace_callback(None)
+        self.assert_test(statements == ["PRAGMA user_version"], "A current database runs no steps", f"Ran {statements}")
+        
+        # As if an upgrade stopped after the first step
+        cursor.execute("UPDATE performance_records SET record_day = NULL WHERE id > 10")
+        cursor.execute("PRAGMA user_version = 1")
+        conn.commit()
+        self.assert_test(create_schema(cursor, batch_size=4) == len(MIGRATIONS), "An interrupted upgrade resumes")
+        cursor.execute("SELECT COUNT(*) FROM performance_records WHERE record_day IS NULL")
+        self.assert_test(cursor.fetchone()[0] == 0, "Resumed backfill completes")
+        conn.close()
+        
+        def interrupt(conn, table):
+            """Run create_schema until its second committed batch into table, as if the app was killed there."""
+            batches = []
+            conn.set_trace_callback(lambda statement: batches.append(statement) if statement.lstrip().startswith(f"INSERT INTO {table}") else None)
+            conn.set_progress_handler(lambda: len(batches) >= 2, 1)
+            try:
+                create_schema(conn.cursor(), batch_size=4)
+            except sqlite3.OperationalError:
+                conn.rollback()
+            finally:
+                conn.set_trace_callback(None)
+                conn.set_progress_handler(None, 1)
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            return version, cursor.fetchone()[0]
+            
+        # Killed part way through building the rollups, then the delay totals
+        steps = [step for step, batched in MIGRATIONS]
+        conn = legacy_database()
+        cursor = conn.cursor()
+        version, rows = interrupt(conn, 'daily_rollups')
+        self.assert_test(version == steps.index(init_rollups) and 0 < rows < len(batched_rollups),
+                         "Rollups left partial by an interrupted build", f"Got version {version}, {rows} days")
+        version, rows = interrupt(conn, 'delay_weekly_totals')
+        self.assert_test(version == steps.index(init_delay_stats) and 0 < rows < len(batched_totals),
+                         "Delay totals left partial by an interrupted build", f"Got version {version}, {rows} totals")
+        create_schema(cursor, batch_size=4)
+        cursor.execute("SELECT day, record_count, performance_sum, performance_min, performance_max, actual_time_sum FROM daily_rollups ORDER BY day")
+        self.assert_test(cursor.fetchall() == batched_rollups, "Interrupted rollup build starts over and completes")
+        cursor.execute("SELECT * FROM delay_weekly_totals ORDER BY week_start, reason_id")
+        self.assert_test(cursor.fetchall() == batched_totals, "Interrupted delay totals build starts over and completes")
+        cursor.execute("SELECT COUNT(*) FROM pending_rebuilds")
+        self.assert_test(cursor.fetchone()[0] == 0, "Finished builds clear their pending mark")
+        conn.close()
+        
+        # The BeeWare app's old tables had no delays
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, target_time REAL NOT NULL)")
+        create_schema(cursor)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='delays'")
+        self.assert_test(cursor.fetchone() is not None, "Missing tables created on upgrade")
+        conn.close()
+        
+    def test_unmigrated_tools(self):
+        """Test the command-line tools on a database the upgraded app hasn't opened"""
+        import subprocess
+        from export import export_data
+        from importer import import_data
+        from init_db import MIGRATIONS, migrate_unique_records
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'baseline.db')
+            self.create_baseline_database(db_path)
+            count = export_data(os.path.join(work_dir, 'out.csv'), db_path)
+            conn = sqlite3.connect(db_path)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.close()
+            self.assert_test(count == 2 and version == len(MIGRATIONS), "Export migrates the database it reads",
+                             f"Got {count} rows, version {version}")
+                             
+            target_path = os.path.join(work_dir, 'target.db')
+            self.create_baseline_database(target_path)
+            result = import_data(os.path.join(work_dir, 'out.csv'), target_path, workers=1)
+            self.assert_test(result == (0, 0, 2, []), "Import migrates the database it loads into", f"Got {result}")
+            
+            # The scripts read data/performance.db from where they are run
+            os.makedirs(os.path.join(work_dir, 'data'))
+            db_path = os.path.join(work_dir, 'data', 'performance.db')
+            self.create_baseline_database(db_path)
+            conn = sqlite3.connect(db_path)
+            conn.execute("INSERT INTO performance_records (task_id, start_time, end_time, actual_time, performance_percentage, created_at) "
+                         "VALUES (1, '08:00', '08:30', 30, 100.0, '2025-05-05 08:31:00')")
+            conn.commit()
+            conn.close()
+            
+            def run_tool(script, answer=''):
+                """Run script in work_dir with the repo importable; returns its output."""
+                env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+                run = subprocess.run([sys.executable, '-c', script], cwd=work_dir, env=env, input=answer,
+                                     capture_output=True, text=True, timeout=120)
+                return run.stdout + run.stderr
+                
+            def user_version():
+                """The schema version of the scripts' database."""
+                conn = sqlite3.connect(db_path)
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                conn.close()
+                return version
+                
+            output = run_tool("import check_duplicates; check_duplicates.show_all_records()")
+            self.assert_test("(2 total)" in output, "Record list reads an unmigrated database", output[-300:])
+            output = run_tool("import check_duplicates; check_duplicates.check_duplicates()", "n\n")
+            steps = [step for step, batched in MIGRATIONS]
+            self.assert_test("Found 1 duplicate" in output and user_version() == steps.index(migrate_unique_records),
+                             "Duplicate check migrates up to the removal it asks about", output[-300:])
+            output = run_tool("import check_duplicates; check_duplicates.check_duplicates()", "y\n")
+            self.assert_test("Removed 1" in output and user_version() == len(MIGRATIONS),
+                             "Confirmed removal finishes the migration", output[-300:])
+            output = run_tool("import runpy; runpy.run_module('analytics', run_name='__main__')")
+            self.assert_test("Records: 1" in output, "Analytics reads a database the app hasn't opened", output[-300:])
+        finally:
+            shutil.rmtree(work_dir)
+            
+    def run_headless(self, script, *args):
+        """Run a Kivy script in its own process with an offscreen window; returns its last output line."""
+        import subprocess
+        
+        # render_benchmark sets up the offscreen window when imported
+        run = subprocess.run([sys.executable, '-c', "import render_benchmark\n" + script, *args],
+                             cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=300)
+        lines = run.stdout.strip().splitlines()
+        return lines[-1] if run.returncode == 0 and lines else run.stderr[-300:]
+        
+    def test_list_rows(self):
+        """Test that the recycled lists build a row widget for what they load"""
+        work_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(work_dir, 'performance.db')
+            self.create_app_database(db_path)
+            conn = sqlite3.connect(db_path)
+            conn.execute("INSERT INTO tasks (name, target_time) VALUES ('Rows', 30)")
+            conn.executemany("INSERT INTO performance_records (task_id, start_time, end_time, actual_time, performance_percentage, record_day) VALUES (1, ?, ?, 30, 100, DATE('now'))",
+                             [(f'{hour:02d}:00', f'{hour:02d}:30') for hour in range(12)])
+            conn.commit()
+            conn.close()
+            
+            shown = self.run_headless("""
+import sys
+from kivy.base import EventLoop
+from kivymd.app import MDApp
+from db_worker import DatabaseWorker
+from records_screen import RecordsScreen
+from render_benchmark import pump_until, draw_frames
+MDApp()
+EventLoop.ensure_window()
+worker = DatabaseWorker(sys.argv[1])
+screen = RecordsScreen(worker)
+EventLoop.window.add_widget(screen)
+screen.dispatch('on_enter')
+pump_until(lambda: screen.record_view.data)
+draw_frames()
+print(len(screen.record_view.data), len(screen.record_view.layout_manager.children))
+worker.close()
+""", db_path)
+            # Loaded rows, then row widgets built
+            counts = shown.split()
+            self.assert_test(counts[:1] == ['12'] and len(counts) == 2 and counts[1] != '0',
+                             "Records list builds rows for the loaded page", shown)
+                             
+            shown = self.run_headless("""
+import sys
+import records_screen
+from kivy.base import EventLoop
+from kivymd.app import MDApp
+from db_worker import DatabaseWorker
+from render_benchmark import pump_until
+MDApp()
+EventLoop.ensure_window()
+worker = DatabaseWorker(sys.argv[1])
+screen = records_screen.RecordsScreen(worker)
+fetch_page = records_screen.fetch_records_page
+def fail(*args, **kwargs):
+    raise RuntimeError("disk I/O error")
+records_screen.fetch_records_page = fail
+screen.load_records()
+pump_until(lambda: not screen._page_pending, timeout=10)
+records_screen.fetch_records_page = fetch_page
+screen.load_next_page()
+pump_until(lambda: screen.record_view.data)
+print(len(screen.record_view.data))
+worker.close()
+""", db_path)
+            self.assert_test(shown == '12', "Records list pages again after a failed page", shown)
+            
+            shown = self.run_headless("""
+import sys
+from kivy.base import EventLoop
+from kivymd.app import MDApp
+from db_worker import DatabaseWorker
+from task_details import TaskDetailsScreen
+from render_benchmark import pump_until, draw_frames
+MDApp()
+EventLoop.ensure_window()
+worker = DatabaseWorker(sys.argv[1])
+screen = TaskDetailsScreen(1, worker)
+EventLoop.window.add_widget(screen)
+pump_until(lambda: screen.history_view.data, timeout=10)
+draw_frames()
+print(len(screen.history_view.data), len(screen.history_view.layout_manager.children))
+worker.close()
+""", db_path)
+            counts = shown.split()
+            self.assert_test(counts[:1] == ['12'] and len(counts) == 2 and counts[1] != '0',
+                             "Task timeline builds rows for the loaded page", shown)
+        finally:
+            shutil.rmtree(work_dir)
+            
+    def test_render_benchmark(self):
+        """Test the headless screen render benchmark"""
+        import json
+        import subprocess
+        
+        # In its own process, since it opens a Kivy window
+        work_dir = tempfile.mkdtemp()
+        try:
+            out = os.path.join(work_dir, 'render.json')
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_benchmark.py')
+            run = subprocess.run([sys.executable, script, '--sizes', '400', '--years', '1', '--repeats', '1',
+                                  '--label', 'test', '--out', out], capture_output=True, text=True, timeout=300)
+            self.assert_test(run.returncode == 0 and os.path.exists(out), "Render benchmark runs headless",
+                             run.stderr[-300:])
+            if os.path.exists(out):
+                with open(out) as f:
+                    result = json.load(f)['sizes']['400']
+                self.assert_test(set(result['widgets']) == {'daily_details', 'weekly_details', 'monthly_details', 'records'}
+                                 and len(result['timings']) == 12, "Every screen built, entered and re-entered")
+                self.assert_test(all(counts['created'] > 0 for counts in result['widgets'].values()),
+                                 "First entry builds rows on every screen", str(result['widgets']))
+                self.assert_test(all(counts['recreated'] == 0 for counts in result['widgets'].values()),
+                                 "Entering again reuses every row", str(result['widgets']))
+        finally:
+            shutil.rmtree(work_dir)
+        
+    def test_tracing(self):
+        """Test span recording, percentiles and the Chrome trace export"""
+        import json
+        import tracing
+        
+        def work(x):
+            return x * 2
+            
+        enabled = tracing.ENABLED
+        saved = list(tracing.spans)
+        try:
+            tracing.ENABLED = False
+            self.assert_test(tracing.traced(work) is work and tracing.span("idle") is tracing.span("other"),
+                             "Tracing off leaves functions unwrapped")
+                             
+            tracing.ENABLED = True
+            tracing.spans.clear()
+            traced_work = tracing.traced(work)
+            self.assert_test(traced_work(21) == 42 and traced_work.__name__ == 'work', "Traced function still works")
+            for _ in range(99):
+                traced_work(1)
+            try:
+                with tracing.span("failing job", 'db'):
+                    raise ValueError("broken")
+            except ValueError:
+                pass
+            tracing.record_error("handled", KeyError("missing"))
+            start = tracing.started()
+            tracing.record_since("round trip", start)
+            
+            rows = {row[0]: row for row in tracing.summary()}
+            name = work.__qualname__
+            self.assert_test(rows[name][1] == 100 and rows[name][2] == 0, "Every call recorded", str(rows[name]))
+            self.assert_test(rows["failing job"][2] == 1 and rows["handled"][2] == 1, "Raised and handled errors recorded")
+            self.assert_test(rows["round trip"][1] == 1 and rows["round trip"][2] == 0, "Round trips recorded from their start")
+            self.assert_test(tracing.percentile(list(range(1, 101)), 50) == 50 and
+                             tracing.percentile(list(range(1, 101)), 99) == 99 and tracing.percentile([7], 95) == 7,
+                             "Nearest-rank percentiles")
+                             
+            trace = json.loads(json.dumps(tracing.chrome_trace()))
+            complete = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+            self.assert_test(len(complete) == 103 and all(event['dur'] >= 0 for event in complete) and
+                             any(event.get('args', {}).get('error') == "ValueError: broken" for event in complete),
+                             "Chrome trace holds every span")
+                             
+            for _ in range(tracing.TRACE_BUFFER_SIZE):
+                traced_work(1)
+            self.assert_test(len(tracing.spans) == tracing.TRACE_BUFFER_SIZE, "Ring buffer stays bounded")
+        finally:
+            tracing.ENABLED = enabled
+            tracing.spans.clear()
+            tracing.spans.extend(saved)
+            
     def run_all_tests(self):
         """Run all test suites"""
         print("🔧 Performance Tracker App - Test Suite")
@@ -347,6 +1690,81 @@ class PerformanceTrackerTester:
             print("\n🧪 Testing Edge Cases...")
             self.test_edge_cases()
             
+            print("\n📅 Testing Record Day Migration...")
+            self.test_record_day_migration()
+            
+            print("\n📈 Testing Daily Rollups...")
+            self.test_daily_rollups()
+            
+            print("\n🔌 Testing Connection Profiles...")
+            self.test_connection_profiles()
+            
+            print("\n🗂️ Testing Period Grouping...")
+            self.test_period_grouping()
+            
+            print("\n🕒 Testing Epoch Timestamps...")
+            self.test_epoch_timestamps()
+            
+            print("\n📥 Testing Batched Ingest...")
+            self.test_batched_ingest()
+            
+            print("\n🧹 Testing Record Deduplication...")
+            self.test_record_deduplication()
+            
+            print("\n💾 Testing Online Backups...")
+            self.test_online_backup()
+            
+            print("\n🧩 Testing Incremental Snapshots...")
+            self.test_incremental_snapshots()
+            
+            print("\n⏱️ Testing Startup Timing...")
+            self.test_startup_timing()
+            
+            print("\n🔢 Testing NumPy Analytics...")
+            self.test_numpy_analytics()
+            
+            print("\n⏳ Testing Delay Analytics...")
+            self.test_delay_stats()
+            
+            print("\n🗓️ Testing Task Timeline...")
+            self.test_task_timeline()
+            
+            print("\n🔁 Testing Keyed List Updates...")
+            self.test_keyed_list()
+            
+            print("\n🔖 Testing Data Versions...")
+            self.test_data_version()
+            
+            print("\n🗃️ Testing Period Cache...")
+            self.test_period_cache()
+            
+            print("\n📤 Testing Export...")
+            self.test_export()
+            
+            print("\n🚚 Testing Bulk Import...")
+            self.test_bulk_import()
+            
+            print("\n🏁 Testing Benchmarks...")
+            self.test_benchmark()
+            
+            print("\n🔬 Testing Tracing...")
+            self.test_tracing()
+            
+            print("\n🖼️ Testing Render Benchmark...")
+            self.test_render_benchmark()
+            
+            print("\n🧭 Testing Query Plans...")
+            self.test_query_plans()
+            
+            print("\n🪜 Testing Schema Migrations...")
+            self.test_schema_migrations()
+            
+            print("\n🧰 Testing Tools on Unmigrated Databases...")
+            self.test_unmigrated_tools()
+            
+            print("\n📜 Testing List Rows...")
+            self.test_list_rows()
+        
         finally:
             self.tearDown()
             
@@ -371,6 +1789,9 @@ def test_file_structure():
     required_files = [
         'main.py',
         'task_details.py', 
+        'period_details.py',
+        'add_record.py',
+        'records_screen.py',
         'init_db.py',
         'buildozer.spec',
         'requirements.txt',
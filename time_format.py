@@ -0,0 +1,32 @@
+"""
+Cached formatting of stored epoch timestamps for the list screens.
+
+Records keep created_at as integer epoch seconds (created_epoch) next to
+the text column. Splitting an epoch into its day and its time of day is
+plain arithmetic, and the day part is formatted once per distinct day
+through an LRU cache, so rendering a long list never calls strptime.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+EPOCH = date(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+@lru_cache(maxsize=1024)
+def format_day(epoch_day, fmt='%Y-%m-%d'):
+    """Format a day given as days since 1970-01-01."""
+    return (EPOCH + timedelta(days=epoch_day)).strftime(fmt)
+
+def format_time(epoch):
+    """Format the HH:MM part of an epoch timestamp."""
+    seconds = epoch % SECONDS_PER_DAY
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+def format_date(epoch, fmt='%Y-%m-%d'):
+    """Format the day part of an epoch timestamp."""
+    return format_day(epoch // SECONDS_PER_DAY, fmt)
+
+def format_timestamp(epoch):
+    """Format an epoch timestamp as 'YYYY-MM-DD HH:MM'."""
+    return f"{format_date(epoch)} {format_time(epoch)}"
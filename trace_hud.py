@@ -0,0 +1,96 @@
+"""
+Hidden debug overlay listing the slowest traced operations.
+
+main.py only installs it when tracing is on (PERFORMANCE_TRACE=1). F12,
+or five quick taps on the home screen title, shows or hides it. While it
+is shown it refreshes from tracing.summary() once a second.
+"""
+
+import time
+from kivy.core.window import Window
+from kivy.clock import Clock
+from kivy.uix.label import Label
+from kivy.graphics import Color, Rectangle
+import tracing
+
+HUD_ROWS = 8
+HUD_REFRESH = 1.0
+TOGGLE_TAPS = 5
+TAP_WINDOW = 2.0
+KEY_F12 = 293
+
+class TraceHud(Label):
+    """Semi-transparent panel over the top of the window."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(
+            halign='left', valign='top', font_name='RobotoMono-Regular', font_size='11sp',
+            color=(1, 1, 1, 1), padding=(8, 8), size_hint=(1, 0.4), **kwargs
+        )
+        with self.canvas.before:
+            Color(0, 0, 0, 0.75)
+            self._background = Rectangle()
+        self.bind(pos=self.update_background, size=self.update_background)
+        self._refresh = None
+        self._taps = []
+        Window.bind(on_keyboard=self.on_keyboard)
+        
+    def update_background(self, *args):
+        """Keep the backdrop and the text area on the panel."""
+        self._background.pos = self.pos
+        self._background.size = self.size
+        self.text_size = self.size
+        
+    @property
+    def shown(self):
+        """Whether the overlay is on screen."""
+        return self.parent is not None
+        
+    def toggle(self):
+        """Show the overlay if hidden, hide it if shown."""
+        if self.shown:
+            self._refresh.cancel()
+            Window.unbind(size=self.place)
+            Window.remove_widget(self)
+            return
+            
+        Window.add_widget(self)
+        Window.bind(size=self.place)
+        self.place()
+        self.refresh()
+        self._refresh = Clock.schedule_interval(self.refresh, HUD_REFRESH)
+        
+    def place(self, *args):
+        """Stretch the panel over the top of the window; the window sizes children but doesn't place them."""
+        self.width = Window.width
+        self.height = Window.height * self.size_hint_y
+        self.pos = (0, Window.height - self.height)
+        
+    def refresh(self, *args):
+        """Show the slowest operations traced so far; ! marks ones that failed."""
+        rows = tracing.summary()
+        lines = [f"{len(tracing.spans)} spans          calls    p50    p95    p99    max ms"]
+        for name, calls, errors, p50, p95, p99, longest in rows[:HUD_ROWS]:
+            flag = "!" if errors else " "
+            lines.append(f"{flag}{name[:24]:<24} {calls:5d} {p50:6.1f} {p95:6.1f} {p99:6.1f} {longest:6.1f}")
+        self.text = "\n".join(lines)
+        
+    def watch(self, widget):
+        """Toggle the overlay on TOGGLE_TAPS quick taps on widget."""
+        widget.bind(on_touch_down=self.on_widget_touch)
+        
+    def on_widget_touch(self, widget, touch):
+        """Count quick taps on a watched widget."""
+        if not widget.collide_point(*touch.pos):
+            return
+        now = time.monotonic()
+        self._taps = [tap for tap in self._taps if now - tap < TAP_WINDOW] + [now]
+        if len(self._taps) >= TOGGLE_TAPS:
+            self._taps = []
+            self.toggle()
+            
+    def on_keyboard(self, window, key, *args):
+        """Toggle the overlay on F12."""
+        if key == KEY_F12:
+            self.toggle()
+            return True
@@ -0,0 +1,137 @@
+"""
+Hot-path tracing.
+
+Set PERFORMANCE_TRACE=1 and every database job and every screen load,
+update and show method records how long it took. Loads that finish in a
+worker callback can also record the whole round trip with started() and
+record_since(). The last TRACE_BUFFER_SIZE spans are kept in a ring
+buffer. summary() gives each operation's p50/p95/p99 from them, and
+dump_chrome_trace() writes them as Chrome trace-event JSON, which
+chrome://tracing and Perfetto open.
+
+Tracing is decided when the app starts. With it off, traced() hands back
+the function it was given, so decorated methods cost nothing. span() then
+returns one shared no-op context manager.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+ENABLED = bool(os.environ.get('PERFORMANCE_TRACE'))
+TRACE_BUFFER_SIZE = 4096
+TRACE_FILE = 'performance_trace.json'
+
+STARTED = time.perf_counter()
+# (name, category, start, duration, thread id, error message or None), oldest first;
+# deque appends are atomic, so the worker and the UI thread record without a lock
+spans = deque(maxlen=TRACE_BUFFER_SIZE)
+
+_DISABLED = nullcontext()
+
+@contextmanager
+def _span(name, category):
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        spans.append((name, category, start, time.perf_counter() - start, threading.get_ident(), error))
+
+def span(name, category='app'):
+    """Trace the body of the with-block as name; an exception it raises is recorded too."""
+    if not ENABLED:
+        return _DISABLED
+    return _span(name, category)
+
+def traced(function):
+    """Decorator tracing every call of function under its qualified name."""
+    if not ENABLED:
+        return function
+        
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with _span(function.__qualname__, 'ui'):
+            return function(*args, **kwargs)
+    return wrapper
+
+def started():
+    """A start time for record_since(), or None while tracing is off."""
+    return time.perf_counter() if ENABLED else None
+
+def record_since(name, start, category='ui'):
+    """Record a span from start, taken with started(), to now; for work that ends in a callback."""
+    if ENABLED and start is not None:
+        spans.append((name, category, start, time.perf_counter() - start, threading.get_ident(), None))
+
+def record_error(name, error, category='app'):
+    """Record an error that was handled rather than raised, as a zero-length span."""
+    if ENABLED:
+        spans.append((name, category, time.perf_counter(), 0.0, threading.get_ident(), f"{type(error).__name__}: {error}"))
+
+def job_name(job):
+    """Name of a database job, seeing through functools.partial."""
+    job = getattr(job, 'func', job)
+    return getattr(job, '__qualname__', repr(job))
+
+def percentile(ordered, q):
+    """The q-th percentile (0-100) of sorted values, by the nearest-rank method."""
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def summary():
+    """Return (name, calls, errors, p50, p95, p99, max) per operation in the buffer, slowest p95 first.
+    
+    Durations are in milliseconds.
+    """
+    durations = {}
+    errors = {}
+    for name, _, _, duration, _, error in list(spans):
+        durations.setdefault(name, []).append(duration * 1000)
+        if error:
+            errors[name] = errors.get(name, 0) + 1
+            
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append((name, len(values), errors.get(name, 0), percentile(values, 50), percentile(values, 95),
+                     percentile(values, 99), values[-1]))
+    return sorted(rows, key=lambda row: row[4], reverse=True)
+
+def chrome_trace():
+    """The buffered spans as a Chrome trace-event document."""
+    pid = os.getpid()
+    events = []
+    for name, category, start, duration, thread_id, error in list(spans):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': thread_id,
+                 'ts': round((start - STARTED) * 1e6, 1), 'dur': round(duration * 1e6, 1)}
+        if error:
+            event['args'] = {'error': error}
+        events.append(event)
+    threads = {thread.ident: thread.name for thread in threading.enumerate()}
+    for thread_id in {event['tid'] for event in events}:
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id,
+                       'args': {'name': threads.get(thread_id, str(thread_id))}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def dump_chrome_trace(path=TRACE_FILE):
+    """Write the buffered spans to path as Chrome trace-event JSON and return how many there were."""
+    trace = chrome_trace()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f)
+    return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
+
+def report(limit=10):
+    """Print the slowest operations."""
+    rows = summary()
+    print(f"Slowest operations ({len(spans)} spans traced):")
+    for name, calls, errors, p50, p95, p99, longest in rows[:limit]:
+        failed = f", {errors} failed" if errors else ""
+        print(f"  {name}: {calls} calls{failed}, p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, max {longest:.1f} ms")